@@ -27,7 +27,7 @@ class BasePage(NoAuthBasePageObject):
 
         # different pages have different search form selectors; grab every
         # element with an id that starts with "search"
-        possible_elements = self.driver.find_elements(By.CSS_SELECTOR, '[id^=search')
+        possible_elements = self.find_elements(By.CSS_SELECTOR, '[id^=search')
         sel_search_form = None
         for e in possible_elements:
             # find the *first* id that ends with 'input'
@@ -44,7 +44,7 @@ class BasePage(NoAuthBasePageObject):
             self.save_screenshot(f"form not found {self.name}")
             raise
 
-        search_input = self.driver.find_element(By.ID, sel_search_form)
+        search_input = self.find_element(By.ID, sel_search_form)
 
         # pass in the search string
         self._set_field_input(search_input, 'search field', text,
@@ -171,6 +171,8 @@ class InternalHomePage(BasePage):
 class SearchResultsPage(BasePage):
 
     name = 'duckduckgo search results page'
+    # results are loaded by javascript after the page loads
+    quiet_period = 500
     identity_checks = ['check_url_chunks', 'check_title']
     load_checks = [
         (True, By.ID, 'search_form_input')
@@ -198,7 +200,7 @@ class SearchResultsPage(BasePage):
             :return result_titles: list, str titles for each returned result
         """
         sel_result_items = 'article div:nth-child(2)'
-        raw_results = self.driver.find_elements(By.CSS_SELECTOR, sel_result_items)
-        result_titles = [item.text for item in raw_results]
+        raw_results = self.extract(sel_result_items, fields=['text'])
+        result_titles = [item['text'] for item in raw_results]
         logger.info(f"\nSearch results item titles:\n{utils.plog(result_titles)}")
         return result_titles
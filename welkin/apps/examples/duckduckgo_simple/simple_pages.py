@@ -1,5 +1,4 @@
 import logging
-import time
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -7,7 +6,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
 from welkin.framework.exceptions import PageIdentityException
-from welkin.framework import utils
+from welkin.framework import utils, utils_selenium
 
 logger = logging.getLogger(__name__)
 
@@ -116,7 +115,7 @@ class SearchResultsPage(BasePageObject):
     def __init__(self, driver, text):
         self.driver = driver
         self.search_text = text
-        time.sleep(4)  # wait for page to load
+        utils_selenium.wait_for_page_ready(self.driver)  # wait for page to load
         logger.info(f"Instantiated {self.appname} search results PageObject.")
 
     def verify_self(self):
@@ -155,7 +154,7 @@ class SearchResultsPage(BasePageObject):
             :return result_titles: list, str titles for each returned result
         """
         sel_result_items = 'article div:nth-child(2)'
-        raw_results = self.driver.find_elements(By.CSS_SELECTOR, sel_result_items)
-        result_titles = [item.text for item in raw_results]
+        raw_results = utils_selenium.extract_elements(self.driver, sel_result_items)
+        result_titles = [item['text'] for item in raw_results]
         logger.info(f"\nSearch results item titles:\n{utils.plog(result_titles)}")
         return result_titles
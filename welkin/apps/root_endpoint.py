@@ -6,6 +6,8 @@ from cerberus import Validator
 
 from welkin.framework import utils
 from welkin.framework import utils_file
+from welkin.framework import history
+from welkin.framework import utils_logging
 from welkin.framework.exceptions import JsonPayloadException
 
 logger = logging.getLogger(__name__)
@@ -58,9 +60,9 @@ class RootEndpoint(object):
         """
         # make the request
         logger.info(f"Getting url: {url}")
-        logger.info(f"\nHeaders: {utils.plog(self.headers)}")
+        logger.info("\nHeaders: %s", utils.lazy_plog(dict(self.headers)))
         if verbose:
-            logger.info(f"\nparams: {utils.plog(params)}")
+            logger.info("\nparams: %s", utils.plog(params))
         if params:
             if use_session:
                 res = self.session.get(
@@ -95,8 +97,12 @@ class RootEndpoint(object):
         else:
             final_url = url
 
-        logger.info(f"\nResponse code: {res.status_code}")
-        logger.info(f"\nResponse json:\n{utils.plog(res.json())}")
+        history.record('endpoint', f"GET {url}", res.elapsed.total_seconds(),
+                       failed=res.status_code != expect_status)
+        logger.info(f"\nResponse code: {res.status_code}",
+                    extra=utils_logging.record_fields(
+                        event=f"GET {url}", duration=res.elapsed.total_seconds()))
+        logger.info("\nResponse json:\n%s", utils.lazy_plog(res.json()))
 
         # write the response headers to a file
         utils_file.write_request_to_file(res, final_url, fname=self.name)
@@ -133,9 +139,9 @@ class RootEndpoint(object):
         """
         # make the request
         logger.info(f"Posting url: {url}")
-        logger.info(f"\nHeaders: {utils.plog(self.headers)}")
+        logger.info("\nHeaders: %s", utils.lazy_plog(dict(self.headers)))
         if verbose:
-            logger.info(f"\nparams: {utils.plog(params)}")
+            logger.info("\nparams: %s", utils.plog(params))
         if params:
             if use_session:
                 res = self.session.post(
@@ -174,8 +180,12 @@ class RootEndpoint(object):
         else:
             final_url = url
 
-        logger.info(f"\nResponse code: {res.status_code}")
-        logger.info(f"\nResponse json:\n{utils.plog(res.json())}")
+        history.record('endpoint', f"POST {url}", res.elapsed.total_seconds(),
+                       failed=res.status_code != expect_status)
+        logger.info(f"\nResponse code: {res.status_code}",
+                    extra=utils_logging.record_fields(
+                        event=f"POST {url}", duration=res.elapsed.total_seconds()))
+        logger.info("\nResponse json:\n%s", utils.lazy_plog(res.json()))
 
         # write the response headers to a file
         utils_file.write_request_to_file(res, final_url, fname=self.name)
@@ -209,8 +219,8 @@ class RootEndpoint(object):
             return True
         else:
             logger.error('Comparison results: Keys are NOT equal.')
-            logger.error(f"Expected keys:\n{utils.plog(expected)}")
-            logger.error(f"Actual keys:\n{utils.plog(actual)}")
+            logger.error("Expected keys:\n%s", utils.lazy_plog(expected))
+            logger.error("Actual keys:\n%s", utils.lazy_plog(actual))
             raise JsonPayloadException("Actual keys don't match expected keys.")
 
     def validate_schema(self, response_data, verbose=False):
@@ -236,8 +246,8 @@ class RootEndpoint(object):
             :return result: bool, True if schema validated
         """
         if verbose:
-            logger.info(f"\nschema for '{self.name}':"
-                        f"\n{utils.plog(self.schema)}")
+            logger.info("\nschema for '%s':\n%s",
+                        self.name, utils.lazy_plog(self.schema))
         # instantiate the validator
         validator = Validator()
         result = validator.validate(response_data, self.schema)
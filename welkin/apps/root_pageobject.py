@@ -1,40 +1,184 @@
 import logging
-import importlib
 import time
+import uuid
 import pytest
 
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException
 from selenium.common.exceptions import ElementNotVisibleException
 from selenium.common.exceptions import TimeoutException
 from selenium.common.exceptions import MoveTargetOutOfBoundsException
+from selenium.common.exceptions import WebDriverException
 
 from welkin.framework.exceptions import PageUnloadException
 from welkin.framework.exceptions import PageLoadException
 from welkin.framework.exceptions import PageIdentityException
 from welkin.framework.exceptions import ControlInteractionException
 
-from welkin.framework import checks
-from welkin.framework import utils, utils_file
+from welkin.framework import checks, waits, routing, navigation, element_cache, history
+from welkin.framework import utils, utils_file, utils_logging, capture
 from welkin.framework import utils_selenium, utils_accessibility
 
 logger = logging.getLogger(__name__)
 
 
 class RootPageObject(object):
+    # name of the capture profile for this page, overriding the test
+    # run's --capture_level; see framework/capture.py
+    capture_level = None
+    # the latest snapshot of the browser's state, see snapshot_state()
+    state = None
+    # the token the page's document was tagged with, see verify_unload()
+    document_token = None
+    # secs to poll for a new document, in case the navigation is still in
+    # flight, before falling back to the unload checks; an SPA transition
+    # waits this long every time, so keep it short, and raise it only for
+    # pages whose navigation is slow to start
+    unload_token_timeout = 0.3
+    # msecs without network requests or DOM changes for the page to count
+    # as ready when loaded; None to not wait, see
+    # utils_selenium.wait_for_page_ready()
+    quiet_period = None
+    # elements found by this page object, see find_element()
+    cached_elements = None
+
+    def get_capture_profile(self):
+        """
+            Get the capture profile that decides which data is collected
+            for this page when it is loaded or unloaded.
+
+            :return: dict, collector name: bool, whether the collector runs
+        """
+        level = self.capture_level
+        if not level:
+            level = pytest.custom_namespace.get('capture_level',
+                                                capture.DEFAULT_CAPTURE_LEVEL)
+        return capture.get_profile(level)
+
+    def find_element(self, by, selector):
+        """
+            Find an element on this page, through this page object's element
+            cache; a repeat lookup of the same selector is free, and the
+            element re-finds itself if the page re-renders it.
+
+            See welkin/framework/element_cache.py.
+
+            :param by: str, selenium By strategy, e.g. By.CSS_SELECTOR
+            :param selector: str, selector for the strategy
+            :return: CachedElement instance (a WebElement)
+        """
+        return self._get_element_cache().find_element(by, selector)
+
+    def find_elements(self, by, selector):
+        """
+            Find every element on this page for a selector. The list is
+            looked up every time, so elements the page has added since are
+            found, but each element re-finds itself if the page re-renders
+            it; see find_element().
+
+            :param by: str, selenium By strategy, e.g. By.CSS_SELECTOR
+            :param selector: str, selector for the strategy
+            :return: list of CachedElement instances
+        """
+        return self._get_element_cache().find_elements(by, selector)
+
+    def invalidate_element_cache(self):
+        """
+            Forget the elements this page object has found, e.g. because
+            the browser has navigated away or the page was re-rendered.
+
+            :return: None
+        """
+        if self.cached_elements:
+            self.cached_elements.invalidate()
+
+    def _get_element_cache(self):
+        """
+            Get this page object's element cache, creating it on first use
+            (page object classes don't call a common __init__()).
+
+            :return: ElementCache instance
+        """
+        if self.cached_elements is None:
+            self.cached_elements = element_cache.ElementCache(self.driver)
+        return self.cached_elements
+
+    def extract(self, selector, fields=('text',), children=None, root=None):
+        """
+            Extract text, attributes and properties from every element on
+            this page that matches a css selector, in one browser round trip.
+
+            See utils_selenium.extract_elements() for the field specs and
+            the nested `children` specs for tables and lists.
+
+            Example usage:
+            >>> links = page.extract('article h2 a', fields={'title': 'text',
+            ...                                              'url': 'attr:href'})
+
+            :param selector: str, css selector
+            :param fields: list or dict of field specs; defaults to ['text']
+            :param children: dict, name: child spec, for nested elements
+            :param root: webelement to search within; defaults to the document
+            :return: list of dicts, one for each matching element
+        """
+        return utils_selenium.extract_elements(self.driver, selector, fields=fields,
+                                               children=children, root=root)
+
+    def iter_extract(self, selector, fields=('text',), children=None, limit=None,
+                     until=None, idle_timeout=3):
+        """
+            Yield data from the elements that match a css selector as they
+            appear, for lists that load more items when scrolled to the end
+            (infinite scroll).
+
+            The elements already rendered come first; then the page is
+            scrolled to the bottom and the next batch is whatever new
+            elements the page adds. Each round trip only transfers the
+            elements added since the last one. Iteration stops after `limit`
+            items, after the item for which `until(item)` is true, or when
+            scrolling adds nothing new within `idle_timeout` seconds.
+
+            Example usage:
+            >>> for result in page.iter_extract('article h2', limit=50):
+            ...     logger.info(result['text'])
+
+            :param selector: str, css selector
+            :param fields: list or dict of field specs; defaults to ['text'];
+                           see utils_selenium.extract_elements()
+            :param children: dict, name: child spec, for nested elements
+            :param limit: int, most items to yield; defaults to no limit
+            :param until: callable, until(item) returns True for the last item
+            :param idle_timeout: float, seconds to wait for new items after
+                                        scrolling; defaults to 3
+            :return: generator of dicts, one for each matching element
+        """
+        token = uuid.uuid4().hex
+        count = 0
+        while limit is None or count < limit:
+            batch = utils_selenium.extract_new_elements(
+                self.driver, selector, token, fields=fields, children=children,
+                idle_timeout=idle_timeout)
+            if not batch:
+                logger.info(f"\nno more items for '{selector}' after {count}.")
+                return
+            for item in batch:
+                yield item
+                count += 1
+                if (limit is not None and count >= limit) or (until and until(item)):
+                    return
 
     def resolve_pageobject(self, po_id, cross_auth_boundary=False, **opts):
         """
             Using the string id of the pageobject for the desired page,
             identify the pageobject's class and instantiate it.
 
-            The importing of the modules and classes has to be done
-            dynamically -- and in this method -- in order to avoid
-            recursive import loops on start up.
+            The page object classes are looked up in the routing registry
+            (see welkin/framework/routing.py), which imports every page
+            object module once, at collection time, after every module has
+            been loaded -- that avoids recursive import loops on start up.
 
             This uses the data model in the PO's wrapper routings.py for
             a mapping between the page/PO name with the module and
@@ -55,56 +199,27 @@ class RootPageObject(object):
             :param opts: dict, pass-through parameters for the PO's __init__()
             :return: page object for the target page
         """
-        # import the routings module for the appropriate wrapper
+        # the routings module for the appropriate wrapper;
         # the path (minus the file name) lives in this wrapper's BasePageObject
-        import_path_to_routings = self.routings_path + 'routings'
-        logger.info(f"\nPath to routings module for this wrapper:\n{import_path_to_routings}")
-        routings = importlib.import_module(import_path_to_routings)
+        routings_module = self.routings_path + 'routings'
 
-        routing_map = None
-        root_path_to_module = None
-
-        # load the correct mapping dict from the wrapper's routings.py file,
+        # pick the correct mapping from the wrapper's routings.py file,
         # based on whether the next PO will be noauth or auth
         if self.page_auth_mode == 'noauth':
-            if cross_auth_boundary:
-                # handle the auth boundary crossing here if needed
-                # need to load the auth map
-                routing_map = routings.auth_pageobjects
-                root_path_to_module = routings.AUTH_PATH
-                pass
-            else:
-                # load the noauth map
-                routing_map = routings.noauth_pageobjects
-                root_path_to_module = routings.NOAUTH_PATH
+            auth_mode = 'auth' if cross_auth_boundary else 'noauth'
         elif self.page_auth_mode == 'auth':
-            if cross_auth_boundary:
-                # handle the auth boundary crossing here if needed
-                # need to load the noauth map
-                routing_map = routings.noauth_pageobjects
-                root_path_to_module = routings.NOAUTH_PATH
-            else:
-                # load the auth map
-                routing_map = routings.auth_pageobjects
-                root_path_to_module = routings.AUTH_PATH
+            auth_mode = 'noauth' if cross_auth_boundary else 'auth'
         else:
             msg = f"page_auth_mode can only be 'noauth' or 'auth'; " \
                   f"'{self.page_auth_mode}' is not valid."
             logger.error(msg)
             raise ValueError(msg)
 
-        # get the str module name for the new PO
-        page_object_data = routing_map[po_id]
-
-        # assemble the str dot-notation path for the module
-        module_path = root_path_to_module + page_object_data['module']
-
-        # dynamically import the module `module_path`
-        logger.info(f"\nPath to page object: {module_path} --> '{po_id}'.")
-        path_to_module = importlib.import_module(module_path)
-
-        # dynamically translate from the str name of the PO to the PO's class
-        pageobject_class = getattr(path_to_module, page_object_data['object'])
+        # translate from the str name of the PO to the PO's class
+        pageobject_class = routing.get_registry().get_class(routings_module,
+                                                            auth_mode, po_id)
+        logger.info(f"\nPage object for '{po_id}': {pageobject_class.__module__}."
+                    f"{pageobject_class.__name__}.")
 
         # instantiate a class instance for the PageObject.
         # Note: at this point, in this method, `self` refers to the old PO
@@ -149,7 +264,9 @@ class RootPageObject(object):
 
             3. A *lot* of stuff happens in this method, extra validation,
             processing around browser state and data, and writes to file. All of
-            this makes this method slow.
+            this makes this method slow. Which data is collected and written
+            is set by the new page object's capture profile (see
+            framework/capture.py); the forensic profile collects everything.
 
             :param po_id: str, key for the page object in the POM data model
             :param cross_auth_boundary: bool, true to trigger a switch between
@@ -157,6 +274,7 @@ class RootPageObject(object):
             :param opts: dict, pass-through parameters for the PO's __init__()
             :return: page object for the target page
         """
+        start = time.monotonic()
         # get the previous page's name; remember that the browser has changed
         # state and we are trying to catch the page object up to the browser
         last_page = self.name  # noqa: F841
@@ -167,15 +285,37 @@ class RootPageObject(object):
         # check or log page state for that. If a particular app's page
         # transitions are difficult, revisit this.
 
+        # the elements this page object found belong to the old page
+        self.invalidate_element_cache()
+
         # get the pageobject for the expected new page
         # at this point, we do NOT know if the browser loaded the page correctly!
         new_pageobject_instance = self.resolve_pageobject(
             po_id, cross_auth_boundary=False, **opts)
 
+        # if the page object asks for it, wait for the page to settle
+        if new_pageobject_instance.quiet_period:
+            utils_selenium.wait_for_page_ready(
+                self.driver, quiet_period=new_pageobject_instance.quiet_period)
+
+        # snapshot the browser's state for the new page in one round trip;
+        # the identity checks and the data collection below read from it.
+        # Only get the cookies and metrics if they will be written.
+        profile = new_pageobject_instance.get_capture_profile()
+        get_metrics = profile[capture.METRICS] and \
+            'chrome' in pytest.custom_namespace['browser']
+        state = new_pageobject_instance.snapshot_state(
+            cookies=profile[capture.COOKIES], metrics=get_metrics)
+
         # check that browser readyState is "complete". Because this check lags
         # the interaction step that triggered the new page, this is likely to
         # already be true unless there was an error.
-        if utils_selenium.get_readystate(self.driver, state='complete'):
+        if state.ready_state != 'complete' and \
+                utils_selenium.get_readystate(self.driver, state='complete'):
+            # the page was still loading, so the snapshot is out of date
+            state = new_pageobject_instance.snapshot_state(
+                cookies=profile[capture.COOKIES], metrics=get_metrics)
+        if state.ready_state == 'complete':
             # assume that the PO logic is correct and accurate, and that
             # the page has completed loading
             if po_id == last_page:
@@ -196,35 +336,86 @@ class RootPageObject(object):
 
         # perform any page identity checks that are specified in the PO class
         # >> using the new page object! <<
-        new_pageobject_instance.verify_self(verbose=True)
+        new_pageobject_instance.verify_self(verbose=True, state=state)
 
-        # perform a series of data collection and file-writes for the NEW page
-        # which has NOT YET been instantiated as a page object
+        # perform a series of data collection and file-writes for the NEW page,
+        # as set by the new page object's capture profile
 
         # write the cookies FOR THE NEW PAGE to a file
-        new_pageobject_instance.save_cookies(filename=event)
+        if profile[capture.COOKIES]:
+            new_pageobject_instance.save_cookies(filename=event, state=state)
 
         # write Chrome browser metrics log FOR THE NEW PAGE to a file
-        if 'chrome' in pytest.custom_namespace['browser']:
-            new_pageobject_instance.save_chrome_metrics(filename=event)
+        if get_metrics:
+            new_pageobject_instance.save_chrome_metrics(filename=event, state=state)
 
         # write browser console and performance logs FOR THE NEW PAGE to files
-        new_pageobject_instance.save_browser_logs(filename=event)
+        if profile[capture.BROWSER_LOGS]:
+            new_pageobject_instance.save_browser_logs(filename=event)
 
         # write webstorage FOR THE NEW PAGE to files
-        new_pageobject_instance.save_webstorage(event=event, set_this_event=False)
+        if profile[capture.WEBSTORAGE]:
+            new_pageobject_instance.save_webstorage(event=event, set_this_event=False,
+                                                    state=state)
 
         # generate and write accessibility logs FOR THE NEW PAGE to file
-        new_pageobject_instance.generate_accessibility_review(filename=po_id)
+        if profile[capture.ACCESSIBILITY]:
+            new_pageobject_instance.generate_accessibility_review(filename=po_id)
+
+        elapsed = time.monotonic() - start
+        history.record('page load', new_pageobject_instance.name, elapsed)
+        logger.info(f"\nloaded page object '{po_id}' in {elapsed:.3f}s.",
+                    extra=utils_logging.record_fields(
+                        pageobject=new_pageobject_instance.name, event=event,
+                        duration=elapsed))
 
         # with this return, the page opbject model is now in sync
         # with the browser
         return new_pageobject_instance
 
+    def goto(self, po_id):
+        """
+            Navigate from this page to the page for `po_id` the cheapest
+            way, and return its page object.
+
+            The navigation graph (see welkin/framework/navigation.py) plans
+            the fewest page loads: a direct driver.get() when the target
+            page is URL-addressable, else the shortest path of click helpers
+            from this page (or from a URL-addressable page on the way).
+            Every page along the way is loaded with load_pageobject(), so
+            the page object model stays in sync with the browser.
+
+            Example usage:
+            >>> boot_page = PomBootPage(driver)
+            >>> basket_page = boot_page.goto('sweetshop basket page')
+
+            :param po_id: str, key for the page object in the POM data model
+            :return page: page object for the target page
+        """
+        steps = navigation.get_graph().plan(self.routings_path + 'routings',
+                                            self.page_auth_mode, self.name, po_id)
+        page = self
+        for step in steps:
+            if step[0] == 'get':
+                _, step_po_id, url = step
+                page.driver.get(url)
+                page = page.load_pageobject(po_id=step_po_id)
+            else:
+                _, step_po_id, method, args = step
+                page = getattr(page, method)(*args)
+        return page
+
     def verify_unload(self, screenshot=False, verbose=False):
         """
             Check that the current page displayed in the browser has unloaded.
 
+            If this page's document was tagged when it was loaded (see
+            snapshot_state()), a cheap poll of the browser's document, for
+            up to `unload_token_timeout` seconds, confirms that the browser
+            has navigated to a new document. Only if the document stays the
+            same (e.g. an SPA transition) are the unload checks below
+            performed.
+
             Each page object *may* have a list of specific unload validation
             checks, called `load_checks`. This list contains tuples of methods
             and selectors in the format:
@@ -263,6 +454,14 @@ class RootPageObject(object):
             logger.warning(msg)
             return False
 
+        if self.document_token and self._document_has_changed():
+            logger.info(f"\nVerified unload for '{self.name}': the browser "
+                        f"has a new document.")
+            if self.get_capture_profile()[capture.UNLOAD_SCREENSHOT]:
+                # routine screenshot, only kept if the test fails
+                self.save_screenshot(f"unloaded {self.name}", buffered=True)
+            return True
+
         # set up list of found problems; staying empty means no problems found
         found_problems = []
         unload_checks = self.unload_checks
@@ -289,9 +488,34 @@ class RootPageObject(object):
             # finally, raise that exception
             raise PageUnloadException(errors=errors)
         else:
-            self.save_screenshot(f"unloaded {self.name}")
+            if self.get_capture_profile()[capture.UNLOAD_SCREENSHOT]:
+                # routine screenshot, only kept if the test fails
+                self.save_screenshot(f"unloaded {self.name}", buffered=True)
             return True
 
+    def _document_has_changed(self):
+        """
+            Poll whether the browser's document is still the one this page
+            object's document token was tagged on, for up to
+            `unload_token_timeout` seconds, because the navigation may still
+            be in flight.
+
+            :return: bool, True if the browser has a different document
+        """
+        def new_document(driver):
+            return utils_selenium.get_document_token(driver) != self.document_token
+
+        try:
+            # while the old document is torn down, reading the token can
+            # fail; that counts as not changed yet
+            return waits.wait_until(self.driver, new_document,
+                                    timeout=self.unload_token_timeout,
+                                    name='document token',
+                                    ignored_exceptions=(WebDriverException,))
+        except TimeoutException:
+            # same document, e.g. an SPA transition; let the unload checks decide
+            return False
+
     def verify_load_by_elements(self, waitfor=30, screenshot=False, verbose=False):
         """
             Check that the current page displayed in the browser
@@ -304,10 +528,13 @@ class RootPageObject(object):
             [(False, By.CSS_SELECTOR, '#layoutVnsContent ul')]
 
             The available load checks are:
-                checks.expect_element_to_be_present(): Triggered by `True`
-                    as the first value in the self.load_checks
-                checks.expect_element_to_be_gone(): Triggered by `False`
-                    as the first value in the self.load_checks
+                `True` as the first value: expect the element to be present
+                    (and to contain the text, if there is a 4th value)
+                `False` as the first value: expect the element to be gone
+
+            All the checks are evaluated together by one in-browser probe,
+            which is polled until every check is satisfied or `waitfor` runs
+            out; see checks.expect_elements().
 
             :param waitfor: int, wait time page load verification, defaults to 30 seconds
             :param screenshot: bool, whether to take screenshot if check fails
@@ -328,26 +555,15 @@ class RootPageObject(object):
             logger.warning(msg)
             return False
 
-        # set up list of found problems; staying empty means no problems found
-        found_problems = []
         load_checks = self.load_checks
         logger.info(f"\nLoad checks for '{self.name}':\n{load_checks}.")
-
-        # loop over the load checks and collect the results
-        for check in load_checks:
-            if verbose:
+        if verbose:
+            for check in load_checks:
                 logger.info(f"\n====> load check: {check} for '{self.name}'")
-            # not pythonic, but also not ambiguous: 'True' means "should be present"
-            if check[0] == True:  # noqa: E712
-                res = checks.expect_element_to_be_present(self, check, waitfor)
-                if res:
-                    # there's problem, so add the check to our collection
-                    found_problems.append(res)
-            else:  # 'False' means "should NOT be present"
-                res = checks.expect_element_to_be_gone(self, check, waitfor)
-                if res:
-                    # there's problem, so add the check to our collection
-                    found_problems.append(res)
+
+        # evaluate the load checks together and collect the problems;
+        # staying empty means no problems found
+        found_problems = checks.expect_elements(self, load_checks, waitfor)
 
         # loop over the errors and set up the PageLoadException object
         if found_problems:
@@ -367,7 +583,28 @@ class RootPageObject(object):
         else:
             return True
 
-    def verify_self(self, verbose=False):
+    def snapshot_state(self, cookies=True, metrics=False):
+        """
+            Snapshot the browser's state for this page (readyState, url,
+            title, webstorage, and optionally cookies and Chrome metrics)
+            in as few WebDriver round trips as possible, and keep it as
+            this page object's `state`.
+
+            See welkin/framework/utils_selenium.py::get_page_state()
+
+            :param cookies: bool, whether to get the cookies; defaults to True
+            :param metrics: bool, whether to get Chrome's performance metrics;
+                                  defaults to False
+            :return state: utils_selenium.PageState instance
+        """
+        self.state = utils_selenium.get_page_state(self.driver, cookies=cookies,
+                                                   metrics=metrics)
+        self.document_token = self.state.document_token
+        if cookies:
+            self.cookies = self.state.cookies
+        return self.state
+
+    def verify_self(self, verbose=False, state=None):
         """
             Check that we are on the expected page by looking at a list of
             possible checks for page elements and values.
@@ -386,11 +623,16 @@ class RootPageObject(object):
             PageIdentityException. These messages indicate that the page
             reloaded on submit.
 
+            Pass a `state` snapshot (see snapshot_state()) to check it
+            rather than asking the driver for each value.
+
             :param verbose: bool, whether to output additional logging
+            :param state: utils_selenium.PageState instance; defaults to None
             :return: True if valid, else raise exception
         """
+        current_url = state.url if state else self.driver.current_url
         logger.info(f"\nAttempting to verify identity for "
-                    f"'{self.name}': '{self.driver.current_url}'.")
+                    f"'{self.name}': '{current_url}'.")
 
         # set up list of validation results
         validations = []
@@ -403,13 +645,13 @@ class RootPageObject(object):
         for id_check in identity_checks:
             try:
                 if id_check == 'check_title':
-                    validations.append(checks.check_title(self))
+                    validations.append(checks.check_title(self, state))
                 elif id_check == 'check_url':
-                    validations.append(checks.check_url(self))
+                    validations.append(checks.check_url(self, state))
                 elif id_check == 'check_exact_url':
-                    validations.append(checks.check_exact_url(self))
+                    validations.append(checks.check_exact_url(self, state))
                 elif id_check == 'check_url_chunks':
-                    validations.extend(checks.check_url_chunks(self))  # returns list
+                    validations.extend(checks.check_url_chunks(self, state))  # returns list
             except NoSuchElementException as e:  # exits on first exception
                 # we couldn't even find the element we want to use to validate
                 # identity, which is a bad sign
@@ -436,7 +678,7 @@ class RootPageObject(object):
                 logger.info(f"\nSuccessfully verified identity for '{self.name}'")
             return True
 
-    def save_screenshot(self, filename=''):
+    def save_screenshot(self, filename='', buffered=False):
         """
             Wrap the driver's screenshot functionality to generate and save
             the screenshot.
@@ -446,12 +688,15 @@ class RootPageObject(object):
 
             :param filename: str filename for the screenshot (not including
                              the path)
+            :param buffered: bool, only keep the screenshot if the test fails;
+                                   defaults to False
             :return: None
         """
         fname = filename if filename else self.name
         clean_name = utils.path_proof_name(fname)
         logger.info(f"Generating screenshot for '{clean_name}'.")
-        utils_selenium.take_and_save_screenshot(self.driver, clean_name)
+        utils_selenium.take_and_save_screenshot(self.driver, clean_name,
+                                                buffered=buffered)
 
     def save_source(self, filename=''):
         """
@@ -469,7 +714,7 @@ class RootPageObject(object):
         logger.info(f"Saving page source for '{clean_name}'.")
         utils_selenium.get_and_save_source(self.driver, clean_name)
 
-    def save_cookies(self, filename=''):
+    def save_cookies(self, filename='', state=None):
         """
             Get the current page's cookies and save to a file.
 
@@ -481,14 +726,19 @@ class RootPageObject(object):
 
             :param filename: str filename for the log file;
                              defaults to PO name
+            :param state: PageState snapshot with cookies to write; defaults
+                          to None, to get the cookies from the driver
             :return: None
         """
         # set the cleaned file name
         fname = filename if filename else self.name
         clean_name = utils.path_proof_name(fname)
 
-        # get the cookies from the driver and save to the PO
-        self.cookies = self.driver.get_cookies()
+        # get the cookies from the snapshot or the driver and save to the PO
+        if state and state.cookies is not None:
+            self.cookies = state.cookies
+        else:
+            self.cookies = self.driver.get_cookies()
 
         utils_file.write_cookies_to_file(self.cookies, self.url,
                                          fname=clean_name)
@@ -529,12 +779,14 @@ class RootPageObject(object):
             logger.warning(f"Cannot access chrome logs for "
                            f"{pytest.custom_namespace['browser']}.")
 
-    def save_chrome_metrics(self, filename=''):
+    def save_chrome_metrics(self, filename='', state=None):
         """
             Grab the Chrome driver metrics log and write them to files.
 
             :param filename: str filename for the log file;
                              defaults to PO name
+            :param state: PageState snapshot with metrics to write; defaults
+                          to None, to get the metrics from the driver
             :return:
         """
         # set the cleaned file name
@@ -544,8 +796,11 @@ class RootPageObject(object):
         if pytest.custom_namespace['devtools_supported']:
             logger.info("\nWriting browser metrics logs.")
             # get the log
-            metrics_log = utils_selenium.\
-                get_metrics_log(pageobject=self)
+            if state and state.metrics is not None:
+                metrics_log = state.metrics
+            else:
+                metrics_log = utils_selenium.\
+                    get_metrics_log(pageobject=self)
 
             # write the raw performance logs to /network
             utils_file.write_metrics_log_to_file(log=metrics_log,
@@ -555,7 +810,7 @@ class RootPageObject(object):
             logger.warning(f"\nCannot access browser metrics logs for "
                            f"{pytest.custom_namespace['browser']}.")
 
-    def save_webstorage(self, event, set_this_event=True):
+    def save_webstorage(self, event, set_this_event=True, state=None):
         """
             Get the localStorage and sessionStorage for the current page (if
             available), and then write them to logfiles.
@@ -568,9 +823,14 @@ class RootPageObject(object):
 
             :param event: str, name of the event
             :param set_this_event: bool, true to call set_event for this event
+            :param state: PageState snapshot with the webstorage to write;
+                          defaults to None, to get it from the browser
             :return: None
         """
-        data = utils_selenium.get_webstorage(self)
+        if state:
+            data = state.webstorage
+        else:
+            data = utils_selenium.get_webstorage(self)
         if set_this_event:
             self.set_event(event)
         utils_file.write_webstorage_to_files(data,
@@ -620,7 +880,9 @@ class RootPageObject(object):
             'on page': page_name if page_name else self.name
         }
 
-        logger.info(f"\nbrowser interaction event:\n{utils.plog(this_event)}")
+        logger.info("\nbrowser interaction event:\n%s", utils.lazy_plog(this_event),
+                    extra=utils_logging.record_fields(pageobject=this_event['on page'],
+                                                      event=event_name))
 
     # #######################################
     # page object transition methods
@@ -651,7 +913,6 @@ class RootPageObject(object):
         driver = self.driver  # minor disambiguation
 
         # perform the click action
-        wait = WebDriverWait(driver, 20)
         if change_url:
             old_url = self.url
             logger.info(f"Old url: {old_url}")
@@ -665,7 +926,8 @@ class RootPageObject(object):
                 # expect a redirect
                 try:
                     self._click_element(element, name, **actions)
-                    wait.until(EC.url_to_be(target_url))
+                    waits.wait_until(driver, EC.url_to_be(target_url), timeout=20,
+                                     name='url redirect')
                     new_url = driver.current_url
                     logger.info(f"New url: {new_url}")
                 except TimeoutException:
@@ -680,7 +942,8 @@ class RootPageObject(object):
             else:
                 try:
                     self._click_element(element, name, **actions)
-                    wait.until(EC.url_changes(old_url))
+                    waits.wait_until(driver, EC.url_changes(old_url), timeout=20,
+                                     name='url change')
                     new_url = driver.current_url
                     logger.info(f"New url: {new_url}")
                 except TimeoutException:
@@ -798,17 +1061,21 @@ class RootPageObject(object):
         element.clear()
         self.set_event(event)
 
-    def _hard_clear_field_value(self, element, name):
+    def _hard_clear_field_value(self, element, name, strategy='select_all'):
         """
             Wrap the selenium utility hard_clear_input_field().
 
             :param element: webdriver element
             :param name: str, identifier for element
+            :param strategy: str enum, how to clear the field, see
+                                       utils_selenium.CLEAR_STRATEGIES;
+                                       'keystrokes' is slow, so opt in to it
+                                       only for fields that need it
             :return element: webelement (after being cleared)
         """
         event = f"Hard cleared value for element '{name}'"
-        driver = self.driver
-        element = utils_selenium.hard_clear_input_field(driver, element, name)
+        element = utils_selenium.hard_clear_input_field(self, element, name,
+                                                        strategy=strategy)
         self.set_event(event)
         return element
 
@@ -828,6 +1095,64 @@ class RootPageObject(object):
         element.send_keys(content)
         self.set_event(msg if msg else event)
 
+    def fill_form(self, fields, form=None):
+        """
+            Set a whole form in one browser round trip, see
+            utils_selenium.fill_form(): every field gets its value through
+            the native setter plus focus, input, change and blur events, so
+            client-side validation still runs, and every value is read back
+            in the same call.
+
+            Fields that only behave with real keystrokes (e.g. masked or
+            autocomplete inputs) can be marked 'keystrokes': they are set
+            afterwards, one at a time, with _set_field_input().
+
+            Example usage:
+            >>> page.fill_form({
+            ...     'email': {'selector': '#email', 'value': 'a@b.com'},
+            ...     'remember me': {'selector': '#remember', 'value': True},
+            ...     'card number': {'selector': '#card', 'value': '4242 4242',
+            ...                     'keystrokes': True},
+            ... })
+
+            :param fields: dict, name: {'selector': str css selector,
+                                        'value': str, or bool for checkboxes
+                                                 and radio buttons,
+                                        'keystrokes': bool, optional}
+            :param form: webelement with the form; defaults to the whole page
+            :return results: dict, name: {'found': bool, 'value': actual value}
+        """
+        batched = {name: field for name, field in fields.items()
+                   if not field.get('keystrokes')}
+        results = {}
+        if batched:
+            results = utils_selenium.fill_form(self.driver, batched, root=form)
+            missing = [name for name, result in results.items() if not result['found']]
+            if missing:
+                err_msg = f"Form fields not found: {missing}"
+                logger.error(err_msg)
+                self.save_screenshot('form fields not found')
+                raise ControlInteractionException(err_msg)
+            for name, result in results.items():
+                if not result['value'] == batched[name]['value']:
+                    # as with _set_field_input(), the page may legitimately
+                    # clean up the entered value
+                    logger.warning(f"\nthe actual value '{result['value']}' of field "
+                                   f"'{name}' doesn't match the entered value "
+                                   f"'{batched[name]['value']}'")
+            self.set_event(f"Filled form fields {list(batched)}")
+
+        # the fields that need real keystrokes, one at a time
+        for name, field in fields.items():
+            if field.get('keystrokes'):
+                element = (form or self.driver).find_element(By.CSS_SELECTOR,
+                                                             field['selector'])
+                self._set_field_input(element, name, field['value'], clear=True)
+                results[name] = {'found': True, 'value': element.get_attribute('value')}
+
+        self.save_screenshot('after fill form')
+        return results
+
     def _set_field_input(self, element, name, content,
                          clear=False, click=True, unfocus=True, chunk=False):
         """
@@ -15,6 +15,63 @@ class NoAuthBasePageObject(BaseWrapperPageObject):
     """
     # str enum, either 'noauth' or 'auth', as appropriate
     page_auth_mode = 'noauth'
+    # map of top menu targets to selector and PO info
+    top_menu_links = {
+        'Home': {
+            'sel_stage1': (By.CSS_SELECTOR, "nav a.navbar-brand"),
+            'stage2': {
+                'Home': {
+                    'sel': (By.CSS_SELECTOR, "nav a.navbar-brand"),
+                    'po': 'sweetshop home page',
+                    'target': '/'
+                }
+            },
+        },
+        'Sweets': {
+            'sel_stage1': (By.XPATH, "//nav//a[text()='Sweets']"),
+            'stage2': {
+                'Sweets': {
+                    'sel': (By.XPATH, "//nav//a[text()='Sweets']"),
+                    'po': 'sweetshop sweets page',
+                    'target': '/sweets'
+                },
+            },
+        },
+        'About': {
+            'sel_stage1': (By.XPATH, "//nav//a[text()='About']"),
+            'stage2': {
+                'About': {
+                    'sel': (By.XPATH, "//nav//a[text()='About']"),
+                    'po': 'sweetshop about page',
+                    'target': '/about'
+                },
+            },
+        },
+        'Login': {
+            'sel_stage1': (By.XPATH, "//nav//a[text()='Login']"),
+            'stage2': {
+                'Login': {
+                    'sel': (By.XPATH, "//nav//a[text()='Login']"),
+                    'po': 'sweetshop login page',
+                    'target': '/login'
+                },
+            },
+        },
+        'Basket': {
+            'sel_stage1': (By.XPATH, "//nav//a[contains(text(), ' Basket')]"),
+            'stage2': {
+                'Basket': {
+                    'sel': (By.XPATH, "//nav//a[contains(text(), ' Basket')]"),
+                    'po': 'sweetshop basket page',
+                    'target': '/basket'
+                },
+            },
+        },
+    }
+    # the pages the top menu navigates to, for the navigation graph
+    nav_links = {stage2['po']: ('select_page_from_top_menu', target)
+                 for target, link in top_menu_links.items()
+                 for stage2 in link['stage2'].values()}
 
     def generate_nav_path(self, target):
         """
@@ -45,62 +102,8 @@ class NoAuthBasePageObject(BaseWrapperPageObject):
         # base = 'https://sweetshop.vivrichards.co.uk/'
 
         target1, target2 = self.generate_nav_path(destination)
-        # map of targets to selector and PO info
-        target_links = {
-            'Home': {
-                'sel_stage1': (By.CSS_SELECTOR, "nav a.navbar-brand"),
-                'stage2': {
-                    'Home': {
-                        'sel': (By.CSS_SELECTOR, "nav a.navbar-brand"),
-                        'po': 'sweetshop home page',
-                        'target': '/'
-                    }
-                },
-            },
-            'Sweets': {
-                'sel_stage1': (By.XPATH, "//nav//a[text()='Sweets']"),
-                'stage2': {
-                    'Sweets': {
-                        'sel': (By.XPATH, "//nav//a[text()='Sweets']"),
-                        'po': 'sweetshop sweets page',
-                        'target': '/sweets'
-                    },
-                },
-            },
-            'About': {
-                'sel_stage1': (By.XPATH, "//nav//a[text()='About']"),
-                'stage2': {
-                    'About': {
-                        'sel': (By.XPATH, "//nav//a[text()='About']"),
-                        'po': 'sweetshop about page',
-                        'target': '/about'
-                    },
-                },
-            },
-            'Login': {
-                'sel_stage1': (By.XPATH, "//nav//a[text()='Login']"),
-                'stage2': {
-                    'Login': {
-                        'sel': (By.XPATH, "//nav//a[text()='Login']"),
-                        'po': 'sweetshop login page',
-                        'target': '/login'
-                    },
-                },
-            },
-            'Basket': {
-                'sel_stage1': (By.XPATH, "//nav//a[contains(text(), ' Basket')]"),
-                'stage2': {
-                    'Basket': {
-                        'sel': (By.XPATH, "//nav//a[contains(text(), ' Basket')]"),
-                        'po': 'sweetshop basket page',
-                        'target': '/basket'
-                    },
-                },
-            },
-        }
-
         # get the stage1 nav target element
-        method, selector = target_links[target1]['sel_stage1']
+        method, selector = self.top_menu_links[target1]['sel_stage1']
         stage1 = self.driver.find_element(method, selector)
         logger.info(f"\nstage1 str: '{selector}'")
         logger.info(f"\nstage1 element text: '{stage1.text}'")
@@ -116,7 +119,7 @@ class NoAuthBasePageObject(BaseWrapperPageObject):
         # self.save_screenshot(f"click for target1")
 
         # get the stage2 nav target element
-        method, selector = target_links[target1]['stage2'][target2]['sel']
+        method, selector = self.top_menu_links[target1]['stage2'][target2]['sel']
         stage2_link = self.driver.find_element(method, selector)
         logger.info(f"\nstage2 str: '{selector}'")
         # self._goto_and_hover(stage2_link, name=target2)
@@ -128,7 +131,7 @@ class NoAuthBasePageObject(BaseWrapperPageObject):
         name = f"destination link {target2}"
 
         # get the page object identifier for the target page
-        po_selector = target_links[target1]['stage2'][target2]['po']
+        po_selector = self.top_menu_links[target1]['stage2'][target2]['po']
         logger.info(f"\nstage2 po_selector: '{po_selector}'")
 
         # click the primary link, which will load the new page object
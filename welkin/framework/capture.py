@@ -0,0 +1,77 @@
+"""
+    Capture profiles for page object transitions.
+
+    Every time RootPageObject.load_pageobject() syncs the page object model
+    with the browser, it can collect data about the page that was left and
+    the page that was loaded. Each kind of collection costs WebDriver round
+    trips (and the accessibility review injects and runs axe.core), so the
+    capture level picks a named profile that decides which collectors run:
+
+        minimal:  no collection; a fast smoke run
+        standard: screenshots, cookies, browser logs and webstorage
+        forensic: everything, including Chrome metrics and an accessibility
+                  review for every page (the default)
+
+    The level for the test run is set with the --capture_level command line
+    option; a page object class can override it for its own page by setting
+    its `capture_level` attribute.
+
+    Failure screenshots and logs are not affected by the capture level.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+# the collectors run by load_pageobject()
+UNLOAD_SCREENSHOT = 'unload screenshot'
+COOKIES = 'cookies'
+METRICS = 'metrics'
+BROWSER_LOGS = 'browser logs'
+WEBSTORAGE = 'webstorage'
+ACCESSIBILITY = 'accessibility'
+
+CAPTURE_PROFILES = {
+    'minimal': {
+        UNLOAD_SCREENSHOT: False,
+        COOKIES: False,
+        METRICS: False,
+        BROWSER_LOGS: False,
+        WEBSTORAGE: False,
+        ACCESSIBILITY: False,
+    },
+    'standard': {
+        UNLOAD_SCREENSHOT: True,
+        COOKIES: True,
+        METRICS: False,
+        BROWSER_LOGS: True,
+        WEBSTORAGE: True,
+        ACCESSIBILITY: False,
+    },
+    'forensic': {
+        UNLOAD_SCREENSHOT: True,
+        COOKIES: True,
+        METRICS: True,
+        BROWSER_LOGS: True,
+        WEBSTORAGE: True,
+        ACCESSIBILITY: True,
+    },
+}
+CAPTURE_LEVELS = list(CAPTURE_PROFILES)
+DEFAULT_CAPTURE_LEVEL = 'forensic'
+
+
+def get_profile(level=None):
+    """
+        Get the capture profile for a capture level.
+
+        :param level: str, name of the capture level; defaults to
+                           DEFAULT_CAPTURE_LEVEL
+        :return: dict, collector name: bool, whether the collector runs
+    """
+    level = level if level else DEFAULT_CAPTURE_LEVEL
+    try:
+        return CAPTURE_PROFILES[level]
+    except KeyError:
+        msg = f"Unknown capture level '{level}'; expected one of {CAPTURE_LEVELS}."
+        logger.error(msg)
+        raise ValueError(msg)
@@ -1,15 +1,116 @@
 import logging
 
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
 
+from welkin.framework import waits
+
 logger = logging.getLogger(__name__)
 
+# evaluate a list of load checks in the browser, see expect_elements();
+# elements are found the way WebDriver finds them, and are visible if
+# they take up space and aren't hidden or transparent
+LOAD_CHECKS_JS = """
+    var find = function (by, selector) {
+        switch (by) {
+            case 'css selector':
+                return document.querySelector(selector);
+            case 'id':
+                return document.getElementById(selector);
+            case 'name':
+                return document.getElementsByName(selector)[0] || null;
+            case 'class name':
+                return document.getElementsByClassName(selector)[0] || null;
+            case 'tag name':
+                return document.getElementsByTagName(selector)[0] || null;
+            case 'xpath':
+                return document.evaluate(selector, document, null,
+                    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            case 'link text':
+            case 'partial link text':
+                var links = document.getElementsByTagName('a');
+                for (var i = 0; i < links.length; i++) {
+                    var text = links[i].innerText.trim();
+                    if (by === 'link text' ? text === selector
+                                           : text.indexOf(selector) !== -1) {
+                        return links[i];
+                    }
+                }
+                return null;
+        }
+        throw new Error('unsupported locator strategy: ' + by);
+    };
+    var visible = function (element) {
+        if (!element || !element.getClientRects().length) {
+            return false;
+        }
+        var style = window.getComputedStyle(element);
+        return style.visibility !== 'hidden' && style.opacity !== '0';
+    };
+    return arguments[0].map(function (check) {
+        var element = find(check[1], check[2]);
+        if (!check[0]) {
+            // expect the element to be gone or not displayed
+            return !visible(element);
+        }
+        if (check.length > 3) {
+            // expect the text to be present in the element
+            return !!element &&
+                (element.innerText || element.textContent).indexOf(check[3]) !== -1;
+        }
+        return visible(element);
+    });
+"""
+
 
 # #######################################
 # load/unload checks
 # #######################################
+def expect_elements(pageobject, load_checks, waitfor=30):
+    """
+        Wait for every check in a list of load checks to be satisfied, by
+        polling a single in-browser probe that evaluates all of them at
+        once, so the worst case is one `waitfor` rather than one per check.
+
+        The check tuples are the 3- and 4-element tuples described in
+        expect_element_to_be_present() and expect_element_to_be_gone().
+
+        :param pageobject: page object for the calling page
+        :param load_checks: list of check tuples
+        :param waitfor: int, wait time for all the checks, defaults to
+                             30 seconds
+        :return problems: list of tuples of exception name + the original
+                          check tuple, for the checks that were not satisfied,
+                          as returned by expect_element_to_be_present() and
+                          expect_element_to_be_gone()
+    """
+    name = pageobject.name
+    probes = [list(check) for check in load_checks]
+    results = [False] * len(load_checks)
+
+    def all_satisfied(driver):
+        results[:] = driver.execute_script(LOAD_CHECKS_JS, probes)
+        return all(results)
+
+    try:
+        waits.wait_until(pageobject.driver, all_satisfied, timeout=waitfor,
+                         name='load checks', on_mutation=True)
+    except TimeoutException:
+        logger.error(f"Timed out waiting for the load checks on '{name}'")
+
+    problems = []
+    for check, result in zip(load_checks, results):
+        if result:
+            logger.info(f"\nVerified page load for '{name}' with check '{check}'")
+        elif check[0] == True:  # noqa: E712
+            msg = f"TimeoutException while attempting '{check[-1]}'"
+            logger.error(msg)
+            problems.append((msg, check))
+        else:
+            problems.append(('TimeoutException', check))
+    return problems
+
+
 def expect_element_to_be_present(pageobject, check, waitfor=30):
     """
         Wait for the element specified in the check to be present; optionally
@@ -38,14 +139,16 @@ def expect_element_to_be_present(pageobject, check, waitfor=30):
                                             original check tuple
     """
     name = pageobject.name
-    wait = WebDriverWait(pageobject.driver, waitfor)
+    driver = pageobject.driver
     try:
         if len(check) == 3:
-            wait.until(EC.visibility_of_element_located(check[1:]))
+            waits.wait_until(driver, EC.visibility_of_element_located(check[1:]),
+                             timeout=waitfor, name='element present', on_mutation=True)
             logger.info(f"\nVerified page load for '{name}': '{check[2]}' is visible.")
             return None
         else:  # 4-element check for expected text
-            wait.until(EC.text_to_be_present_in_element(check[1:3], check[3]))
+            waits.wait_until(driver, EC.text_to_be_present_in_element(check[1:3], check[3]),
+                             timeout=waitfor, name='element text', on_mutation=True)
             logger.info(f"\nVerified page load for '{name}': '{check[3]}' is present.")
             return None
 
@@ -76,14 +179,16 @@ def expect_element_to_be_gone(pageobject, check, waitfor=30):
         :return: if check fails, tuple of exception name + check tuple
     """
     name = pageobject.name
-    wait = WebDriverWait(pageobject.driver, waitfor)
+    driver = pageobject.driver
 
     try:
-        this = pageobject.driver.find_element(check[1], check[2])  # noqa: F841
+        this = driver.find_element(check[1], check[2])  # noqa: F841
         # good result!
         logger.info(f"\nUnload check '{check[1:]}' was not found.")
         try:
-            wait.until_not(EC.visibility_of_element_located(check[1:]))
+            waits.wait_until(driver, EC.visibility_of_element_located(check[1:]),
+                             timeout=waitfor, name='element gone', negate=True,
+                             on_mutation=True)
             logger.info(f"\nVerified page load for '{name}' with check '{check[1:]}'")
             # good result!
         except TimeoutException:
@@ -101,16 +206,30 @@ def expect_element_to_be_gone(pageobject, check, waitfor=30):
 # #######################################
 # identity checks
 # #######################################
-def check_exact_url(pageobject):
+def _get_current_url(pageobject, state=None):
+    """
+        Get the browser's current URL from the page state snapshot, if
+        there is one, else from the driver.
+
+        :param pageobject: page object for the calling page
+        :param state: utils_selenium.PageState instance, or None
+        :return: str, current URL
+    """
+    return state.url if state else pageobject.driver.current_url
+
+
+def check_exact_url(pageobject, state=None):
     """
         Look at the entire current URL; the expected URL should match the
         actual URL. Use this if there will be no query string or the query
         string is predictable.
 
         :param pageobject: page object for the calling page
+        :param state: PageState snapshot to check; defaults to None, to
+                      ask the driver
         :return: bool, True if the check evaluated to True, else False
     """
-    actual_url = pageobject.driver.current_url
+    actual_url = _get_current_url(pageobject, state)
     if not pageobject.url == actual_url:
         msg = f"Url exact check: expected '{pageobject.url}', " \
               f"got '{actual_url}'."
@@ -120,16 +239,18 @@ def check_exact_url(pageobject):
         return True
 
 
-def check_url(pageobject):
+def check_url(pageobject, state=None):
     """
         Look at the entire current URL and check whether the expected URL
         is contained in it. This works around unexpected or unpredictable
         string query args.
 
         :param pageobject: page object for the calling page
+        :param state: PageState snapshot to check; defaults to None, to
+                      ask the driver
         :return: bool, True if the check evaluated to True, else False
     """
-    actual_url = pageobject.driver.current_url
+    actual_url = _get_current_url(pageobject, state)
     if pageobject.url not in actual_url:
         msg = f"Url inclusion check: expected '{pageobject.url}' " \
               f"to be inside '{actual_url}'."
@@ -139,17 +260,19 @@ def check_url(pageobject):
         return True
 
 
-def check_url_chunks(pageobject):
+def check_url_chunks(pageobject, state=None):
     """
         Match a list of strings in the current URL. This method will
         perform a check for each chunk and then return a list of bool
         values corresponding to passed and failed checks.
 
         :param pageobject: page object for the calling page
+        :param state: PageState snapshot to check; defaults to None, to
+                      ask the driver
         :return chunk_checks: list of bool check results
     """
     chunk_checks = list()
-    actual_url = pageobject.driver.current_url
+    actual_url = _get_current_url(pageobject, state)
     for chunk in pageobject.url_chunks:
         if chunk not in actual_url:
             msg = f"Failed url chunks check: expected '{chunk}' " \
@@ -161,19 +284,23 @@ def check_url_chunks(pageobject):
     return chunk_checks
 
 
-def check_title(pageobject):
+def check_title(pageobject, state=None):
     """
         Look at the <title> tag value and wait for it to match the
         expected title value from the page object.
 
-        The wait is there to deal with any funkiness from SPA behavior.
+        The wait is there to deal with any funkiness from SPA behavior;
+        if the snapshot's title already matches, there's no need to wait.
 
         :param pageobject: page object for the calling page
+        :param state: PageState snapshot to check first; defaults to None
         :return: bool, True if the check evaluated to True, else False
     """
-    wait = WebDriverWait(pageobject.driver, 15)
+    if state and state.title == pageobject.title:
+        return True
     try:
-        wait.until(EC.title_is(pageobject.title))
+        waits.wait_until(pageobject.driver, EC.title_is(pageobject.title),
+                         timeout=15, name='title')
         return True
     except TimeoutException:
         logger.exception(TimeoutException)
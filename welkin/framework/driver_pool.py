@@ -0,0 +1,289 @@
+"""
+    A pool of warm browser drivers, so tests don't pay for a browser
+    launch every time.
+
+    The pool keeps idle drivers keyed by browser type. A test acquires a
+    driver from the pool (launching one if none is idle) and releases it
+    back when it is done. On release, the driver is reset to a blank state:
+        + every window is closed and replaced by one new, blank tab, which
+          drops the sessionStorage of every origin the test visited
+        + cookies, localStorage, IndexedDB and the other storage of every
+          origin are cleared, and the browser cache is emptied
+        + the window size is restored
+        + the DevTools state the launch set up for the old tab (performance
+          metrics, readiness instrumentation) is set up again for the new one
+
+    Clearing the storage of every origin needs the Chrome DevTools Protocol,
+    so only Chrome drivers are reset and pooled again; other drivers are
+    quit when released, so no storage leaks from one test to the next.
+
+    A driver is also quit rather than pooled again once it has been used
+    `max_uses` times, or if it can't be reset (e.g. the browser crashed or
+    the test quit the driver).
+
+    Every pytest-xdist worker is its own process, so every worker has its
+    own pool.
+
+    A DriverPrewarmer launches drivers on a background thread before they
+    are needed; the pool takes its new drivers from the prewarmer when it
+    has one ready.
+"""
+import logging
+import concurrent.futures
+
+from welkin.framework import utils_selenium
+
+logger = logging.getLogger(__name__)
+
+# how many tests can use a driver before it is replaced
+DEFAULT_MAX_USES = 20
+# the default window dimensions
+WINDOW_SIZE = (1030, 2200)
+
+# CDP origin for Storage.clearDataForOrigin that matches every origin
+ALL_ORIGINS = '*'
+
+
+class PooledDriver(object):
+    """
+        A driver in the pool, and how many tests have used it.
+    """
+    def __init__(self, driver, browser):
+        """
+            :param driver: webdriver instance
+            :param browser: str, browser type, e.g. 'chrome'
+        """
+        self.driver = driver
+        self.browser = browser
+        self.uses = 0
+
+    def __repr__(self):
+        return f"<PooledDriver '{self.browser}' session {self.driver.session_id} " \
+               f"uses {self.uses}>"
+
+
+class DriverPool(object):
+    """
+        Warm browser drivers keyed by browser type, see the module docstring.
+    """
+    def __init__(self, launch, max_uses=DEFAULT_MAX_USES, window_size=WINDOW_SIZE,
+                 prewarmer=None):
+        """
+            :param launch: callable, launch(browser, index) launches and returns
+                                     a configured driver for `browser`; index
+                                     counts the pool's launches from 1
+            :param max_uses: int, how many tests can use a driver
+            :param window_size: tuple, (width, height) restored on reset
+            :param prewarmer: DriverPrewarmer instance, source of new drivers
+                                                        before launching them
+        """
+        self.launch = launch
+        self.prewarmer = prewarmer
+        self.max_uses = max_uses
+        self.window_size = window_size
+        self.idle = {}
+        self.in_use = {}
+        self.launches = 0
+
+    def acquire(self, browser):
+        """
+            Get an idle driver for `browser`, or launch one.
+
+            :param browser: str, browser type, e.g. 'chrome'
+            :return: webdriver instance
+        """
+        idle = self.idle.get(browser, [])
+        if idle:
+            pooled = idle.pop()
+            logger.info(f"\nreusing pooled driver {pooled}.")
+        else:
+            driver = self.prewarmer.take(browser) if self.prewarmer else None
+            if not driver:
+                self.launches += 1
+                driver = self.launch(browser, self.launches)
+            pooled = PooledDriver(driver, browser)
+            logger.info(f"\nadded new driver to the pool {pooled}.")
+        pooled.uses += 1
+        self.in_use[id(pooled.driver)] = pooled
+        return pooled.driver
+
+    def release(self, driver, recycle=False):
+        """
+            Return a driver to the pool, after resetting it.
+
+            The driver is quit instead if `recycle` is set, if it has been
+            used `max_uses` times, or if it can't be reset.
+
+            :param driver: webdriver instance from acquire()
+            :param recycle: bool, true to quit the driver; defaults to False
+            :return: None
+        """
+        pooled = self.in_use.pop(id(driver))
+        if recycle:
+            logger.info(f"\nrecycling pooled driver {pooled} on request.")
+        elif pooled.uses >= self.max_uses:
+            logger.info(f"\nrecycling pooled driver {pooled} after "
+                        f"{self.max_uses} uses.")
+            recycle = True
+        elif not self.can_reset(driver):
+            logger.info(f"\nrecycling pooled driver {pooled}, its storage "
+                        f"can't be cleared for every origin.")
+            recycle = True
+        else:
+            try:
+                self.reset(driver)
+            except Exception as e:
+                # includes connection errors when the browser is gone
+                logger.warning(f"\nrecycling pooled driver {pooled}, "
+                               f"failed to reset: {e!r}")
+                recycle = True
+
+        if recycle:
+            self._quit(pooled)
+        else:
+            self.idle.setdefault(pooled.browser, []).append(pooled)
+
+    @staticmethod
+    def can_reset(driver):
+        """
+            Whether a driver can be reset to a blank state, which needs the
+            Chrome DevTools Protocol to clear the storage of every origin.
+
+            :param driver: webdriver instance
+            :return: bool
+        """
+        return hasattr(driver, 'execute_cdp_cmd')
+
+    def reset(self, driver):
+        """
+            Reset a driver to a blank state for the next test.
+
+            :param driver: webdriver instance that can_reset()
+            :return: None
+        """
+        # replace every window with one new blank tab; sessionStorage
+        # belongs to the tab, so this drops it for every origin
+        old_handles = driver.window_handles
+        driver.switch_to.new_window('tab')
+        new_handle = driver.current_window_handle
+        for handle in old_handles:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(new_handle)
+
+        # clear cookies, localStorage, IndexedDB, cache storage, service
+        # workers etc. for every origin the test visited, then the cache
+        driver.execute_cdp_cmd('Storage.clearDataForOrigin',
+                               {'origin': ALL_ORIGINS, 'storageTypes': 'all'})
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+
+        driver.set_window_size(*self.window_size)
+
+        # DevTools commands apply to the tab they were sent to, so the new
+        # tab needs the metrics domain and readiness instrumentation again
+        driver.execute_cdp_cmd('Performance.enable', {})
+        if getattr(driver, 'welkin_readiness_installed', False):
+            driver.welkin_readiness_installed = False
+            utils_selenium.install_readiness_instrumentation(driver)
+
+        # drain the logs, so the next test only gets its own entries
+        driver.get_log('performance')
+        driver.get_log('browser')
+        logger.info(f"\nreset driver session {driver.session_id}.")
+
+    def close(self):
+        """
+            Quit every driver in the pool.
+
+            :return: None
+        """
+        for browser, idle in self.idle.items():
+            for pooled in idle:
+                self._quit(pooled)
+        self.idle = {}
+        for pooled in self.in_use.values():
+            self._quit(pooled)
+        self.in_use = {}
+
+    def _quit(self, pooled):
+        """
+            Quit a pooled driver, which may already be dead.
+
+            :param pooled: PooledDriver instance
+            :return: None
+        """
+        try:
+            pooled.driver.quit()
+            logger.info(f"\nquit pooled driver {pooled}.")
+        except Exception as e:
+            logger.warning(f"\nfailed to quit pooled driver {pooled}: {e!r}")
+
+
+class DriverPrewarmer(object):
+    """
+        Launch browser drivers ahead of time on a background thread, so a
+        driver is ready when the test that needs it is set up.
+
+        At most one prewarmed driver is kept per browser type. A prewarmed
+        driver that is never taken is quit by close().
+    """
+    def __init__(self, launch):
+        """
+            :param launch: callable, launch(browser, index) launches and returns
+                                     a configured driver for `browser`; index
+                                     counts the prewarmer's launches from 1
+        """
+        self.launch = launch
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='welkin-prewarm')
+        self.pending = {}
+        self.launches = 0
+
+    def start(self, browser):
+        """
+            Start launching a driver for `browser` in the background, unless
+            one is already launching or waiting to be taken.
+
+            :param browser: str, browser type, e.g. 'chrome'
+            :return: None
+        """
+        if browser in self.pending:
+            return
+        self.launches += 1
+        logger.info(f"\nprewarming '{browser}' driver {self.launches}.")
+        self.pending[browser] = self.executor.submit(self.launch, browser, self.launches)
+
+    def take(self, browser):
+        """
+            Take the prewarmed driver for `browser`, waiting for it to finish
+            launching if needed.
+
+            :param browser: str, browser type, e.g. 'chrome'
+            :return: webdriver instance, or None if there isn't one
+        """
+        future = self.pending.pop(browser, None)
+        if not future:
+            return None
+        try:
+            driver = future.result()
+        except Exception as e:
+            logger.warning(f"\nfailed to prewarm '{browser}' driver: {e!r}")
+            return None
+        logger.info(f"\ntook prewarmed '{browser}' driver session {driver.session_id}.")
+        return driver
+
+    def close(self):
+        """
+            Quit every prewarmed driver that wasn't taken.
+
+            :return: None
+        """
+        for browser in list(self.pending):
+            driver = self.take(browser)
+            if driver:
+                try:
+                    driver.quit()
+                except Exception as e:
+                    logger.warning(f"\nfailed to quit prewarmed driver: {e!r}")
+        self.executor.shutdown(wait=True)
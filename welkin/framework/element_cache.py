@@ -0,0 +1,151 @@
+"""
+    A per-page-object cache of located web elements.
+
+    Page object helpers tend to look up the same selectors over and over
+    while the browser is on one page. The cache keeps the element found
+    for each (by, selector) pair, so a repeat lookup costs no WebDriver
+    round trip.
+
+    Lists of elements are not cached: the page can add or remove matching
+    elements at any time, so find_elements() always looks them up again,
+    and only wraps them as CachedElements.
+
+    Cached elements are CachedElement instances, which are WebElements
+    that re-find themselves when the page has re-rendered them: a command
+    that fails with StaleElementReferenceException is retried once, with
+    the element located again by its selector.
+
+    Each page object instance has its own cache (see
+    RootPageObject.find_element()), and load_pageobject() invalidates the
+    cache of the page that is being left. Hits and misses are counted in
+    the run metrics as 'element cache hit' and 'element cache miss'.
+"""
+import logging
+
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.common.exceptions import NoSuchElementException
+
+from welkin.framework import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class CachedElement(WebElement):
+    """
+        A WebElement that re-locates itself when it has gone stale.
+    """
+    def __init__(self, element, locate):
+        """
+            :param element: WebElement instance
+            :param locate: callable, locate() returns a fresh WebElement for
+                                     the same selector
+        """
+        super().__init__(element.parent, element.id)
+        self._locate = locate
+
+    def relocate(self):
+        """
+            Locate the element again, after it has gone stale.
+
+            :return: None
+        """
+        try:
+            element = self._locate()
+        except NoSuchElementException as e:
+            raise StaleElementReferenceException(
+                f"cached element is gone and can't be re-found: {e.msg}")
+        self._id = element.id
+        metrics.increment('element cache refind')
+        logger.info(f"\nre-found stale cached element {self._id}.")
+
+    def _retry(self, method, *args, **kwargs):
+        """
+            Call `method`, and again after re-locating the element if the
+            element was stale.
+        """
+        try:
+            return method(*args, **kwargs)
+        except StaleElementReferenceException:
+            self.relocate()
+            return method(*args, **kwargs)
+
+    def _execute(self, command, params=None):
+        return self._retry(super()._execute, command, params)
+
+    # these run javascript with the element as an argument, rather
+    # than an element command
+    def get_attribute(self, name):
+        return self._retry(super().get_attribute, name)
+
+    def is_displayed(self):
+        return self._retry(super().is_displayed)
+
+    def submit(self):
+        return self._retry(super().submit)
+
+
+class ElementCache(object):
+    """
+        Elements located by a page object, keyed by (by, selector).
+    """
+    def __init__(self, driver):
+        """
+            :param driver: webdriver instance
+        """
+        self.driver = driver
+        self.elements = {}
+
+    def find_element(self, by, selector):
+        """
+            Get the first element for a selector, from the cache if it's there.
+
+            :param by: str, selenium By strategy, e.g. By.CSS_SELECTOR
+            :param selector: str, selector for the strategy
+            :return: CachedElement instance
+        """
+        key = (by, selector)
+        if key in self.elements:
+            metrics.increment('element cache hit')
+            return self.elements[key]
+        metrics.increment('element cache miss')
+
+        def locate():
+            return self.driver.find_element(by, selector)
+
+        element = CachedElement(locate(), locate)
+        self.elements[key] = element
+        return element
+
+    def find_elements(self, by, selector):
+        """
+            Get every element for a selector. The list is always looked up
+            again, never taken from the cache, because the page may have
+            added or removed matching elements since the last lookup.
+
+            An element in the list that goes stale is re-found by its
+            position in a fresh lookup of the selector.
+
+            :param by: str, selenium By strategy, e.g. By.CSS_SELECTOR
+            :param selector: str, selector for the strategy
+            :return: list of CachedElement instances
+        """
+        def locator(index):
+            def locate():
+                found = self.driver.find_elements(by, selector)
+                if index >= len(found):
+                    raise NoSuchElementException(
+                        f"only {len(found)} elements for '{selector}'")
+                return found[index]
+            return locate
+
+        return [CachedElement(element, locator(index))
+                for index, element in enumerate(self.driver.find_elements(by, selector))]
+
+    def invalidate(self):
+        """
+            Forget every cached element, e.g. because the page has changed.
+
+            :return: None
+        """
+        self.elements = {}
@@ -84,6 +84,17 @@ class PageIdentityException(Exception):
         self.errors = errors
 
 
+class RoutingException(Exception):
+    """
+        Raise this exception when a page object can't be resolved from the
+        routings, or when the routings map to modules or classes that
+        don't exist. Capture the errors and make them available.
+    """
+    def __init__(self, errors=None):
+        Exception.__init__(self, errors)
+        self.errors = errors
+
+
 class ControlInteractionException(Exception):
     """
         Raise this exception when an interaction with a control
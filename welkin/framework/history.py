@@ -0,0 +1,137 @@
+"""
+    Performance history: timings from every test run, appended to a local
+    SQLite database, so regressions in the framework and in the apps under
+    test can be found across many runs.
+
+    While tests run, timings are collected in memory:
+        + 'phase'       setup, call and teardown duration of each test
+        + 'fixture'     setup cost of each fixture
+        + 'page load'   load_pageobject() duration of each page object
+        + 'endpoint'    latency of each RootEndpoint GET and POST
+    At the end of the run they are written to the `timings` table in one
+    transaction, with the run's timestamp, tier and browser. Every
+    pytest-xdist worker writes its own rows.
+
+    Typical usage from framework code:
+    >>> from welkin.framework import history
+    >>> history.record('page load', 'sweetshop home page', 1.42)
+
+    And to find the slowest page loads across runs:
+        $ sqlite3 welkin/output/history.sqlite "select name, avg(duration)
+          from timings where kind = 'page load' group by name order by 2 desc"
+"""
+import logging
+import sqlite3
+import threading
+import time
+
+from welkin.framework import runcontext
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DB_NAME = 'history.sqlite'
+# seconds to wait for another xdist worker to finish writing
+DB_TIMEOUT = 30
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS timings (
+        run_timestamp TEXT NOT NULL,
+        tier TEXT,
+        browser TEXT,
+        worker TEXT,
+        kind TEXT NOT NULL,
+        name TEXT NOT NULL,
+        nodeid TEXT,
+        duration REAL NOT NULL,
+        failed INTEGER NOT NULL DEFAULT 0,
+        recorded REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS timings_run
+        ON timings (run_timestamp, tier, browser);
+    CREATE INDEX IF NOT EXISTS timings_kind_name
+        ON timings (kind, name);
+"""
+
+
+class History(object):
+    """
+        Timings collected during a test run, waiting to be written.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.samples = []
+        self._lock = threading.Lock()
+
+    def record(self, kind, name, duration, failed=False, nodeid=None):
+        """
+            Collect one timing, if history is enabled for this run.
+
+            :param kind: str, e.g. 'phase', 'fixture', 'page load', 'endpoint'
+            :param name: str, what was timed, e.g. the page object's name
+            :param duration: float, seconds
+            :param failed: bool, whether the timed thing failed; defaults to False
+            :param nodeid: str, pytest node id; defaults to the current test case's
+            :return: None
+        """
+        if not self.enabled:
+            return
+        if nodeid is None:
+            testcase = runcontext.current_testcase(required=False)
+            nodeid = testcase.nodeid if testcase else None
+        with self._lock:
+            self.samples.append((kind, name, nodeid, duration, int(failed), time.time()))
+
+    def write(self, path, run_timestamp, tier, browser):
+        """
+            Append the collected timings to the history database, and
+            forget them.
+
+            :param path: str or Path, the SQLite database file
+            :param run_timestamp: str, the test run's timestamp
+            :param tier: str, tier the tests ran against
+            :param browser: str, browser the tests ran in
+            :return: int, number of rows written
+        """
+        with self._lock:
+            samples, self.samples = self.samples, []
+        if not samples:
+            return 0
+        worker = runcontext.get_worker_id()
+        rows = [(run_timestamp, tier, browser, worker) + sample for sample in samples]
+        # the history is a by-product of the run, so a database problem
+        # is logged rather than failing the run
+        try:
+            connection = sqlite3.connect(str(path), timeout=DB_TIMEOUT)
+            try:
+                connection.executescript(SCHEMA)
+                with connection:
+                    connection.executemany(
+                        "INSERT INTO timings (run_timestamp, tier, browser, worker, "
+                        "kind, name, nodeid, duration, failed, recorded) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            logger.error(f"\ncouldn't write {len(rows)} timings to the history "
+                         f"database {path}: {e}")
+            return 0
+        logger.info(f"\nwrote {len(rows)} timings to the history database {path}.")
+        return len(rows)
+
+
+# the timings for this test run, in this worker process
+run_history = History()
+
+
+def record(kind, name, duration, failed=False, nodeid=None):
+    """
+        Collect one timing for the test run, see History.record().
+
+        :param kind: str, e.g. 'phase', 'fixture', 'page load', 'endpoint'
+        :param name: str, what was timed
+        :param duration: float, seconds
+        :param failed: bool, whether the timed thing failed; defaults to False
+        :param nodeid: str, pytest node id; defaults to the current test case's
+        :return: None
+    """
+    run_history.record(kind, name, duration, failed=failed, nodeid=nodeid)
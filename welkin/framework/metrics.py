@@ -0,0 +1,124 @@
+"""
+    Run metrics: latency statistics and counters collected by the framework
+    while tests run, e.g. how long each kind of wait took.
+
+    Every sample is recorded twice: in the current test case's metrics (on
+    its run context, see runcontext.py) and in the totals for the whole
+    test run (in this worker process).
+
+    Typical usage from framework code:
+    >>> from welkin.framework import metrics
+    >>> metrics.record('wait readystate', 0.12)
+    >>> metrics.increment('element cache hit')
+"""
+import logging
+import threading
+
+from welkin.framework import runcontext
+
+logger = logging.getLogger(__name__)
+
+
+class Metrics(object):
+    """
+        Latency statistics (count, total, min, max, failures) and counters,
+        by name.
+    """
+    def __init__(self):
+        self.stats = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, value, failed=False):
+        """
+            Record one sample, e.g. the seconds one wait took.
+
+            :param name: str, what was measured
+            :param value: float, the measurement
+            :param failed: bool, whether the measured thing failed,
+                                 e.g. timed out; defaults to False
+            :return: None
+        """
+        with self._lock:
+            stat = self.stats.get(name)
+            if not stat:
+                stat = {'count': 0, 'total': 0.0, 'min': value, 'max': value,
+                        'failed': 0}
+                self.stats[name] = stat
+            stat['count'] += 1
+            stat['total'] += value
+            stat['min'] = min(stat['min'], value)
+            stat['max'] = max(stat['max'], value)
+            if failed:
+                stat['failed'] += 1
+
+    def increment(self, name, count=1):
+        """
+            Add to a counter.
+
+            :param name: str, what was counted
+            :param count: int, how much to add; defaults to 1
+            :return: None
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + count
+
+    def summary(self):
+        """
+            Summarize the metrics, with the mean of each statistic.
+
+            :return: dict, name: statistic dict or counter int
+        """
+        with self._lock:
+            data = {}
+            for name, stat in sorted(self.stats.items()):
+                data[name] = dict(stat, mean=stat['total'] / stat['count'])
+            data.update(sorted(self.counters.items()))
+        return data
+
+
+# the totals for this test run, in this worker process
+run_metrics = Metrics()
+
+
+def get_testcase_metrics():
+    """
+        Get the metrics for the current test case, if a test is running.
+
+        :return: Metrics instance, or None if no test case is bound
+    """
+    testcase = runcontext.current_testcase(required=False)
+    if not testcase:
+        return None
+    if testcase.metrics is None:
+        testcase.metrics = Metrics()
+    return testcase.metrics
+
+
+def record(name, value, failed=False):
+    """
+        Record one sample for the current test case and the test run.
+
+        :param name: str, what was measured
+        :param value: float, the measurement
+        :param failed: bool, whether the measured thing failed; defaults to False
+        :return: None
+    """
+    run_metrics.record(name, value, failed=failed)
+    testcase_metrics = get_testcase_metrics()
+    if testcase_metrics:
+        testcase_metrics.record(name, value, failed=failed)
+
+
+def increment(name, count=1):
+    """
+        Add to a counter for the current test case and the test run.
+
+        :param name: str, what was counted
+        :param count: int, how much to add; defaults to 1
+        :return: None
+    """
+    run_metrics.increment(name, count=count)
+    testcase_metrics = get_testcase_metrics()
+    if testcase_metrics:
+        testcase_metrics.increment(name, count=count)
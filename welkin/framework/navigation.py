@@ -0,0 +1,196 @@
+"""
+    The navigation graph for the page object model, and a planner that
+    finds the cheapest way to get from one page to another.
+
+    The graph is built from the routing registry (see routing.py):
+        + every page object in a wrapper's routings is a node
+        + a node is URL-addressable if its class has a `domain` and a
+          `url_path`; the browser can be sent straight there with
+          driver.get()
+        + the edges come from the page object's `nav_links` class attribute,
+          which maps a target po_id to the click helper (and its args) that
+          navigates there, e.g.:
+            nav_links = {
+                'sweetshop sweets page': ('select_page_from_top_menu', 'Sweets'),
+            }
+
+    Every step of a plan costs one page load, so the planner picks the
+    shorter of:
+        + the shortest click path from the current page
+        + a driver.get() to a URL-addressable page, then the shortest click
+          path from there (just the get, if the target is URL-addressable)
+
+    A plan is a list of steps:
+        ('get', po_id, url)             load the page by its url
+        ('click', po_id, method, args)  call the click helper on the current
+                                        page object, which returns po_id
+"""
+import logging
+from collections import deque
+
+from welkin.framework import routing
+from welkin.framework.exceptions import RoutingException
+
+logger = logging.getLogger(__name__)
+
+# the graph for this test run, see get_graph()
+_graph = None
+
+
+class NavigationGraph(object):
+    """
+        Page objects and the navigation between them, per wrapper routings
+        module and auth mode.
+    """
+    def __init__(self):
+        # (routings module, auth mode) --> {po_id: url or None}
+        self.urls = {}
+        # (routings module, auth mode) --> {po_id: {target po_id: (method, args)}}
+        self.edges = {}
+
+    def build(self, registry):
+        """
+            Build the graph from the page object classes in `registry`, and
+            validate that every nav link targets a page object in the same
+            routings and names a method on the page object.
+
+            :param registry: RoutingRegistry instance
+            :return: None
+        """
+        errors = []
+        for (routings_path, auth_mode, po_id), pageobject_class in registry.routes.items():
+            key = (routings_path, auth_mode)
+            self.urls.setdefault(key, {})[po_id] = get_url(pageobject_class)
+            links = {}
+            for target, link in (getattr(pageobject_class, 'nav_links', None) or {}).items():
+                method, args = link[0], tuple(link[1:])
+                if (routings_path, auth_mode, target) not in registry.routes:
+                    errors.append(f"{routings_path} ({auth_mode}) '{po_id}': "
+                                  f"nav link to unknown page object '{target}'")
+                elif not callable(getattr(pageobject_class, method, None)):
+                    errors.append(f"{routings_path} ({auth_mode}) '{po_id}': "
+                                  f"nav link to '{target}' has no method '{method}'")
+                else:
+                    links[target] = (method, args)
+            self.edges.setdefault(key, {})[po_id] = links
+        if errors:
+            msg = "Invalid page object nav links:\n" + '\n'.join(errors)
+            logger.error(msg)
+            raise RoutingException(errors=msg)
+
+    def plan(self, routings_path, auth_mode, start, target):
+        """
+            Plan the cheapest navigation from page object `start` to
+            page object `target`.
+
+            :param routings_path: str, dotted path of the wrapper's routings module
+            :param auth_mode: str enum, 'noauth' or 'auth'
+            :param start: str, po_id of the current page, or None if the
+                               browser isn't on a page in the model
+            :param target: str, po_id of the destination page
+            :return steps: list of tuples, see the module docstring
+        """
+        key = (routings_path, auth_mode)
+        urls = self.urls.get(key, {})
+        edges = self.edges.get(key, {})
+        if target not in urls:
+            msg = f"No {auth_mode} page object '{target}' in {routings_path}."
+            logger.error(msg)
+            raise RoutingException(errors=msg)
+        if start == target:
+            return []
+
+        # shortest click path from the current page
+        steps = None
+        if start in edges:
+            found = self._shortest_clicks(edges, [start], target)
+            if found:
+                steps = found[1]
+
+        # or load a URL-addressable page first; the sources are searched
+        # together, so the one nearest the target wins; on a tie with the
+        # click path, prefer the direct load
+        sources = [po_id for po_id, url in urls.items() if url]
+        found = self._shortest_clicks(edges, sources, target)
+        if found:
+            source, clicks = found
+            direct = [('get', source, urls[source])] + clicks
+            if steps is None or len(direct) <= len(steps):
+                steps = direct
+
+        if steps is None:
+            msg = f"No navigation path from '{start}' to '{target}' in {routings_path}."
+            logger.error(msg)
+            raise RoutingException(errors=msg)
+        logger.info(f"\nnavigation plan '{start}' --> '{target}': "
+                    f"{' --> '.join(step[1] for step in steps)}")
+        return steps
+
+    @staticmethod
+    def _shortest_clicks(edges, sources, target):
+        """
+            Breadth-first search for the shortest click path from any of
+            `sources` to `target`.
+
+            :param edges: dict, po_id: {target po_id: (method, args)}
+            :param sources: list of str, po_ids to start from
+            :param target: str, po_id of the destination page
+            :return: tuple (source po_id, list of click steps), or None if
+                     `target` can't be reached
+        """
+        previous = {source: None for source in sources}
+        queue = deque(sources)
+        while queue:
+            po_id = queue.popleft()
+            if po_id == target:
+                steps = []
+                while previous[po_id] is not None:
+                    parent, method, args = previous[po_id]
+                    steps.append(('click', po_id, method, args))
+                    po_id = parent
+                return po_id, list(reversed(steps))
+            for next_po_id, (method, args) in edges.get(po_id, {}).items():
+                if next_po_id not in previous:
+                    previous[next_po_id] = (po_id, method, args)
+                    queue.append(next_po_id)
+        return None
+
+
+def get_url(pageobject_class):
+    """
+        Get the url for a page object class, if the page can be loaded
+        directly by url.
+
+        :param pageobject_class: page object class
+        :return: str url, or None
+    """
+    domain = getattr(pageobject_class, 'domain', None)
+    url_path = getattr(pageobject_class, 'url_path', None)
+    if domain and url_path is not None:
+        return f"https://{domain}{url_path}"
+    return None
+
+
+def build_graph(registry=None):
+    """
+        Build and validate the navigation graph for this test run.
+
+        :param registry: RoutingRegistry instance; defaults to the run's registry
+        :return graph: NavigationGraph instance
+    """
+    global _graph
+    graph = NavigationGraph()
+    graph.build(registry or routing.get_registry())
+    _graph = graph
+    return graph
+
+
+def get_graph():
+    """
+        Get the navigation graph, building it if it hasn't been built yet.
+
+        :return: NavigationGraph instance
+    """
+    if _graph is None:
+        return build_graph()
+    return _graph
@@ -0,0 +1,150 @@
+"""
+    The page object routing registry.
+
+    Each app wrapper under welkin/apps has a routings.py module that maps
+    page object ids to the module and class for each page object, in two
+    maps: `noauth_pageobjects` and `auth_pageobjects`. The registry reads
+    every routings module once, imports every mapped module, and keeps
+    the class objects in a dict, so resolving a page object is one lookup
+    rather than two imports and a getattr per page transition.
+
+    Building the registry validates the routings: every route must have a
+    module, an object and a path, and every mapped module and class must
+    exist. conftest.py builds it at collection time, so a bad
+    route fails the test run up front rather than halfway through a test.
+
+    Each routing entry looks like:
+        'sweetshop home page': {
+            'module': 'pages',
+            'object': 'HomePage',
+            'path': NOAUTH_PATH  # dotted path of the package with the module
+        },
+"""
+import logging
+import importlib
+import pkgutil
+
+from welkin.framework.exceptions import RoutingException
+
+logger = logging.getLogger(__name__)
+
+APPS_PACKAGE = 'welkin.apps'
+ROUTINGS_MODULE = 'routings'
+# the routings maps in a routings module, by auth mode
+ROUTING_MAPS = {
+    'noauth': ('noauth_pageobjects', 'NOAUTH_PATH'),
+    'auth': ('auth_pageobjects', 'AUTH_PATH'),
+}
+
+# the registry for this test run, see get_registry()
+_registry = None
+
+
+class RoutingRegistry(object):
+    """
+        Page object classes keyed by (routings module, auth mode, po_id).
+    """
+    def __init__(self):
+        self.routes = {}
+
+    def build(self, package=APPS_PACKAGE):
+        """
+            Read and validate every routings module in `package`.
+
+            :param package: str, dotted path of the package to search
+            :return: None
+        """
+        errors = []
+        apps = importlib.import_module(package)
+        for module_info in pkgutil.walk_packages(apps.__path__, prefix=package + '.'):
+            if module_info.name.rsplit('.', 1)[-1] == ROUTINGS_MODULE:
+                errors.extend(self.add_routings(module_info.name))
+        if errors:
+            msg = "Invalid page object routings:\n" + '\n'.join(errors)
+            logger.error(msg)
+            raise RoutingException(errors=msg)
+        logger.info(f"\nbuilt routing registry with {len(self.routes)} page objects.")
+
+    def add_routings(self, routings_path):
+        """
+            Add the page objects mapped in one routings module.
+
+            :param routings_path: str, dotted path of the routings module
+            :return errors: list of str, the routes that don't resolve
+        """
+        errors = []
+        try:
+            routings = importlib.import_module(routings_path)
+        except Exception as e:
+            return [f"{routings_path}: can't import the routings module: {e!r}"]
+        for auth_mode, (map_name, path_name) in ROUTING_MAPS.items():
+            routing_map = getattr(routings, map_name, None)
+            if not routing_map:
+                continue
+            default_path = getattr(routings, path_name, None)
+            for po_id, data in routing_map.items():
+                route = f"{routings_path} ({auth_mode}) '{po_id}'"
+                if not isinstance(data, dict):
+                    errors.append(f"{route}: the route must be a dict, not {data!r}")
+                    continue
+                missing = [key for key in ('module', 'object') if not data.get(key)]
+                if missing:
+                    keys = ' or '.join(f"'{key}'" for key in missing)
+                    errors.append(f"{route}: the route has no {keys}")
+                    continue
+                path = data.get('path', default_path)
+                if not isinstance(path, str):
+                    errors.append(f"{route}: the route has no 'path', and the "
+                                  f"routings module's {path_name} is {path!r}")
+                    continue
+                module_path = path + data['module']
+                try:
+                    module = importlib.import_module(module_path)
+                    pageobject_class = getattr(module, data['object'])
+                except (ImportError, AttributeError) as e:
+                    errors.append(f"{route}: {module_path}.{data['object']}: {e}")
+                    continue
+                self.routes[(routings_path, auth_mode, po_id)] = pageobject_class
+        return errors
+
+    def get_class(self, routings_path, auth_mode, po_id):
+        """
+            Get the page object class for a page object id.
+
+            :param routings_path: str, dotted path of the wrapper's routings module
+            :param auth_mode: str enum, 'noauth' or 'auth'
+            :param po_id: str, key for the page object in the routings
+            :return: page object class
+        """
+        try:
+            return self.routes[(routings_path, auth_mode, po_id)]
+        except KeyError:
+            msg = f"No {auth_mode} page object '{po_id}' in {routings_path}."
+            logger.error(msg)
+            raise RoutingException(errors=msg)
+
+
+def build_registry(package=APPS_PACKAGE):
+    """
+        Build and validate the routing registry for this test run.
+
+        :param package: str, dotted path of the package to search
+        :return registry: RoutingRegistry instance
+    """
+    global _registry
+    registry = RoutingRegistry()
+    registry.build(package)
+    _registry = registry
+    return registry
+
+
+def get_registry():
+    """
+        Get the routing registry, building it if it hasn't been built yet
+        (e.g. when page objects are used from a script rather than pytest).
+
+        :return: RoutingRegistry instance
+    """
+    if _registry is None:
+        return build_registry()
+    return _registry
@@ -0,0 +1,280 @@
+"""
+    Run and test case context for the framework.
+
+    Every artifact writer needs to know which test case folder it is writing
+    into. Rather than reading that from the global pytest namespace (which
+    is overwritten for every test, and so breaks as soon as tests run in
+    parallel), the current test case is bound to a context variable when
+    the test is set up, and released when the test is torn down.
+
+    Under pytest-xdist every worker is its own process, so each worker has
+    its own binding; threads started by a test inherit the binding through
+    contextvars.copy_context().
+
+    Each test case is also added to the worker's TestCaseIndex, a compact
+    append-only record of the test cases that have run.
+
+    Typical usage from framework code:
+    >>> from welkin.framework import runcontext
+    >>> path = runcontext.get_folder('cookies') / filename
+"""
+import contextvars
+import logging
+import os
+from collections import deque, namedtuple
+
+logger = logging.getLogger(__name__)
+
+# the test case currently running in this worker process
+_current_testcase = contextvars.ContextVar('welkin_current_testcase', default=None)
+
+# one test case in the TestCaseIndex; `kinds` are the artifact kinds that
+# have a sub-folder, each of which is `folder / kind` (as the conftest's
+# set_up_testcase_reporting() creates them)
+IndexEntry = namedtuple('IndexEntry',
+                        ['number', 'name', 'nodeid', 'worker', 'folder', 'kinds'])
+
+
+def get_worker_id():
+    """
+        Identify the pytest-xdist worker running this process.
+
+        pytest-xdist sets the PYTEST_XDIST_WORKER environment variable in
+        each of its worker processes; without xdist there is only one
+        process, which we call 'main'.
+
+        :return: str, worker id like 'gw3', or 'main'
+    """
+    return os.environ.get('PYTEST_XDIST_WORKER', 'main')
+
+
+def is_worker():
+    """
+        Whether this process is a pytest-xdist worker.
+
+        :return: bool, True if running in an xdist worker process
+    """
+    return 'PYTEST_XDIST_WORKER' in os.environ
+
+
+class TestCaseContext(object):
+    """
+        Everything the framework needs to know about the test case that
+        is currently running: its identifiers, its output folder, and the
+        sub-folders created for the different kinds of artifacts.
+
+        The `number` is the test's position in the collection order. Every
+        xdist worker collects the same ordered list of tests, so this number
+        is unique across workers and the test folders never collide.
+
+        With a `buffer_size`, the test's routine artifacts are held in memory
+        in `artifacts`, a ring buffer of at most `buffer_size` artifacts,
+        and only written to file if the test fails (see utils_file.py).
+    """
+    # don't let pytest try to collect this class
+    __test__ = False
+
+    def __init__(self, nodeid, name, number, folder, worker=None, buffer_size=None):
+        """
+            :param nodeid: str, pytest node id for the test
+            :param name: str, short name of the test, used for its folder
+            :param number: int, position of the test in collection order
+            :param folder: Path, the test case's output folder
+            :param worker: str, xdist worker id; defaults to this process
+            :param buffer_size: int, max number of buffered artifacts;
+                                     defaults to None, for no buffering
+        """
+        self.nodeid = nodeid
+        self.name = name
+        self.number = number
+        self.folder = folder
+        self.worker = worker if worker else get_worker_id()
+        # the test case's log file, see utils_logging.py
+        self.logfile = None
+        self.folders = {}
+        # latency statistics and counters for the test, see metrics.py
+        self.metrics = None
+        # artifacts waiting for a test failure; None when not buffering
+        self.artifacts = deque(maxlen=buffer_size) if buffer_size else None
+        self.artifacts_dropped = 0
+
+    def __repr__(self):
+        return f"<TestCaseContext {self.number} '{self.name}' ({self.worker})>"
+
+    def add_folder(self, kind, path):
+        """
+            Register the output sub-folder for a kind of artifact.
+
+            :param kind: str, kind of artifact, e.g. 'cookies'
+            :param path: Path, path to the sub-folder
+            :return: None
+        """
+        self.folders[kind] = path
+
+    def get_folder(self, kind):
+        """
+            Get the output sub-folder for a kind of artifact.
+
+            :param kind: str, kind of artifact, e.g. 'cookies'
+            :return: Path, path to the sub-folder
+        """
+        try:
+            return self.folders[kind]
+        except KeyError:
+            msg = f"No '{kind}' folder was set up for test case '{self.name}'; " \
+                  f"check the app fixture lists in set_up_testcase_reporting()."
+            logger.error(msg)
+            raise KeyError(msg)
+
+    def as_namespace(self):
+        """
+            Represent this context the way the 'current test case' entry in
+            the custom namespace has always looked.
+
+            :return: dict, name and '<kind> folder' paths
+        """
+        data = {'name': self.name}
+        for kind, path in self.folders.items():
+            data[f"{kind} folder"] = path
+        return data
+
+
+class TestCaseIndex(object):
+    """
+        Append-only index of the test cases that have run in this worker.
+
+        This replaces the 'test cases' dict that used to live in the custom
+        namespace, which grew by one entry per test and was logged whole
+        after every test. The index keeps one small IndexEntry per test
+        case and is meant to be queried, not dumped: its repr is a one-line
+        summary, however many tests it holds.
+    """
+    # don't let pytest try to collect this class
+    __test__ = False
+
+    def __init__(self):
+        self._entries = []
+        # test case name --> position in _entries
+        self._positions = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    def __repr__(self):
+        return f"<TestCaseIndex {len(self._entries)} test cases>"
+
+    def add(self, context):
+        """
+            Add a test case to the index. A test case that is already in
+            the index (e.g. a re-run) keeps its first entry.
+
+            :param context: TestCaseContext instance
+            :return entry: IndexEntry for the test case
+        """
+        if context.name in self._positions:
+            return self._entries[self._positions[context.name]]
+        entry = IndexEntry(number=context.number, name=context.name,
+                           nodeid=context.nodeid, worker=context.worker,
+                           folder=context.folder, kinds=tuple(context.folders))
+        self._positions[context.name] = len(self._entries)
+        self._entries.append(entry)
+        return entry
+
+    def get(self, name):
+        """
+            Get the index entry for a test case.
+
+            :param name: str, short name of the test case
+            :return: IndexEntry, or None if the test case isn't in the index
+        """
+        position = self._positions.get(name)
+        return None if position is None else self._entries[position]
+
+    def get_folder(self, name, kind):
+        """
+            Get the output sub-folder of a test case that has run.
+
+            :param name: str, short name of the test case
+            :param kind: str, kind of artifact, e.g. 'cookies'
+            :return: Path, path to the sub-folder, or None if the test case
+                           isn't in the index or has no folder for `kind`
+        """
+        entry = self.get(name)
+        if entry is None or kind not in entry.kinds:
+            return None
+        return entry.folder / kind
+
+    def find(self, nodeid=None, kind=None):
+        """
+            Find the test cases that match every given criterion.
+
+            :param nodeid: str, substring of the pytest node id
+            :param kind: str, kind of artifact the test case has a folder for
+            :return: list of IndexEntry, in the order the tests ran
+        """
+        return [entry for entry in self._entries
+                if (nodeid is None or nodeid in entry.nodeid)
+                and (kind is None or kind in entry.kinds)]
+
+
+# the test cases that have run in this worker process
+_testcase_index = TestCaseIndex()
+
+
+def get_testcase_index():
+    """
+        Get the index of the test cases that have run in this worker.
+
+        :return: TestCaseIndex instance
+    """
+    return _testcase_index
+
+
+def bind_testcase(context):
+    """
+        Make `context` the current test case for this worker.
+
+        :param context: TestCaseContext instance
+        :return: contextvars.Token, pass to unbind_testcase()
+    """
+    logger.info(f"\nbinding test case context {context}")
+    return _current_testcase.set(context)
+
+
+def unbind_testcase(token):
+    """
+        Release the test case bound by bind_testcase().
+
+        :param token: contextvars.Token returned by bind_testcase()
+        :return: None
+    """
+    _current_testcase.reset(token)
+
+
+def current_testcase(required=True):
+    """
+        Get the context for the test case currently running in this worker.
+
+        :param required: bool, raise if no test case is bound; defaults to True
+        :return: TestCaseContext instance, or None if not required and unbound
+    """
+    context = _current_testcase.get()
+    if context is None and required:
+        msg = "No test case is currently bound; artifacts can only be " \
+              "written while a test is running."
+        logger.error(msg)
+        raise RuntimeError(msg)
+    return context
+
+
+def get_folder(kind):
+    """
+        Shortcut to the current test case's output sub-folder for `kind`.
+
+        :param kind: str, kind of artifact, e.g. 'screenshots'
+        :return: Path, path to the sub-folder
+    """
+    return current_testcase().get_folder(kind)
@@ -1,10 +1,14 @@
 import logging
-import json
 import pprint
 from copy import deepcopy
 
+from welkin.framework import utils_json
+
 logger = logging.getLogger(__name__)
 
+# the most characters plog() output is allowed to put into a log record
+PLOG_MAX_CHARS = 100000
+
 
 def path_proof_name(name):
     """
@@ -57,14 +61,22 @@ def strip_password_for_reporting(content):
         return content_for_reporting
 
 
-def plog(content):
+def plog(content, max_chars=None, pretty=True):
     """
         Format json content for pretty printing to the logger.
 
         If `content` is not json, try to identify what it is and then try
         to format it appropriately.
 
+        The json is serialized by utils_json, which uses a fast backend
+        if one is installed, and handles CaseInsensitiveDict, DeepDiff
+        and bytes content.
+
         :param content: assumed to be json
+        :param max_chars: int, truncate the output to this many characters;
+                               defaults to None, for no limit
+        :param pretty: bool, true to indent the json, else one compact line;
+                             defaults to True
         :return formatted_content:
 
         The typical usage will look like this:
@@ -76,38 +88,76 @@ def plog(content):
     # to catch None, because if a calling method tries to write()
     # the output of plog() will error out in the attempt.
     formatted_content = ''
-    try:
-        formatted_content = json.dumps(content, indent=4, sort_keys=True)
-    except (ValueError, TypeError):
-        # oops, this wasn't actually json
-
-        # try pretty-printing based on the guessed content type
-        from requests.structures import CaseInsensitiveDict
-        import deepdiff
-
-        if isinstance(content, dict):
-            formatted_content = pprint.pformat(content, indent=1, width=100)
-        elif isinstance(content, list):
-            formatted_content = pprint.pformat(content, indent=1, width=100)
-        elif isinstance(content, CaseInsensitiveDict):
-            formatted_content = pprint.pformat(dict(content), indent=1, width=100)
-        elif isinstance(content, deepdiff.diff.DeepDiff):
-            formatted_content = pprint.pformat(content, indent=1, width=160, depth=4)
-        elif isinstance(content, bytes):
-            # is this XML?
-            if content[:5] == b'<?xml':
-                import xml.dom.minidom
-                xml = xml.dom.minidom.parseString(content)
-                formatted_content = str(xml.toprettyxml())
+    if isinstance(content, bytes) and content[:5] == b'<?xml':
+        # this is XML, so pretty print it as XML
+        import xml.dom.minidom
+        xml = xml.dom.minidom.parseString(content)
+        formatted_content = str(xml.toprettyxml())
+    else:
+        try:
+            formatted_content = utils_json.dumps(content, pretty=pretty)
+        except (ValueError, TypeError):
+            # oops, this wasn't actually json
+            if isinstance(content, (dict, list)):
+                formatted_content = pprint.pformat(content, indent=1, width=100)
             else:
-                # no, this is some other kind of byte string
-                msg = f"Unable to pretty print the content that starts with {content[:20]}"
+                msg = f"Unable to pretty print the content that starts with " \
+                      f"{str(content)[:20]}"
                 logger.warning(msg)
-                pass
 
+    if max_chars and len(formatted_content) > max_chars:
+        formatted_content = f"{formatted_content[:max_chars]}\n... truncated, " \
+                            f"{len(formatted_content) - max_chars} of " \
+                            f"{len(formatted_content)} characters not shown"
     return formatted_content
 
 
+class LazyPlog(object):
+    """
+        Defer plog() formatting until a log handler formats the record.
+
+        Pass an instance as a %-style logging argument, so the content is
+        only serialized if the record is actually emitted; see lazy_plog().
+    """
+    __slots__ = ('content', 'max_chars')
+
+    def __init__(self, content, max_chars=PLOG_MAX_CHARS):
+        """
+            :param content: assumed to be json, see plog()
+            :param max_chars: int, truncate the output to this many characters
+        """
+        self.content = content
+        self.max_chars = max_chars
+
+    def __str__(self):
+        return plog(self.content, max_chars=self.max_chars)
+
+
+def lazy_plog(content, max_chars=PLOG_MAX_CHARS):
+    """
+        Pretty print content for the logger, lazily: the content is only
+        serialized when the log record is formatted, so records that are
+        filtered out by level cost nothing, and the output is capped at
+        `max_chars` so one huge payload can't stall the log pipeline.
+
+        Records are formatted later, on the logging listener thread (see
+        utils_logging.py), so only pass content that nothing will change
+        after the log call, e.g. a fresh res.json() or metrics summary().
+        For an object the caller keeps changing (the custom namespace, a
+        page object's headers), pass a copy, or log it eagerly with plog().
+
+        The typical usage will look like this:
+        >>> from welkin.framework import utils
+        >>> logger.info("\nResponse json:\n%s", utils.lazy_plog(res.json()))
+
+        :param content: assumed to be json, see plog()
+        :param max_chars: int, truncate the output to this many characters;
+                               defaults to PLOG_MAX_CHARS
+        :return: LazyPlog instance
+    """
+    return LazyPlog(content, max_chars=max_chars)
+
+
 def get_env_variable(var_name):
     """
         Get the value of an environment variable.
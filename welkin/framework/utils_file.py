@@ -1,12 +1,404 @@
 import logging
-import pytest
+import contextvars
+import copy
+import threading
+import queue
 import time
 import json
 
-from welkin.framework import utils
+from welkin.framework import utils, utils_json, runcontext
 
 logger = logging.getLogger(__name__)
 
+# number of background writer threads, and the number of pending
+# artifacts each one will queue before the test thread has to wait
+ARTIFACT_WRITER_THREADS = 2
+ARTIFACT_QUEUE_SIZE = 32
+# how long the test thread waits on a full queue before logging a
+# warning (it keeps waiting)
+ARTIFACT_QUEUE_TIMEOUT = 30
+# max number of routine artifacts held in memory per test until the
+# test fails; older artifacts are dropped first
+ARTIFACT_BUFFER_SIZE = 100
+# json artifacts by output folder: True to write them pretty (indented),
+# False to write them compact (one line); the largest artifacts are compact
+ARTIFACT_JSON_PRETTY = {
+    'cookies': True,
+    'network': False,
+    'metrics': True,
+    'console': True,
+    'webstorage': True,
+    'requests': True,
+    'integrations': True,
+    'accessibility': False,
+}
+# how json artifacts are written: 'json' writes each artifact to its own
+# file, pretty or compact per ARTIFACT_JSON_PRETTY; 'ndjson' appends each
+# artifact as one compact record (line) to one file per output folder,
+# see write_record(); use `python -m welkin.tools.welkin_view` to read them
+ARTIFACT_FORMATS = ('json', 'ndjson')
+DEFAULT_ARTIFACT_FORMAT = 'json'
+
+# the artifact writer for this test run, see start_artifact_writer()
+_writer = None
+# the artifact format for this test run, see set_artifact_format()
+_artifact_format = DEFAULT_ARTIFACT_FORMAT
+
+
+# #######################################
+# background artifact writing
+# #######################################
+class ArtifactWriter(object):
+    """
+        Serialize and write artifact files on background threads, so that
+        pretty-printing and file i/o stay off the test's critical path.
+
+        Each artifact is submitted as a path plus a `render` callable that
+        returns the str (or bytes) content for the file; the callable runs
+        on a writer thread. All artifacts for the same path go to the same
+        thread, so appends to a file keep their order. The render callable
+        must not depend on data the caller can still change: the artifact
+        writers below take ownership of the content they are given, so
+        callers pass fresh values (a new get_log() result, a new dict) and
+        don't change them afterwards.
+
+        Each thread has a bounded queue. When a queue is full, submit()
+        blocks the test thread (backpressure) rather than letting pending
+        artifacts pile up in memory.
+
+        Call flush() to wait until every submitted artifact has been
+        written, e.g. at test teardown.
+    """
+    def __init__(self, threads=ARTIFACT_WRITER_THREADS, maxsize=ARTIFACT_QUEUE_SIZE,
+                 timeout=ARTIFACT_QUEUE_TIMEOUT):
+        """
+            :param threads: int, number of writer threads
+            :param maxsize: int, max pending artifacts per writer thread
+            :param timeout: int, seconds to wait on a full queue before
+                                 warning that the writers are behind
+        """
+        self.timeout = timeout
+        self.queues = [queue.Queue(maxsize=maxsize) for _ in range(threads)]
+        self.threads = []
+        self.errors = []
+        self._errors_lock = threading.Lock()
+
+    def start(self):
+        """
+            Start the writer threads.
+
+            :return: None
+        """
+        for i, this_queue in enumerate(self.queues):
+            thread = threading.Thread(target=self._work, args=(this_queue,),
+                                      name=f"welkin-artifact-writer-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        logger.info(f"\nstarted {len(self.threads)} artifact writer threads.")
+
+    def submit(self, path, render, mode='w', newline=None):
+        """
+            Queue an artifact to be rendered and written to `path`.
+
+            The calling thread's context is carried along, so the writer
+            thread's logging goes to the current test case's log file.
+
+            :param path: Path, full path for the artifact file
+            :param render: callable, returns the str or bytes file content
+            :param mode: str, file open mode, e.g. 'w', 'a', 'wb'
+            :param newline: str, newline arg for open(); defaults to None
+            :return: None
+        """
+        job = (path, render, mode, newline, contextvars.copy_context())
+        this_queue = self.queues[hash(str(path)) % len(self.queues)]
+        try:
+            this_queue.put(job, timeout=self.timeout)
+        except queue.Full:
+            # keep waiting: writing on this thread instead could interleave
+            # with the writer thread's queued appends to the same file
+            logger.warning(f"\nartifact writer queue still full after {self.timeout}s; "
+                           f"waiting to queue '{path}'.")
+            this_queue.put(job)
+
+    def flush(self):
+        """
+            Wait until every submitted artifact has been written.
+
+            :return errors: list of str, errors from writes since last flush
+        """
+        for this_queue in self.queues:
+            this_queue.join()
+        with self._errors_lock:
+            errors, self.errors = self.errors, []
+        return errors
+
+    def stop(self):
+        """
+            Write everything pending, then stop the writer threads.
+
+            :return errors: list of str, errors from writes since last flush
+        """
+        errors = self.flush()
+        for this_queue in self.queues:
+            this_queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        return errors
+
+    def _work(self, this_queue):
+        """
+            Writer thread loop; a None job stops the thread.
+
+            :param this_queue: Queue, the queue this thread serves
+            :return: None
+        """
+        while True:
+            job = this_queue.get()
+            try:
+                if job is None:
+                    return
+                self._run(job)
+            finally:
+                this_queue.task_done()
+
+    def _run(self, job):
+        """
+            Render and write one artifact, in the context it was submitted from.
+
+            :param job: tuple, see submit()
+            :return: None
+        """
+        path, render, mode, newline, context = job
+        try:
+            context.run(_write, path, render, mode, newline)
+        except Exception as e:
+            msg = f"Failed to write artifact '{path}': {e!r}"
+            logger.error(msg)
+            with self._errors_lock:
+                self.errors.append(msg)
+
+
+def _write(path, render, mode='w', newline=None):
+    """
+        Render the artifact content and write it to `path`.
+
+        :param path: Path, full path for the artifact file
+        :param render: callable, returns the str or bytes file content
+        :param mode: str, file open mode
+        :param newline: str, newline arg for open()
+        :return: None
+    """
+    content = render()
+    with open(path, mode, newline=newline) as f:
+        f.write(content)
+
+
+def write_artifact(path, render, mode='w', newline=None, buffered=False):
+    """
+        Write an artifact through the background artifact writer if it has
+        been started, otherwise write it right away on the calling thread.
+
+        A `buffered` artifact is a routine one (cookies, webstorage, browser
+        logs) that is only worth keeping if the test fails: if the current
+        test case is buffering, the artifact is held in its ring buffer
+        instead, see write_buffered_artifacts().
+
+        :param path: Path, full path for the artifact file
+        :param render: callable, returns the str or bytes file content
+        :param mode: str, file open mode, e.g. 'w', 'a', 'wb'
+        :param newline: str, newline arg for open(); defaults to None
+        :param buffered: bool, hold the artifact until the test fails;
+                               defaults to False
+        :return written: bool, True if the artifact was written (or queued
+                               to be written), False if it was buffered
+    """
+    if buffered:
+        testcase = runcontext.current_testcase(required=False)
+        if testcase and testcase.artifacts is not None:
+            if len(testcase.artifacts) == testcase.artifacts.maxlen:
+                # the ring buffer is full, so the oldest artifact is dropped
+                testcase.artifacts_dropped += 1
+            testcase.artifacts.append((path, render, mode, newline))
+            return False
+
+    if _writer:
+        _writer.submit(path, render, mode=mode, newline=newline)
+    else:
+        _write(path, render, mode=mode, newline=newline)
+    return True
+
+
+def saved_or_buffered(written):
+    """
+        Describe what write_artifact() did, for logging.
+
+        :param written: bool, return value of write_artifact()
+        :return: str, 'Saved' or 'Buffered'
+    """
+    return 'Saved' if written else 'Buffered'
+
+
+def write_buffered_artifacts(testcase):
+    """
+        Write out the artifacts held in a test case's ring buffer, and stop
+        buffering, so the test's later artifacts are written straight away.
+
+        Call this when the test fails.
+
+        :param testcase: runcontext.TestCaseContext instance
+        :return: None
+    """
+    if testcase.artifacts is None:
+        return
+    artifacts, testcase.artifacts = testcase.artifacts, None
+    logger.info(f"\nwriting {len(artifacts)} buffered artifacts for {testcase}; "
+                f"{testcase.artifacts_dropped} older artifacts were dropped.")
+    for path, render, mode, newline in artifacts:
+        write_artifact(path, render, mode=mode, newline=newline)
+
+
+def discard_buffered_artifacts(testcase):
+    """
+        Drop the artifacts held in a test case's ring buffer, without
+        writing them.
+
+        Call this when the test has passed.
+
+        :param testcase: runcontext.TestCaseContext instance
+        :return: None
+    """
+    if testcase.artifacts is None:
+        return
+    logger.info(f"\ndiscarding {len(testcase.artifacts)} buffered artifacts "
+                f"for {testcase}.")
+    testcase.artifacts = None
+
+
+def start_artifact_writer(threads=ARTIFACT_WRITER_THREADS):
+    """
+        Start the background artifact writer for this test run. With zero
+        threads, artifacts are written synchronously on the test thread.
+
+        :param threads: int, number of writer threads
+        :return: None
+    """
+    global _writer
+    if _writer:
+        stop_artifact_writer()
+    if threads > 0:
+        _writer = ArtifactWriter(threads=threads)
+        _writer.start()
+
+
+def set_artifact_format(artifact_format):
+    """
+        Set how json artifacts are written for this test run.
+
+        :param artifact_format: str enum, one of ARTIFACT_FORMATS
+        :return: None
+    """
+    global _artifact_format
+    if artifact_format not in ARTIFACT_FORMATS:
+        msg = f"artifact format can only be one of {ARTIFACT_FORMATS}; " \
+              f"'{artifact_format}' is not valid."
+        logger.error(msg)
+        raise ValueError(msg)
+    _artifact_format = artifact_format
+
+
+def writing_records():
+    """
+        Whether json artifacts are written as ndjson records.
+
+        :return: bool
+    """
+    return _artifact_format == 'ndjson'
+
+
+def flush_artifacts():
+    """
+        Wait until every artifact submitted so far has been written, and
+        log any write errors.
+
+        :return errors: list of str, errors from writes since last flush
+    """
+    if not _writer:
+        return []
+    errors = _writer.flush()
+    for error in errors:
+        logger.error(f"\nartifact write error: {error}")
+    return errors
+
+
+def stop_artifact_writer():
+    """
+        Write everything pending and stop the background artifact writer.
+
+        :return: None
+    """
+    global _writer
+    if not _writer:
+        return
+    errors = _writer.stop()
+    for error in errors:
+        logger.error(f"\nartifact write error: {error}")
+    _writer = None
+
+
+# #######################################
+# artifact writers
+# #######################################
+
+def write_record(artifact, page, event, content, buffered=False, **fields):
+    """
+        Append an artifact as one compact json record (one line) to the
+        ndjson file for its output folder, e.g. network/network.ndjson.
+
+        Every record has the fields:
+            _timestamp  when the artifact was captured, epoch seconds
+            _page       the page url (or other source) of the artifact
+            event       the event or name the artifact was captured for
+            artifact    the artifact type, i.e. its output folder
+            data        the artifact content
+        plus any extra `fields`.
+
+        :param artifact: str, the artifact's output folder, e.g. 'network'
+        :param page: str, url of the page the artifact is from
+        :param event: str, the event or name for the artifact
+        :param content: the artifact content, assumed to be json
+        :param buffered: bool, hold the record until the test fails, see
+                               write_artifact(); defaults to False
+        :param fields: extra fields for the record
+        :return written: bool, False if the record was buffered, see write_artifact()
+    """
+    record = {'_timestamp': time.time(), '_page': page, 'event': event,
+              'artifact': artifact, 'data': content}
+    record.update(fields)
+    path = runcontext.get_folder(artifact) / f"{artifact}.ndjson"
+
+    def render():
+        try:
+            line = utils_json.dumps(record, pretty=False)
+        except (ValueError, TypeError):
+            # the content isn't json, so record it as text
+            line = utils_json.dumps(dict(record, data=utils.plog(content)), pretty=False)
+        return line + '\n'
+
+    return write_artifact(path, render, mode='a', buffered=buffered)
+
+
+def render_json(artifact, content):
+    """
+        Serialize the content of a json artifact, pretty or compact as set
+        for the artifact in ARTIFACT_JSON_PRETTY.
+
+        :param artifact: str, the artifact's output folder, e.g. 'network'
+        :param content: assumed to be json, see utils.plog()
+        :return: str, serialized content
+    """
+    return utils.plog(content, pretty=ARTIFACT_JSON_PRETTY.get(artifact, True))
+
 
 def write_cookies_to_file(cookies, url, fname=''):
     """
@@ -18,12 +410,21 @@ def write_cookies_to_file(cookies, url, fname=''):
                            timestamp; defaults to empty string
         :return: None
     """
+    if writing_records():
+        write_record('cookies', url, fname, cookies, buffered=True)
+        return
+
     filename = f"{time.strftime('%H%M%S')}_{utils.path_proof_name(fname)}.txt"
-    path = pytest.custom_namespace['current test case']['cookies folder'] / filename
-    with open(path, 'w') as f:
-        f.write(f"{url}\n")  # write the url as the first line
-        f.write(utils.plog(cookies))
-    logger.info(f"\nSaved cookies: {path}.")
+    path = runcontext.get_folder('cookies') / filename
+    # the page object keeps its cookies, so copy them
+    cookies = [dict(cookie) for cookie in cookies]
+
+    def render():
+        # write the url as the first line
+        return f"{url}\n{render_json('cookies', cookies)}"
+
+    written = write_artifact(path, render, mode='w', buffered=True)
+    logger.info(f"\n{saved_or_buffered(written)} cookies: {path}.")
 
 
 def write_network_log_to_file(log, url, fname=''):
@@ -36,17 +437,21 @@ def write_network_log_to_file(log, url, fname=''):
                            timestamp; defaults to empty string
         :return: None
     """
+    if writing_records():
+        write_record('network', url, fname, log, buffered=True)
+        return
+
     # note: json files don't allow comments, so we'd not be able
     # to write the url to the file
     filename = f"{time.strftime('%H%M%S')}_{utils.path_proof_name(fname)}.json"
-    path = pytest.custom_namespace['current test case']['network folder'] / filename
+    path = runcontext.get_folder('network') / filename
 
     wrapper = {}
     wrapper['_page'] = url
     wrapper['chrome network logs'] = log
-    with open(path, 'a') as f:
-        f.write(utils.plog(wrapper))
-    logger.info(f"\nSaved browser network log: {path}.")
+    written = write_artifact(path, lambda: render_json('network', wrapper), mode='a',
+                             buffered=True)
+    logger.info(f"\n{saved_or_buffered(written)} browser network log: {path}.")
 
 
 def write_metrics_log_to_file(log, url, fname=''):
@@ -59,16 +464,19 @@ def write_metrics_log_to_file(log, url, fname=''):
                            timestamp; defaults to empty string
         :return:
     """
+    if writing_records():
+        write_record('metrics', url, fname, log)
+        return
+
     # note: json files don't allow comments, so we'd not be able
     # to write the url to the file. Instead, insert a kv pair into dict
     filename = f"{time.strftime('%H%M%S')}_{utils.path_proof_name(fname)}.json"
-    path = pytest.custom_namespace['current test case']['metrics folder'] / filename
+    path = runcontext.get_folder('metrics') / filename
 
     wrapper = {}
     wrapper['_page'] = url
     wrapper.update(log)
-    with open(path, 'a') as f:
-        f.write(utils.plog(wrapper))
+    write_artifact(path, lambda: render_json('metrics', wrapper), mode='a')
     logger.info(f"\nSaved browser metrics log: {path}.")
 
 
@@ -82,15 +490,19 @@ def write_console_log_to_file(log, url, fname=''):
                            timestamp; defaults to empty string
         :return: None
     """
+    if writing_records():
+        write_record('console', url, fname, log, buffered=True)
+        return
+
     filename = f"{time.strftime('%H%M%S')}_{utils.path_proof_name(fname)}.json"
-    path = pytest.custom_namespace['current test case']['console folder'] / filename
+    path = runcontext.get_folder('console') / filename
 
     # add key/value for the page url
     log.update({'_page': url})
 
-    with open(path, 'a') as f:
-        f.write(utils.plog(log))
-    logger.info(f"\nSaved console logs (and bad headers): {path}.")
+    written = write_artifact(path, lambda: render_json('console', log), mode='a',
+                             buffered=True)
+    logger.info(f"\n{saved_or_buffered(written)} console logs (and bad headers): {path}.")
 
 
 def write_webstorage_to_files(data, current_url, pageobject_name,
@@ -108,9 +520,16 @@ def write_webstorage_to_files(data, current_url, pageobject_name,
         :param event: str, descriptor for an interaction with the React app
         :return: None
     """
+    if writing_records():
+        local_storage, session_storage = data
+        write_record('webstorage', current_url, event,
+                     {'local': local_storage, 'session': session_storage},
+                     buffered=True, pageobject=pageobject_name)
+        return
+
     base_filename = f"{time.strftime('%H%M%S')}_" \
                     f"{utils.path_proof_name(event)}"
-    path = pytest.custom_namespace['current test case']['webstorage folder'] / base_filename
+    path = runcontext.get_folder('webstorage') / base_filename
 
     # unpack the data
     local_storage, session_storage = data
@@ -130,7 +549,7 @@ def _write_local_to_file(data, event, pageobject_name, source_url, output_url):
     """
         Write the local storage to a json file in the webstorage folder.
 
-        Note: several welkin key-value pairs will be inserted into that data.
+        Note: several welkin key-value pairs will be added to a copy of that data.
 
         :param data: dict of local storage log pulled from the browser
         :param event: str, descriptor for an interaction with the React app
@@ -139,22 +558,24 @@ def _write_local_to_file(data, event, pageobject_name, source_url, output_url):
         :param output_url: str, full local path for the output file
         :return: None
     """
-    # add key/value for the page url
+    # add key/value for the page url, on a copy, because the data may
+    # be a PageState snapshot that is written more than once
+    data = dict(data)
     data.update({'_storage type': 'local'})
     data.update({'_page': source_url})
     data.update({'_page object name': pageobject_name})
     data.update({'_precipitating event': event})
 
-    with open(output_url, 'a') as f:
-        f.write(utils.plog(data))
-    logger.info(f"Saved local storage log: {output_url}.")
+    written = write_artifact(output_url, lambda: render_json('webstorage', data),
+                             mode='a', buffered=True)
+    logger.info(f"{saved_or_buffered(written)} local storage log: {output_url}.")
 
 
 def _write_session_to_file(data, event, pageobject_name, source_url, output_url):
     """
         Write the session storage to a json file in the webstorage folder.
 
-        Note: several welkin key-value pairs will be inserted into that data.
+        Note: several welkin key-value pairs will be added to a copy of that data.
 
         :param data: dict of session storage log pulled from the browser
         :param event: str, descriptor for an interaction with the React app
@@ -163,15 +584,17 @@ def _write_session_to_file(data, event, pageobject_name, source_url, output_url)
         :param output_url: str, full local path for the output file
         :return: None
     """
-    # add key/value for the page url
+    # add key/value for the page url, on a copy, because the data may
+    # be a PageState snapshot that is written more than once
+    data = dict(data)
     data.update({'_storage type': 'session'})
     data.update({'_page': source_url})
     data.update({'_page object name': pageobject_name})
     data.update({'_precipitating event': event})
 
-    with open(output_url, 'a') as f:
-        f.write(utils.plog(data))
-    logger.info(f"Saved session storage log: {output_url}.")
+    written = write_artifact(output_url, lambda: render_json('webstorage', data),
+                             mode='a', buffered=True)
+    logger.info(f"{saved_or_buffered(written)} session storage log: {output_url}.")
 
 
 def write_request_to_file(response, url, fname=''):
@@ -187,71 +610,114 @@ def write_request_to_file(response, url, fname=''):
         :return: None
     """
     filename = f"{time.strftime('%H%M%S')}_{utils.path_proof_name(fname)}.txt"
-    path = pytest.custom_namespace['current test case']['requests folder'] / filename
+    path = runcontext.get_folder('requests') / filename
     boundary = None
-    with open(path, 'a') as f:
-        f.write(f"{url}\n\n")  # write the url as the first line
-        f.write("###### REQUEST ####### \n")
-        f.write("HEADERS\n")
-        try:
-            # the request header MUST have the Content-Type key-value pair
-            # if not, raise an exception and kill the test
-            content_type = response.request.headers['Content-Type']
-        except KeyError:
-            msg = f"Missing header content-type field in request to {url}"
-            logger.error(msg)
-            raise ValueError(msg)
-        if 'boundary' in content_type:
-            # this is a POST, it must have the multi-part content-type, so
-            # extract the boundary str used between binary attachments
-            boundary = content_type[content_type.index('boundary=') + 9:]
-        f.write(utils.plog(response.request.headers))
+
+    # check the headers on the test thread, so that a bad request
+    # still kills the test
+    try:
+        # the request header MUST have the Content-Type key-value pair
+        # if not, raise an exception and kill the test
+        content_type = response.request.headers['Content-Type']
+    except KeyError:
+        msg = f"Missing header content-type field in request to {url}"
+        logger.error(msg)
+        raise ValueError(msg)
+    if 'boundary' in content_type:
+        # this is a POST, it must have the multi-part content-type, so
+        # extract the boundary str used between binary attachments
+        boundary = content_type[content_type.index('boundary=') + 9:]
+
+    if writing_records():
+        write_record('requests', url, fname, _request_record(response, boundary))
+        return
+
+    # the headers are mutable, so copy them now; the bodies and payload
+    # are bytes or str, which can't change
+    request_headers = dict(response.request.headers)
+    response_headers = dict(response.headers)
+
+    def render():
+        f = []  # chunks of the file content
+        f.append(f"{url}\n\n")  # write the url as the first line
+        f.append("###### REQUEST ####### \n")
+        f.append("HEADERS\n")
+        f.append(render_json('requests', request_headers))
 
         if response.request.body:
             # it will be as BODY (None) in file because content_type is not found in headers
-            f.write(f"\n\nBODY ({content_type})\n")
+            f.append(f"\n\nBODY ({content_type})\n")
             if isinstance(response.request.body, bytes):
                 # this was a binary upload, so decode it as a
                 # unicode str in order to write it to the file
                 logger.warning("response.request.body cast as string.")
-                f.write("--decoded from bytes--\n")
+                f.append("--decoded from bytes--\n")
                 if boundary:
                     # this is a multi-part form body
                     # https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/Content-Disposition
                     body = response.request.body.decode('utf-8', 'backslashreplace')
                     cleaned_body = body.replace('\r\n\r\n\n\r\n', '\n\n')
-                    f.write(cleaned_body)
+                    f.append(cleaned_body)
                 else:
-                    f.write("don't know what happened with this request body;\n"
-                            "probably a POST with bytes.")
+                    f.append("don't know what happened with this request body;\n"
+                             "probably a POST with bytes.")
 
             else:
                 try:
-                    f.write(utils.plog(json.loads(response.request.body)))
+                    f.append(render_json('requests', json.loads(response.request.body)))
                 except UnicodeDecodeError:
                     logger.warning("got UnicodeDecodeError.")
-                    f.write("-- byte string snipped --")
+                    f.append("-- byte string snipped --")
                 except json.decoder.JSONDecodeError:
                     logger.warning("got json.decoder.JSONDecodeError.")
-                    f.write(utils.plog(response.request.body))
-
-        f.write("\n\n###### RESPONSE ####### \n")
-        f.write("HEADERS\n")
-        f.write(utils.plog(response.headers))
-        f.write("\n\nRESPONSE STATUS CODE\n")
-        f.write(f"response server status: {response.status_code}")
-        f.write("\n\nPAYLOAD\n")
+                    f.append(render_json('requests', response.request.body))
+
+        f.append("\n\n###### RESPONSE ####### \n")
+        f.append("HEADERS\n")
+        f.append(render_json('requests', response_headers))
+        f.append("\n\nRESPONSE STATUS CODE\n")
+        f.append(f"response server status: {response.status_code}")
+        f.append("\n\nPAYLOAD\n")
         try:
-            f.write(utils.plog(response.json()))
+            f.append(render_json('requests', response.json()))
         except json.decoder.JSONDecodeError:
             # this could be an xml byte response
-            f.write(utils.plog(response.content))
+            f.append(render_json('requests', response.content))
 
-        f.write(f"\n\n{'~' * 45}\n\n")
+        f.append(f"\n\n{'~' * 45}\n\n")
+        return ''.join(f)
 
+    write_artifact(path, render, mode='a')
     logger.info(f"Saved headers: {path}")
 
 
+def _request_record(response, boundary=None):
+    """
+        Collect the request and response data for an ndjson record.
+
+        :param response: requests Response object
+        :param boundary: str, multi-part boundary of a POST request body
+        :return: dict
+    """
+    body = response.request.body
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', 'backslashreplace') if boundary else None
+    elif body:
+        try:
+            body = json.loads(body)
+        except json.decoder.JSONDecodeError:
+            pass
+    try:
+        payload = response.json()
+    except json.decoder.JSONDecodeError:
+        payload = response.content.decode('utf-8', 'backslashreplace')
+    return {
+        'request': {'headers': dict(response.request.headers), 'body': body},
+        'response': {'status': response.status_code,
+                     'headers': dict(response.headers), 'payload': payload},
+    }
+
+
 def write_sdk_response_to_file(response, sdk_app, fname=''):
     """
         Save the response from an SDK. Unlike typical API calls, the
@@ -266,10 +732,15 @@ def write_sdk_response_to_file(response, sdk_app, fname=''):
                            timestamp; defaults to empty string
         :return: None
     """
+    # the caller keeps the response, so copy it; SDK responses are small
+    response = copy.deepcopy(response)
+    if writing_records():
+        write_record('integrations', None, fname, response, sdk=sdk_app)
+        return
+
     filename = f"{time.strftime('%H%M%S')}_{utils.path_proof_name(fname)}.json"
-    path = pytest.custom_namespace['current test case']['integrations folder'] / filename
-    with open(path, 'a') as f:
-        f.write(utils.plog(response))
+    path = runcontext.get_folder('integrations') / filename
+    write_artifact(path, lambda: render_json('integrations', response), mode='a')
 
 
 def write_axe_log_to_file(axe_results, fname):
@@ -280,11 +751,14 @@ def write_axe_log_to_file(axe_results, fname):
         :param fname: str, first part of filename
         :return: None
     """
+    if writing_records():
+        write_record('accessibility', axe_results.get('url'), fname, axe_results)
+        return
+
     filename = f"{time.strftime('%H%M%S')}_{utils.path_proof_name(fname)}.json"
-    path = pytest.custom_namespace['current test case']['accessibility folder'] / filename
+    path = runcontext.get_folder('accessibility') / filename
     logger.info(f"\nWriting accessibility logs to {filename}")
-    with open(path, 'a') as f:
-        f.write(utils.plog(axe_results))
+    write_artifact(path, lambda: render_json('accessibility', axe_results), mode='a')
 
 
 def write_axe_failures_to_csv(axe_results, fname):
@@ -296,8 +770,9 @@ def write_axe_failures_to_csv(axe_results, fname):
         :return: None
     """
     import csv
+    import io
     filename = f"{time.strftime('%H%M%S')}_{utils.path_proof_name(fname)}.csv"
-    path = pytest.custom_namespace['current test case']['accessibility folder'] / filename
+    path = runcontext.get_folder('accessibility') / filename
 
     def process_json(data, writer, current_level=None, max_depth=None):
         """
@@ -341,34 +816,22 @@ def write_axe_failures_to_csv(axe_results, fname):
             row = current_level + [str(data)] + [''] * (max_depth[0] - len(current_level) - 1)
             writer.writerow(row)
 
-    def json_to_csv(json_data, csv_filename):
+    def json_to_csv(json_data):
         """
-            Write JSON data to a CSV file.
+            Render JSON data as CSV content, headed by a row of level names.
 
             :param json_data: dict, axe accessibility audit results
-            :param csv_filename: str, full local path to ouput path in
-                                      testrun/testcase/accessibility folder
-            :return: None
+            :return: str, CSV content
         """
-        try:
-            with open(csv_filename, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-
-                max_depth = [0]
-                process_json(json_data, writer, max_depth=max_depth)
-         
-                # Write header row
-                header = [f'Level {i + 1}' for i in range(max_depth[0])]
-                csvfile.seek(0)
-                content = csvfile.read()
-                csvfile.seek(0)
-                csvfile.write(','.join(header) + '\n' + content)
-        except IOError as e:
-            print(f"An error occurred while writing to the CSV file: {e}")
-        except Exception as e:
-            print(f"An unexpected error occurred: {e}")
-        else:
-            print(f"Successfully created CSV file: {csv_filename}")
+        csvfile = io.StringIO()
+        writer = csv.writer(csvfile)
+
+        max_depth = [0]
+        process_json(json_data, writer, max_depth=max_depth)
+
+        # Write header row
+        header = [f'Level {i + 1}' for i in range(max_depth[0])]
+        return ','.join(header) + '\r\n' + csvfile.getvalue()
 
     logger.info(f"\nWriting axe failures logs to {path}")
-    json_to_csv(axe_results, path)
+    write_artifact(path, lambda: json_to_csv(axe_results), mode='w', newline='')
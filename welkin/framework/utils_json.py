@@ -0,0 +1,104 @@
+"""
+    JSON serialization for the framework's artifacts and logs.
+
+    The serializer uses the fastest backend that is installed:
+        1. orjson
+        2. msgspec
+        3. the standard library's json module
+    Neither orjson nor msgspec is a requirement; install one of them to
+    speed up writing large artifacts such as network logs and axe results.
+
+    Output is either pretty (indented, for people to read) or compact
+    (one line, for size and speed); keys are always sorted, so artifacts
+    diff cleanly between runs. Note that orjson indents with 2 spaces
+    rather than 4.
+
+    Types that the backends can't serialize natively are converted:
+        + mappings, e.g. requests' CaseInsensitiveDict --> dict
+        + DeepDiff results --> their dict form
+        + bytes --> str, decoded as utf-8
+        + sets and tuples --> list
+        + subclasses of dict, list, str and the number types --> the base type
+
+    Typical usage:
+    >>> from welkin.framework import utils_json
+    >>> text = utils_json.dumps(data, pretty=False)
+"""
+import logging
+import json
+import sys
+from collections.abc import Mapping
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+logger = logging.getLogger(__name__)
+
+if orjson:
+    BACKEND = 'orjson'
+elif msgspec:
+    BACKEND = 'msgspec'
+else:
+    BACKEND = 'json'
+
+
+def to_serializable(obj):
+    """
+        Convert an object that the JSON backends don't handle natively.
+
+        :param obj: object to convert
+        :return: a JSON-serializable equivalent
+        :raise TypeError: if there is no conversion for `obj`
+    """
+    # only check for DeepDiff if it has been imported, i.e. if `obj` could be one
+    deepdiff = sys.modules.get('deepdiff')
+    if deepdiff and isinstance(obj, deepdiff.DeepDiff):
+        return obj.to_dict()
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, (bytes, bytearray)):
+        return bytes(obj).decode('utf-8', errors='replace')
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=str)
+    if isinstance(obj, (list, tuple)):
+        return list(obj)
+    # subclasses of the basic types, which orjson passes through to here
+    for basic_type in (str, bool, int, float):
+        if isinstance(obj, basic_type):
+            return basic_type(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content, pretty=True):
+    """
+        Serialize `content` to a JSON string with sorted keys.
+
+        :param content: object to serialize
+        :param pretty: bool, true to indent the output, else one compact
+                             line; defaults to True
+        :return: str, JSON
+        :raise TypeError: if `content` contains an object that can't be
+                          serialized
+    """
+    if orjson:
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | \
+            orjson.OPT_PASSTHROUGH_SUBCLASS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(content, default=to_serializable, option=option).decode()
+    if msgspec:
+        encoded = msgspec.json.encode(content, enc_hook=to_serializable, order='sorted')
+        if pretty:
+            encoded = msgspec.json.format(encoded, indent=4)
+        return encoded.decode()
+    if pretty:
+        return json.dumps(content, indent=4, sort_keys=True, default=to_serializable)
+    return json.dumps(content, sort_keys=True, separators=(',', ':'),
+                      default=to_serializable)
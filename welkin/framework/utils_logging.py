@@ -0,0 +1,308 @@
+"""
+    Framework logging: one long-lived logging setup for the whole test run.
+
+    Every log record goes through a DeferredQueueHandler on the root logger,
+    so the test thread only puts the unformatted record on a queue. A
+    QueueListener thread then formats the record and hands it to the
+    TestcaseRoutingHandler, which writes it to the
+    log file for the test case that was running when the record was made,
+    or to the test run's log file between tests.
+
+    The destination is stamped on the record by RoutingFilter in the calling
+    thread, from the run context bound for the current test case (see
+    runcontext.py); the listener thread never looks at the run context.
+
+    The listener can also (or instead) hand every record to a
+    JsonlRotatingFileHandler, which writes the whole run as one JSON object
+    per line, with the test's nodeid and any page object, event and
+    duration fields passed to the log call with record_fields():
+    >>> logger.info("\nloaded page", extra=utils_logging.record_fields(
+    ...     pageobject='sweetshop home page', duration=1.2))
+    The JSONL log is rotated by size, and the finished segments are
+    compressed with gzip, or with zstd if the zstandard package is installed.
+"""
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from welkin.framework import runcontext, utils_json
+
+logger = logging.getLogger(__name__)
+
+LOG_FORMAT = '%(asctime)s %(name)s::%(funcName)s() [%(levelname)s] %(message)s'
+# test case log files stay open for reuse; cap how many are open at once
+MAX_OPEN_LOGFILES = 32
+
+# which logs to write: the text run and test case logs, the JSONL run log,
+# or both
+LOG_FORMATS = ('text', 'jsonl', 'both')
+DEFAULT_LOG_FORMAT = 'text'
+# the JSONL log is rotated at this size, and finished segments compressed
+JSONL_MAX_MEGABYTES = 100
+JSONL_BACKUP_COUNT = 1000
+LOG_COMPRESSIONS = {'gzip': '.gz', 'zstd': '.zst', 'none': ''}
+DEFAULT_LOG_COMPRESSION = 'gzip'
+# the structured fields a log call can pass with record_fields()
+RECORD_FIELDS = ('pageobject', 'event', 'duration')
+
+# the root queue handler and its listener for the current test run,
+# see start_logging()
+_queue_handler = None
+_listener = None
+
+
+class RoutingFilter(logging.Filter):
+    """
+        Stamp each log record with the path of the log file it belongs in.
+
+        This must run in the thread that created the record, because the
+        test case context is bound there.
+    """
+    def filter(self, record):
+        testcase = runcontext.current_testcase(required=False)
+        record.welkin_logfile = testcase.logfile if testcase else None
+        record.welkin_nodeid = testcase.nodeid if testcase else None
+        return True
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+        Put log records on the queue as they are, so that formatting them
+        (including serializing any lazy_plog() arguments) happens on the
+        listener thread, not on the test thread.
+
+        The stock QueueHandler formats every record before queueing it, so
+        that it can be pickled; the listener runs in this same process, so
+        there is nothing to pickle.
+    """
+    def prepare(self, record):
+        return record
+
+
+def record_fields(pageobject=None, event=None, duration=None):
+    """
+        Build the `extra` for a log call, so the JSONL log has the fields.
+
+        :param pageobject: str, name of the page object
+        :param event: str, name of the event
+        :param duration: float, seconds the event took
+        :return: dict, pass as a logging call's `extra`
+    """
+    return {'welkin_pageobject': pageobject, 'welkin_event': event,
+            'welkin_duration': duration}
+
+
+class JsonlFormatter(logging.Formatter):
+    """
+        Format a log record as one line of JSON.
+    """
+    def format(self, record):
+        data = {
+            'timestamp': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'function': record.funcName,
+            'worker': runcontext.get_worker_id(),
+            'nodeid': getattr(record, 'welkin_nodeid', None),
+            'message': record.getMessage().strip(),
+        }
+        for field in RECORD_FIELDS:
+            value = getattr(record, f"welkin_{field}", None)
+            if value is not None:
+                data[field] = value
+        # DeferredQueueHandler queues the record unformatted, so the
+        # traceback is still on it rather than merged into the message
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data['exception'] = record.exc_text
+        if record.stack_info:
+            data['stack'] = self.formatStack(record.stack_info)
+        return utils_json.dumps(data, pretty=False)
+
+
+class JsonlRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+        Write JSONL log records to a file that is rotated by size, and
+        compress each finished segment, e.g. runlog.jsonl.1.gz.
+    """
+    def __init__(self, filename, max_bytes=JSONL_MAX_MEGABYTES * 1024 * 1024,
+                 backup_count=JSONL_BACKUP_COUNT, compression=DEFAULT_LOG_COMPRESSION):
+        """
+            :param filename: str or Path, the JSONL log file
+            :param max_bytes: int, rotate the file when it would grow past this
+            :param backup_count: int, max number of finished segments to keep
+            :param compression: str enum, 'gzip', 'zstd' or 'none'
+        """
+        if compression not in LOG_COMPRESSIONS:
+            raise ValueError(f"Unknown log compression '{compression}'; "
+                             f"expected one of {list(LOG_COMPRESSIONS)}.")
+        if compression == 'zstd' and not zstandard:
+            raise ValueError("zstd log compression requires the zstandard package.")
+        logging.handlers.RotatingFileHandler.__init__(
+            self, filename, mode='a', maxBytes=max_bytes, backupCount=backup_count,
+            encoding='utf-8')
+        self.setFormatter(JsonlFormatter())
+        self.compression = compression
+        if compression != 'none':
+            self.namer = self._name_segment
+            self.rotator = self._compress_segment
+
+    def _name_segment(self, name):
+        return name + LOG_COMPRESSIONS[self.compression]
+
+    def _compress_segment(self, source, dest):
+        """
+            Compress the finished segment `source` into `dest`.
+        """
+        with open(source, 'rb') as f_in:
+            if self.compression == 'zstd':
+                with open(dest, 'wb') as f_out:
+                    zstandard.ZstdCompressor().copy_stream(f_in, f_out)
+            else:
+                with gzip.open(dest, 'wb') as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
+
+
+class TestcaseRoutingHandler(logging.Handler):
+    """
+        Write each log record to the file stamped on it by RoutingFilter,
+        or to the test run's log file if there is none.
+
+        A FileHandler is kept open for every recently used log file, so log
+        files are not re-opened for every record or every test; the least
+        recently used file is closed when more than `max_open` are open.
+    """
+    # don't let pytest try to collect this class
+    __test__ = False
+
+    def __init__(self, run_logfile, max_open=MAX_OPEN_LOGFILES):
+        """
+            :param run_logfile: str or Path, the test run's log file
+            :param max_open: int, maximum number of open log files
+        """
+        logging.Handler.__init__(self)
+        self.run_logfile = str(run_logfile)
+        self.max_open = max_open
+        self._handlers = OrderedDict()
+
+    def _get_file_handler(self, path):
+        """
+            Get the open FileHandler for `path`, opening it if needed.
+
+            :param path: str, path to the log file
+            :return: logging.FileHandler
+        """
+        handler = self._handlers.get(path)
+        if handler:
+            self._handlers.move_to_end(path)
+            return handler
+
+        handler = logging.FileHandler(path, mode='a')
+        handler.setFormatter(self.formatter)
+        self._handlers[path] = handler
+        if len(self._handlers) > self.max_open:
+            # close the least recently used log file
+            oldest_path, oldest = self._handlers.popitem(last=False)
+            oldest.close()
+        return handler
+
+    def emit(self, record):
+        path = getattr(record, 'welkin_logfile', None)
+        path = str(path) if path else self.run_logfile
+        try:
+            self._get_file_handler(path).emit(record)
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self.acquire()
+        try:
+            for handler in self._handlers.values():
+                handler.close()
+            self._handlers.clear()
+        finally:
+            self.release()
+        logging.Handler.close(self)
+
+
+def start_logging(run_logfile, level='INFO', log_format=DEFAULT_LOG_FORMAT,
+                  max_megabytes=JSONL_MAX_MEGABYTES, compression=DEFAULT_LOG_COMPRESSION):
+    """
+        Configure the framework logging for the whole test run, and start
+        the listener thread that writes the log files.
+
+        The JSONL run log is written next to the text run log, e.g.
+        runlog.jsonl for runlog.txt.
+
+        :param run_logfile: str or Path, the test run's log file
+        :param level: str, level for the root logger; defaults to 'INFO'
+        :param log_format: str enum, 'text', 'jsonl' or 'both'; defaults to 'text'
+        :param max_megabytes: int, size at which the JSONL log is rotated;
+                                   0 to never rotate it
+        :param compression: str enum, compression for finished JSONL log
+                                      segments, 'gzip', 'zstd' or 'none'
+        :return: None
+    """
+    global _queue_handler, _listener
+    if _listener:
+        stop_logging()
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format '{log_format}'; "
+                         f"expected one of {list(LOG_FORMATS)}.")
+
+    handlers = []
+    if log_format in ('text', 'both'):
+        routing_handler = TestcaseRoutingHandler(run_logfile)
+        routing_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers.append(routing_handler)
+    if log_format in ('jsonl', 'both'):
+        jsonl_logfile = Path(run_logfile).with_suffix('.jsonl')
+        handlers.append(JsonlRotatingFileHandler(
+            jsonl_logfile, max_bytes=max_megabytes * 1024 * 1024, compression=compression))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RoutingFilter())
+
+    # replace any existing root handlers with the queue handler
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _queue_handler = queue_handler
+    _listener = logging.handlers.QueueListener(log_queue, *handlers)
+    _listener.start()
+    logger.info(f"\nstarted {log_format} logging to '{run_logfile}'.")
+
+
+def stop_logging():
+    """
+        Stop the listener thread after it has written every queued record,
+        and close all the log files.
+
+        :return: None
+    """
+    global _queue_handler, _listener
+    if not _listener:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _queue_handler = None
+    _listener = None
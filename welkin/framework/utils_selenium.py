@@ -1,14 +1,15 @@
 import logging
 import time
 import json
+import uuid
 import pytest
 
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import WebDriverException
+from selenium.common.exceptions import TimeoutException
 
-from welkin.framework import utils_webstorage
+from welkin.framework import utils_webstorage, utils_file, runcontext, waits
 from welkin.framework.exceptions import ControlInteractionException
 
 logger = logging.getLogger(__name__)
@@ -53,35 +54,322 @@ def get_readystate(driver, state='complete'):
     """
     logger.info(f"\n getting readyState for {state}")
     # return driver.execute_script("return document.readyState") == state
-    return WebDriverWait(driver, 10).until(
-        lambda driver: driver.execute_script("return document.readyState") == state
+    return waits.wait_until(
+        driver,
+        lambda driver: driver.execute_script("return document.readyState") == state,
+        timeout=10, name='readystate'
     )
 
 
-def take_and_save_screenshot(driver, filename=''):
+# the property used to tag a document, see tag_document()
+DOCUMENT_TOKEN_PROPERTY = '__welkinDocumentToken'
+
+# tag the document with the token in arguments[0] unless it is already
+# tagged, and return the document's token
+TAG_DOCUMENT_JS = f"""
+    if (!document.{DOCUMENT_TOKEN_PROPERTY}) {{
+        document.{DOCUMENT_TOKEN_PROPERTY} = arguments[0];
+    }}
+    return document.{DOCUMENT_TOKEN_PROPERTY};
+"""
+
+# gather the page's document state and webstorage in one round trip, and
+# tag the document as in TAG_DOCUMENT_JS; access to storage throws for
+# some pages (e.g. data: urls), which just means there's no storage to gather
+PAGE_STATE_JS = f"""
+    var storage = function (name) {{
+        try {{ return {{ ...window[name] }}; }} catch (e) {{ return {{}}; }}
+    }};
+    if (!document.{DOCUMENT_TOKEN_PROPERTY}) {{
+        document.{DOCUMENT_TOKEN_PROPERTY} = arguments[0];
+    }}
+    return {{
+        documentToken: document.{DOCUMENT_TOKEN_PROPERTY},
+        readyState: document.readyState,
+        url: window.location.href,
+        title: document.title,
+        localStorage: storage('localStorage'),
+        sessionStorage: storage('sessionStorage')
+    }};
+"""
+
+
+class PageState(object):
+    """
+        A snapshot of the browser's state for the current page, gathered
+        in as few WebDriver round trips as possible by get_page_state().
+
+        `cookies` and `metrics` are None unless they were requested.
+    """
+    def __init__(self, ready_state, url, title, local_storage, session_storage,
+                 cookies=None, metrics=None, document_token=None):
+        """
+            :param ready_state: str, document.readyState
+            :param url: str, the browser's current url
+            :param title: str, the document title
+            :param local_storage: dict, cleaned up localStorage content
+            :param session_storage: dict, cleaned up sessionStorage content
+            :param cookies: list of dicts, the page's cookies
+            :param metrics: dict, Chrome Performance.getMetrics result
+            :param document_token: str, the document's tag, see tag_document()
+        """
+        self.timestamp = time.time()
+        self.document_token = document_token
+        self.ready_state = ready_state
+        self.url = url
+        self.title = title
+        self.local_storage = local_storage
+        self.session_storage = session_storage
+        self.cookies = cookies
+        self.metrics = metrics
+
+    def __repr__(self):
+        return f"<PageState '{self.ready_state}' {self.url} '{self.title}'>"
+
+    @property
+    def webstorage(self):
+        """
+            The webstorage in the format returned by get_webstorage().
+
+            :return: tuple of local storage dict and session storage dict
+        """
+        return self.local_storage, self.session_storage
+
+
+def get_page_state(driver, cookies=True, metrics=False):
+    """
+        Snapshot the browser's state for the current page: readyState, url,
+        title, localStorage and sessionStorage in one execute_script call,
+        which also tags the document (see tag_document()),
+        plus the cookies (WebDriver only exposes HttpOnly cookies through
+        its own endpoint) and Chrome's metrics (a CDP call) if requested.
+
+        :param driver: webdriver instance
+        :param cookies: bool, whether to get the cookies; defaults to True
+        :param metrics: bool, whether to get Chrome's performance metrics;
+                              defaults to False
+        :return state: PageState instance
+    """
+    content = driver.execute_script(PAGE_STATE_JS, uuid.uuid4().hex)
+    state = PageState(
+        document_token=content['documentToken'],
+        ready_state=content['readyState'],
+        url=content['url'],
+        title=content['title'],
+        local_storage=utils_webstorage.convert_web_storage_data_to_dict(
+            content['localStorage'], stype='local'),
+        session_storage=utils_webstorage.convert_web_storage_data_to_dict(
+            content['sessionStorage'], stype='session'))
+    if cookies:
+        state.cookies = driver.get_cookies()
+    if metrics:
+        try:
+            state.metrics = driver.execute_cdp_cmd('Performance.getMetrics', {})
+        except AttributeError:
+            msg = f"\nNo metrics log for page at {state.url}, " \
+                  f"using empty log instead."
+            logger.warning(msg)
+            state.metrics = [msg]
+    logger.info(f"\ngot page state {state}")
+    return state
+
+
+def tag_document(driver):
+    """
+        Tag the browser's current document with a unique token, unless it
+        is already tagged, and return its token.
+
+        The tag lives on the document object, so it is gone as soon as the
+        browser navigates to a new document; if get_document_token() no
+        longer returns the token, the page has been unloaded. An SPA
+        transition keeps the document, and so keeps the tag.
+
+        :param driver: webdriver instance
+        :return: str, the document's token
+    """
+    return driver.execute_script(TAG_DOCUMENT_JS, uuid.uuid4().hex)
+
+
+def get_document_token(driver):
+    """
+        Get the token the browser's current document was tagged with.
+
+        :param driver: webdriver instance
+        :return: str, the document's token, or None if it's not tagged
+    """
+    return driver.execute_script(f"return document.{DOCUMENT_TOKEN_PROPERTY} || null;")
+
+
+# count the page's in-flight fetch/XHR requests and track the time of the
+# latest request or DOM change, in window.__welkinReadiness; `late` is set
+# if the instrumentation was added after the document started loading, so
+# requests may have started before it
+READINESS_INSTRUMENTATION_JS = """
+(function () {
+    if (window.__welkinReadiness) {
+        return;
+    }
+    var state = window.__welkinReadiness = {inflight: 0, lastChange: Date.now(),
+                                            late: document.readyState !== 'loading'};
+    var touch = function () {
+        state.lastChange = Date.now();
+    };
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            state.inflight++;
+            touch();
+            return originalFetch.apply(this, arguments).finally(function () {
+                state.inflight--;
+                touch();
+            });
+        };
+    }
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        state.inflight++;
+        touch();
+        this.addEventListener('loadend', function () {
+            state.inflight--;
+            touch();
+        });
+        return originalSend.apply(this, arguments);
+    };
+    new MutationObserver(touch).observe(document, {childList: true, subtree: true,
+                                                   attributes: true, characterData: true});
+})();
+"""
+
+# call back once the document is complete, no requests are in flight and
+# nothing has changed for arguments[0] msecs; if the instrumentation came
+# late, no resource (of any kind) may have finished loading in that time either
+PAGE_READY_JS = READINESS_INSTRUMENTATION_JS + """
+var quietPeriod = arguments[0];
+var done = arguments[arguments.length - 1];
+var resourcesQuiet = function () {
+    var entries = performance.getEntriesByType('resource');
+    var lastEnd = 0;
+    for (var i = 0; i < entries.length; i++) {
+        lastEnd = Math.max(lastEnd, entries[i].responseEnd);
+    }
+    return performance.now() - lastEnd >= quietPeriod;
+};
+var check = function () {
+    var state = window.__welkinReadiness;
+    if (document.readyState === 'complete' && state.inflight <= 0 &&
+            Date.now() - state.lastChange >= quietPeriod &&
+            (!state.late || resourcesQuiet())) {
+        done(true);
+    } else {
+        setTimeout(check, 50);
+    }
+};
+check();
+"""
+
+# how long the page must be quiet to be ready, in msecs
+QUIET_PERIOD = 500
+
+
+def install_readiness_instrumentation(driver):
+    """
+        On Chrome, have the browser add the readiness instrumentation to
+        every new document before the page's own scripts run, so that
+        wait_for_page_ready() sees every request the page makes.
+
+        Other browsers get the instrumentation when wait_for_page_ready() is
+        first called on a document, so only later requests are counted; see
+        wait_for_page_ready() for how earlier requests are allowed for.
+
+        :param driver: webdriver instance
+        :return: bool, True if the instrumentation was installed
+    """
+    if getattr(driver, 'welkin_readiness_installed', False):
+        return True
+    if not hasattr(driver, 'execute_cdp_cmd'):
+        return False
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument',
+                           {'source': READINESS_INSTRUMENTATION_JS})
+    driver.welkin_readiness_installed = True
+    logger.info("\ninstalled readiness instrumentation for new documents.")
+    return True
+
+
+def wait_for_page_ready(driver, quiet_period=QUIET_PERIOD, timeout=15):
+    """
+        Wait until the page is ready: the document has loaded, there are no
+        fetch or XMLHttpRequest requests in flight, and the DOM hasn't
+        changed for `quiet_period` msecs.
+
+        Use this instead of sleeping after an interaction that makes the
+        page load or update. If the page navigates to a new document while
+        waiting, wait for the new document.
+
+        Like a sleep, this doesn't fail the test if the page never settles;
+        it logs a warning and returns False.
+
+        Requests are only counted from when the readiness instrumentation
+        was added to the document (see install_readiness_instrumentation()).
+        If that was after the document started loading, the page must also
+        have had no resource finish loading (per the Resource Timing API)
+        for `quiet_period` msecs. A request that started before the
+        instrumentation and is still in flight has no timing entry yet, so
+        it can still be missed.
+
+        :param driver: webdriver instance
+        :param quiet_period: int, msecs without requests or DOM changes;
+                                  defaults to QUIET_PERIOD
+        :param timeout: int, seconds to wait
+        :return: bool, True if the page is ready, else False
+    """
+    install_readiness_instrumentation(driver)
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        try:
+            return waits.wait_for_signal(driver, PAGE_READY_JS, quiet_period,
+                                         timeout=max(remaining, 0.1), name='page ready')
+        except TimeoutException:
+            logger.warning(f"\npage not quiet after {timeout}s; carrying on.")
+            return False
+        except WebDriverException as e:
+            # the document was replaced while waiting, so wait for the new one
+            if time.monotonic() >= deadline:
+                logger.warning(f"\npage not ready after {timeout}s: {e!r}")
+                return False
+            logger.info("\ndocument changed while waiting for the page to be ready.")
+
+
+def take_and_save_screenshot(driver, filename='', buffered=False):
     """
         Use the webdriver instance to generate a screenshot, then save it
         the "screenshots" folder being used for the current test run.
 
+        A `buffered` screenshot is only written if the test fails, see
+        utils_file.write_artifact().
+
         :param driver: webdriver instance
         :param filename: str filename (not including the path)
+        :param buffered: bool, hold the screenshot until the test fails;
+                               defaults to False
         :return: None
     """
     filename = '%s_%s.png' % (time.strftime('%H%M%S'), filename.replace(' ', '_'))
 
     # Note: the path depends on the current test case!
-    path = pytest.custom_namespace['current test case']['screenshots folder'] / filename
+    path = runcontext.get_folder('screenshots') / filename
 
     # full-screen screenshots are enabled by
     if pytest.custom_namespace['browser'] in ['firefox', 'safari']:
         body = driver.find_element(By.TAG_NAME, 'body')
         body_png = body.screenshot_as_png
-        with open(path, 'wb') as file:
-            file.write(body_png)
-        logger.info(f"Saved full-height screenshot: {path}.")
+        written = utils_file.write_artifact(path, lambda: body_png, mode='wb',
+                                            buffered=buffered)
+        logger.info(f"{utils_file.saved_or_buffered(written)} full-height screenshot: {path}.")
     else:
-        driver.save_screenshot(path)
-        logger.info(f"\nSaved screenshot: {str(path)}.")
+        png = driver.get_screenshot_as_png()
+        written = utils_file.write_artifact(path, lambda: png, mode='wb', buffered=buffered)
+        logger.info(f"\n{utils_file.saved_or_buffered(written)} screenshot: {str(path)}.")
 
 
 def save_element_screenshot(element, filename=''):
@@ -96,7 +384,7 @@ def save_element_screenshot(element, filename=''):
     filename = '%s_%s.png' % (time.strftime('%H%M%S'), filename.replace(' ', '_'))
 
     # Note: the path depends on the current test case!
-    path = f"{str(pytest.custom_namespace['testrun_screenshots_output'])}/{filename}"
+    path = str(runcontext.get_folder('screenshots') / filename)
 
     element.screenshot(path)
     logger.info(f"Saved element screenshot: {path}.")
@@ -112,10 +400,10 @@ def get_and_save_source(driver, filename=''):
                            defaults to empty string
         :return: None
     """
-    filename = '/%s_%s.html' % (time.strftime('%H%M%S'), filename.replace(' ', '_'))
+    filename = '%s_%s.html' % (time.strftime('%H%M%S'), filename.replace(' ', '_'))
 
     # Note: the path depends on the current test case!
-    path = f"{str(pytest.custom_namespace['this_test'])}/{filename}"
+    path = runcontext.current_testcase().folder / filename
 
     with open(path, 'w') as f:
         f.write(driver.page_source)
@@ -138,6 +426,175 @@ def extract_text_with_javascript(driver, element):
     return text
 
 
+# javascript functions to read field specs from elements, for
+# extract_elements() and extract_new_elements()
+EXTRACT_FUNCTIONS_JS = """
+    var readField = function (node, spec) {
+        if (spec === 'text') { return node.innerText.trim(); }
+        if (spec === 'html') { return node.innerHTML; }
+        if (spec === 'tag') { return node.tagName.toLowerCase(); }
+        if (spec.indexOf('attr:') === 0) { return node.getAttribute(spec.slice(5)); }
+        if (spec.indexOf('prop:') === 0) {
+            var value = node[spec.slice(5)];
+            return (value === undefined || typeof value === 'function') ? null : value;
+        }
+        throw new Error('unknown extract field: ' + spec);
+    };
+    var extractNode = function (node, fields, children) {
+        var row = {};
+        for (var key in fields) { row[key] = readField(node, fields[key]); }
+        for (var name in children) {
+            var child = children[name];
+            row[name] = extract(node, child.selector, child.fields, child.children);
+        }
+        return row;
+    };
+    var extract = function (root, selector, fields, children) {
+        var nodes = root.querySelectorAll(selector);
+        var rows = [];
+        for (var i = 0; i < nodes.length; i++) {
+            rows.push(extractNode(nodes[i], fields, children));
+        }
+        return rows;
+    };
+"""
+
+# for every element under arguments[0] (or the document) that matches the
+# css selector arguments[1], read the fields in arguments[2] and extract the
+# child specs in arguments[3]; see extract_elements()
+EXTRACT_JS = EXTRACT_FUNCTIONS_JS + """
+    return extract(arguments[0] || document, arguments[1], arguments[2], arguments[3]);
+"""
+
+# the element property that marks an element as already extracted
+EXTRACTED_PROPERTY = '__welkinExtracted'
+
+# call back with the elements that match the css selector arguments[0] and
+# aren't yet marked with the token arguments[3], extracted with the fields
+# arguments[1] and children arguments[2]; if there are none, scroll to the
+# bottom of the page and call back when new elements are added, or with
+# [] after arguments[4] msecs; see extract_new_elements()
+EXTRACT_NEW_JS = EXTRACT_FUNCTIONS_JS + f"""
+    var done = arguments[arguments.length - 1];
+    var selector = arguments[0], fields = arguments[1], children = arguments[2];
+    var token = arguments[3];
+    var takeNew = function () {{
+        var nodes = document.querySelectorAll(selector);
+        var rows = [];
+        for (var i = 0; i < nodes.length; i++) {{
+            if (nodes[i].{EXTRACTED_PROPERTY} !== token) {{
+                nodes[i].{EXTRACTED_PROPERTY} = token;
+                rows.push(extractNode(nodes[i], fields, children));
+            }}
+        }}
+        return rows;
+    }};
+    var rows = takeNew();
+    if (rows.length) {{
+        done(rows);
+        return;
+    }}
+    var observer = new MutationObserver(function () {{
+        var rows = takeNew();
+        if (rows.length) {{
+            clearTimeout(timer);
+            observer.disconnect();
+            done(rows);
+        }}
+    }});
+    var timer = setTimeout(function () {{
+        observer.disconnect();
+        done([]);
+    }}, arguments[4]);
+    observer.observe(document.body, {{childList: true, subtree: true}});
+    window.scrollTo(0, document.body.scrollHeight);
+"""
+
+
+def _normalize_extract_spec(fields, children):
+    """
+        Normalize the fields and children for EXTRACT_JS: fields become a
+        dict of output key: field spec, and every child spec gets
+        normalized fields and children.
+
+        :param fields: list of str field specs, or dict of key: field spec
+        :param children: dict, name: {'selector': str, 'fields': ..., 'children': ...}
+        :return: tuple, (fields dict, children dict)
+    """
+    if not isinstance(fields, dict):
+        fields = {spec: spec for spec in fields or []}
+    normalized = {}
+    for name, child in (children or {}).items():
+        child_fields, child_children = _normalize_extract_spec(
+            child.get('fields'), child.get('children'))
+        normalized[name] = {'selector': child['selector'], 'fields': child_fields,
+                            'children': child_children}
+    return fields, normalized
+
+
+def extract_elements(driver, selector, fields=('text',), children=None, root=None):
+    """
+        Extract data from every element that matches a css selector, in
+        one javascript call instead of a WebDriver round trip per element
+        per field.
+
+        A field spec is one of:
+            'text'          the element's rendered text, trimmed (like .text)
+            'html'          the element's innerHTML
+            'tag'           the element's lower-case tag name
+            'attr:<name>'   the value of attribute <name>, or None
+            'prop:<name>'   the value of DOM property <name>, or None
+
+        Pass `fields` as a list to key each value by its spec, or as a dict
+        of output key: spec. `children` extracts nested elements, e.g. the
+        cells of every row of a table:
+        >>> rows = extract_elements(driver, 'table tbody tr', fields=[],
+        ...                         children={'cells': {'selector': 'td',
+        ...                                             'fields': ['text']}})
+        >>> rows[0]
+        {'cells': [{'text': 'a1'}, {'text': 'b1'}]}
+
+        :param driver: webdriver instance
+        :param selector: str, css selector
+        :param fields: list or dict of field specs; defaults to ['text']
+        :param children: dict, name: {'selector': str, 'fields': list or dict,
+                                      'children': dict}, for nested elements
+        :param root: webelement to search within; defaults to the document
+        :return: list of dicts, one for each matching element
+    """
+    fields, children = _normalize_extract_spec(fields, children)
+    return driver.execute_script(EXTRACT_JS, root, selector, fields, children)
+
+
+def extract_new_elements(driver, selector, token, fields=('text',), children=None,
+                         idle_timeout=3):
+    """
+        Extract the elements that match a css selector and haven't been
+        extracted yet with `token`. If there are none, scroll to the bottom
+        of the page and wait (with a MutationObserver, in the browser) for
+        the page to add more.
+
+        Every extracted element is marked with `token` in the browser, so
+        each call only transfers the newly added elements. See
+        extract_elements() for the fields and children.
+
+        :param driver: webdriver instance
+        :param selector: str, css selector
+        :param token: str, identifies one pass over the list
+        :param fields: list or dict of field specs; defaults to ['text']
+        :param children: dict, name: child spec, for nested elements
+        :param idle_timeout: float, seconds to wait for new elements after
+                                    scrolling; defaults to 3
+        :return: list of dicts, one for each new element; empty if no new
+                 elements appeared
+    """
+    fields, children = _normalize_extract_spec(fields, children)
+    return waits.wait_for_signal(driver, EXTRACT_NEW_JS, selector, fields, children,
+                                 token, int(idle_timeout * 1000),
+                                 timeout=idle_timeout + waits.DEFAULT_TIMEOUT,
+                                 name='scroll for elements')
+
+
 def get_console_logs(pageobject):
     """
         Get the console for the browser, which may be empty, and write it to
@@ -298,36 +755,207 @@ def clear_session_storage(pageobject):
     logger.warning("sessionStorage has been cleared")
 
 
-def hard_clear_input_field(pageobject, element, name):
-    """
-        Manually clear a text input field by backspacing over
-        each character in that field's value string.
+# set the value of every field in arguments[1] (name: {selector, value})
+# under arguments[0] (or the document), the way a user would: the native
+# value setter (so frameworks like React see the change), then the focus,
+# input, change and blur events; read back every value; see fill_form()
+FILL_FORM_JS = """
+    var root = arguments[0] || document;
+    var fields = arguments[1];
+    var fire = function (element, type, bubbles) {
+        var EventType = (type.indexOf('focus') === 0 || type === 'blur') ? FocusEvent : Event;
+        element.dispatchEvent(new EventType(type, {bubbles: bubbles}));
+    };
+    var setValue = function (element, value) {
+        var proto = Object.getPrototypeOf(element);
+        var descriptor = Object.getOwnPropertyDescriptor(proto, 'value');
+        if (descriptor && descriptor.set) {
+            descriptor.set.call(element, value);
+        } else {
+            element.value = value;
+        }
+    };
+    var results = {};
+    for (var name in fields) {
+        var element = root.querySelector(fields[name].selector);
+        if (!element) {
+            results[name] = {found: false, value: null};
+            continue;
+        }
+        var type = (element.type || '').toLowerCase();
+        fire(element, 'focus', false);
+        fire(element, 'focusin', true);
+        if (type === 'checkbox' || type === 'radio') {
+            // a click toggles the control and fires its input/change events
+            if (element.checked !== Boolean(fields[name].value)) { element.click(); }
+        } else {
+            setValue(element, fields[name].value);
+            fire(element, 'input', true);
+            fire(element, 'change', true);
+        }
+        fire(element, 'blur', false);
+        fire(element, 'focusout', true);
+        var isToggle = type === 'checkbox' || type === 'radio';
+        results[name] = {found: true, value: isToggle ? element.checked : element.value};
+    }
+    return results;
+"""
+
+
+def fill_form(driver, fields, root=None):
+    """
+        Set the values of a set of form fields in one javascript call, and
+        read the values back in the same call.
+
+        Text inputs, textareas and selects are set with the element's
+        native value setter followed by input and change events, so
+        framework-managed fields (e.g. React) pick up the change and run
+        their validation. Checkboxes and radio buttons are clicked if their
+        checked state isn't `value`. Every field also gets focus and blur
+        events.
+
+        :param driver: webdriver instance
+        :param fields: dict, name: {'selector': str css selector,
+                                    'value': str, or bool for checkboxes/radios}
+        :param root: webelement with the form; defaults to the document
+        :return: dict, name: {'found': bool, 'value': the field's value after
+                              being set}
+    """
+    specs = {name: {'selector': field['selector'], 'value': field['value']}
+             for name, field in fields.items()}
+    return driver.execute_script(FILL_FORM_JS, root, specs)
+
+
+# the ways hard_clear_input_field() can clear a field
+CLEAR_STRATEGIES = ('select_all', 'native', 'keystrokes')
+# backspaces allowed beyond the value's length before the 'keystrokes'
+# strategy gives up, e.g. on a readonly or self-refilling field
+CLEAR_EXTRA_KEYSTROKES = 5
+
+# clear the field arguments[0] with its native value setter and fire the
+# input and change events, so framework-managed fields (e.g. React) see the
+# change; return the field's value after clearing
+CLEAR_FIELD_JS = """
+    var element = arguments[0];
+    var descriptor = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(element), 'value');
+    if (descriptor && descriptor.set) {
+        descriptor.set.call(element, '');
+    } else {
+        element.value = '';
+    }
+    element.dispatchEvent(new Event('input', {bubbles: true}));
+    element.dispatchEvent(new Event('change', {bubbles: true}));
+    return element.value;
+"""
+
+
+def hard_clear_input_field(pageobject, element, name, strategy='select_all'):
+    """
+        Clear a text input field that a plain element.clear() doesn't
+        clear, e.g. because the app's javascript restores the value.
 
         In an app with heavy DOM manipulation and field validation,
         the DOM handling of the field's value attribute get delayed, so
-        we have to get serious about removing the default value by:
-        1. moving the cursor all the way to the end of the value string
-           (assuming a left-to-right language like English).
-        2. sending a backspace key (in a L-R language, this moves leftward
-           until the strong is empty.
+        we have to get serious about removing the value. The strategies,
+        from the fastest:
+        1. 'select_all': select the whole value with ctrl/cmd+A and delete
+           it, as a user would; if the value survives, fall back to 'native'
+        2. 'native': set the value to '' with the field's native value
+           setter and fire input and change events, in one script call
+        3. 'keystrokes': move the cursor to the end of the value and
+           backspace over each character, waiting for the value to change
+           after each one; slow, so only use it for fields that need it
+
+        The result is verified, and the webstorage is saved afterwards,
+        because the app's javascript may update it as the field changes.
 
         :param pageobject: page object instance
         :param element: webelement
         :param name: str, name of field
+        :param strategy: str enum, one of CLEAR_STRATEGIES; defaults to 'select_all'
         :return element: webelement (after being cleared)
     """
+    if strategy not in CLEAR_STRATEGIES:
+        msg = f"clear strategy can only be one of {CLEAR_STRATEGIES}; " \
+              f"'{strategy}' is not valid."
+        logger.error(msg)
+        raise ValueError(msg)
+
+    driver = pageobject.driver
+    current_value = element.get_attribute('value')
+    logger.info(f"\nneed to unset '{current_value}' in field '{name}' "
+                f"with strategy '{strategy}'")
+
+    if strategy == 'select_all':
+        latest_value = _clear_by_select_all(driver, element)
+        if latest_value:
+            logger.warning(f"\nfield '{name}' still has value '{latest_value}' "
+                           f"after select-all and delete; clearing natively.")
+            strategy = 'native'
+    if strategy == 'native':
+        latest_value = driver.execute_script(CLEAR_FIELD_JS, element)
+    elif strategy == 'keystrokes':
+        latest_value = _clear_by_keystrokes(pageobject, element, name)
+
+    # the app's javascript may have updated webstorage with the change
+    pageobject.save_webstorage(event=f"hard cleared field '{name}'")
+    if latest_value == '':
+        return element
+    else:
+        fname = f"{name} field not cleared"
+        err_msg = f"Field '{name}' did not get cleared correctly, " \
+                  f"still has value '{latest_value}'"
+        logger.error(err_msg)
+        take_and_save_screenshot(driver, filename=fname)
+        raise ControlInteractionException(err_msg)
+
+
+def _clear_by_select_all(driver, element):
+    """
+        Select the whole value of a field and delete it with keystrokes.
+
+        :param driver: webdriver instance
+        :param element: webelement
+        :return: str, the field's value afterwards
+    """
+    platform = str(driver.capabilities.get('platformName', '')).lower()
+    modifier = Keys.COMMAND if platform.startswith('mac') else Keys.CONTROL
+    element.send_keys(modifier, 'a')
+    element.send_keys(Keys.DELETE)
+    return element.get_attribute('value')
+
+
+def _clear_by_keystrokes(pageobject, element, name):
+    """
+        Move the cursor to the end of a field's value, then backspace over
+        each character, logging each one as an event.
+
+        Gives up after CLEAR_EXTRA_KEYSTROKES more backspaces than the
+        value had characters, for fields where a backspace doesn't change
+        the value (readonly, masked or self-refilling fields).
+
+        :param pageobject: page object instance
+        :param element: webelement
+        :param name: str, name of field
+        :return latest_value: str, the field's value afterwards
+    """
     driver = pageobject.driver
     logger.warning("getting serious about clearing the default")
-    current_value = element.get_attribute('value')
-    value_length = len(current_value) + 1
-    logger.info(f"\nneed to unset '{current_value}'; {value_length} chars")
+    latest_value = element.get_attribute('value') or ''
+    value_length = len(latest_value) + 1
     # get the cursor all the way to the right
     for char in range(value_length):
         element.send_keys(Keys.RIGHT)
 
-    latest_value = None
-    while element.get_attribute('value'):
-        old_value = element.get_attribute('value')
+    max_keystrokes = len(latest_value) + CLEAR_EXTRA_KEYSTROKES
+    keystrokes = 0
+    while latest_value:
+        if keystrokes >= max_keystrokes:
+            logger.warning(f"\nfield '{name}' still has value '{latest_value}' "
+                           f"after {keystrokes} backspaces; giving up.")
+            break
+        keystrokes += 1
+        old_value = latest_value
         right_char = old_value[-1]
         logger.info(f"~~~~~~~~~>> right char '{right_char}'")
         # assume that we are at the end of any value
@@ -335,22 +963,19 @@ def hard_clear_input_field(pageobject, element, name):
         event = f"backspace char '{right_char}'"
         pageobject.set_event(event)
 
-        time.sleep(.5)  # give the browser a break, it's working hard
-        # we are logging event for every backspace because
-        # webstorage may get updated by javascript
+        # give the browser a break, it's working hard: wait for the value
+        # to change, rather than sleeping
+        try:
+            waits.wait_until(driver,
+                             lambda d: element.get_attribute('value') != old_value,
+                             timeout=2, name='field value change')
+        except TimeoutException:
+            logger.warning(f"\nfield '{name}' value did not change after backspace.")
         latest_value = element.get_attribute('value')
         logger.info(f"~~~~~~~~~>> value: '{latest_value}'")
 
-    time.sleep(2)  # let the DOM catch up
-    if latest_value == '':
-        return element
-    else:
-        fname = f"{name} field not cleared"
-        err_msg = f"Field '{name}' did not get cleared correctly, " \
-                  f"still has value '{latest_value}'"
-        logger.error(err_msg)
-        take_and_save_screenshot(driver, filename=fname)
-        raise ControlInteractionException(err_msg)
+    wait_for_page_ready(driver)  # let the DOM catch up
+    return latest_value
 
 
 def scroll_to_top_of_page(driver):
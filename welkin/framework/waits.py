@@ -0,0 +1,212 @@
+"""
+    The wait engine shared by the framework's checks and page transitions.
+
+    wait_until() is a drop-in for WebDriverWait(driver, timeout).until()
+    (and .until_not()), with two differences:
+        + adaptive polling: the first polls come quickly, then the interval
+          backs off to MAX_POLL, so a condition that is already (or almost)
+          true doesn't cost a fixed half second
+        + optionally, between polls it waits in the browser for the DOM to
+          change, instead of sleeping, so the condition is checked again as
+          soon as the page does something
+
+    wait_for_signal() waits for a push signal from the browser: a script
+    run with execute_async_script that calls back when the page is ready,
+    e.g. when a promise resolves or a MutationObserver fires. The wait's
+    timeout is enforced in the browser, so a signal wait costs one
+    WebDriver round trip; the driver's own script timeout is only raised
+    (once per driver) when a wait needs longer than it allows.
+
+    Every wait records its latency, and whether it timed out, in the run
+    metrics (see metrics.py) as 'wait <name>'.
+"""
+import logging
+import time
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import WebDriverException
+
+from welkin.framework import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 10
+# the first poll interval, how fast it backs off, and the longest interval
+FIRST_POLL = 0.05
+BACKOFF = 1.5
+MAX_POLL = 0.5
+
+# resolve after the first DOM mutation, or after arguments[0] msecs
+DOM_MUTATION_JS = """
+    var done = arguments[arguments.length - 1];
+    var observer = new MutationObserver(function () {
+        clearTimeout(timer);
+        observer.disconnect();
+        done(true);
+    });
+    var timer = setTimeout(function () {
+        observer.disconnect();
+        done(false);
+    }, arguments[0]);
+    observer.observe(document, {childList: true, subtree: true,
+                                attributes: true, characterData: true});
+"""
+
+# the least script timeout set on a driver for signal waits, in seconds
+MIN_SCRIPT_TIMEOUT = 60
+# run a signal script with a timer that calls back with the timeout marker
+# after arguments[0] msecs; the script gets the remaining arguments
+SIGNAL_TIMEOUT_MARKER = '__welkinSignalTimeout'
+SIGNAL_SCRIPT_PLACEHOLDER = '/* welkin signal script */'
+SIGNAL_WRAPPER_JS = """
+    var args = Array.prototype.slice.call(arguments, 1);
+    var callback = args[args.length - 1];
+    var timer = setTimeout(function () {
+        callback('""" + SIGNAL_TIMEOUT_MARKER + """');
+    }, arguments[0]);
+    args[args.length - 1] = function (value) {
+        clearTimeout(timer);
+        callback(value);
+    };
+    (function () {
+""" + SIGNAL_SCRIPT_PLACEHOLDER + """
+    }).apply(this, args);
+"""
+# the script timeout set on each driver, see _ensure_script_timeout()
+SCRIPT_TIMEOUT_ATTRIBUTE = '_welkin_script_timeout'
+
+
+def wait_until(driver, condition, timeout=DEFAULT_TIMEOUT, name='condition',
+               message='', negate=False, on_mutation=False,
+               ignored_exceptions=(NoSuchElementException,)):
+    """
+        Poll `condition` until it returns a truthy value (or, with
+        `negate`, a falsy value) or the timeout runs out.
+
+        Like WebDriverWait, the exceptions in `ignored_exceptions` count as
+        a falsy result.
+
+        :param driver: webdriver instance
+        :param condition: callable, condition(driver), e.g. an expected_conditions
+                                    instance
+        :param timeout: int, seconds to wait; defaults to DEFAULT_TIMEOUT
+        :param name: str, name for the wait in the run metrics
+        :param message: str, message for the TimeoutException
+        :param negate: bool, wait for the condition to be falsy, as with
+                             WebDriverWait.until_not(); defaults to False
+        :param on_mutation: bool, between polls wait for the DOM to change
+                                  rather than sleeping; defaults to False
+        :param ignored_exceptions: tuple of exception classes
+        :return: the condition's truthy value, or True if `negate`
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    interval = FIRST_POLL
+    while True:
+        try:
+            value = condition(driver)
+        except ignored_exceptions:
+            value = False
+        if negate and not value:
+            _record(name, start)
+            return True
+        if not negate and value:
+            _record(name, start)
+            return value
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            _record(name, start, failed=True)
+            raise TimeoutException(message)
+        pause = min(interval, remaining)
+        if on_mutation:
+            _wait_for_mutation(driver, pause)
+        else:
+            time.sleep(pause)
+        interval = min(interval * BACKOFF, MAX_POLL)
+
+
+def wait_for_signal(driver, script, *args, timeout=DEFAULT_TIMEOUT, name='signal'):
+    """
+        Run `script` with execute_async_script and wait for it to call back.
+
+        The script gets `args` as its arguments, followed by the callback,
+        which it must call when its signal fires, e.g.:
+            var done = arguments[arguments.length - 1];
+            somePromise.then(function () { done(true); });
+
+        :param driver: webdriver instance
+        :param script: str, javascript to run
+        :param args: the script's arguments
+        :param timeout: int, seconds to wait; defaults to DEFAULT_TIMEOUT
+        :param name: str, name for the wait in the run metrics
+        :return: the value the script called back with
+    """
+    start = time.monotonic()
+    _ensure_script_timeout(driver, timeout)
+    try:
+        value = driver.execute_async_script(
+            SIGNAL_WRAPPER_JS.replace(SIGNAL_SCRIPT_PLACEHOLDER, script),
+            int(timeout * 1000), *args)
+    except TimeoutException:
+        _record(name, start, failed=True)
+        raise
+    if value == SIGNAL_TIMEOUT_MARKER:
+        _record(name, start, failed=True)
+        raise TimeoutException(f"no signal for {name} after {timeout}s")
+    _record(name, start)
+    return value
+
+
+def _ensure_script_timeout(driver, timeout):
+    """
+        Make sure the driver's script timeout outlasts a signal wait.
+
+        The timeout set on the driver is remembered on the driver object,
+        so it is only set (one round trip) the first time, or when a wait
+        needs longer; it is never lowered, so other async scripts aren't cut
+        short.
+
+        :param driver: webdriver instance
+        :param timeout: int, seconds the signal wait can take
+        :return: None
+    """
+    current = getattr(driver, SCRIPT_TIMEOUT_ATTRIBUTE, None)
+    # leave a margin, so the browser-side timer fires first
+    needed = timeout + 5
+    if current is not None and current >= needed:
+        return
+    script_timeout = max(needed, MIN_SCRIPT_TIMEOUT)
+    driver.set_script_timeout(script_timeout)
+    setattr(driver, SCRIPT_TIMEOUT_ATTRIBUTE, script_timeout)
+
+
+def _wait_for_mutation(driver, pause):
+    """
+        Wait up to `pause` seconds for the DOM to change.
+
+        :param driver: webdriver instance
+        :param pause: float, seconds
+        :return: None
+    """
+    try:
+        driver.execute_async_script(DOM_MUTATION_JS, int(pause * 1000))
+    except WebDriverException:
+        # e.g. the document was unloaded while waiting, which is a change
+        pass
+
+
+def _record(name, start, failed=False):
+    """
+        Record the latency of a wait in the run metrics.
+
+        :param name: str, name of the wait
+        :param start: float, time.monotonic() at the start of the wait
+        :param failed: bool, whether the wait timed out; defaults to False
+        :return: None
+    """
+    elapsed = time.monotonic() - start
+    metrics.record(f"wait {name}", elapsed, failed=failed)
+    if failed:
+        logger.warning(f"\nwait for {name} timed out after {elapsed:.3f}s.")
@@ -7,7 +7,9 @@ from pathlib import Path
 
 from applitools.selenium import *
 
-from welkin.framework import utils
+from welkin.framework import utils, runcontext, utils_logging, utils_file, capture
+from welkin.framework import driver_pool, metrics, routing, navigation, history
+from welkin.framework.exceptions import RoutingException
 
 logger = logging.getLogger(__name__)
 
@@ -16,9 +18,13 @@ FRAMEWORK = 'welkin'
 TESTRUN_LOGFILE_NAME = 'runlog.txt'
 TESTCASE_LOGFILE_NAME = 'testlog.txt'
 TESTRUN_HTML_REPORT = 'report.html'
-# hacky global counter for iterating over collected
-# tests in pytest_runtest_setup()
-COUNT = 1
+# per-test data stored on the collected test items
+TESTCASE_NUMBER = pytest.StashKey[int]()
+TESTCASE_CONTEXT_TOKEN = pytest.StashKey[object]()
+TESTCASE_CONTEXT = pytest.StashKey[runcontext.TestCaseContext]()
+# browser drivers for the test run
+DRIVER_POOL = pytest.StashKey[driver_pool.DriverPool]()
+DRIVER_PREWARMER = pytest.StashKey[driver_pool.DriverPrewarmer]()
 
 
 def update_namespace(data: dict, verbose: bool = False):
@@ -30,6 +36,9 @@ def update_namespace(data: dict, verbose: bool = False):
 
         Any change to this dict is global and will have side effects.
 
+        Only what changed is logged: a key whose value is already in the
+        namespace is skipped, so repeated updates don't bloat the run log.
+
         :param data: dict of items to add to the namespace
         :param verbose: bool, whether to output additional logging
         :return: None
@@ -42,16 +51,19 @@ def update_namespace(data: dict, verbose: bool = False):
             logger.info('\nnamespace doesn\'t exist, so creating it')
 
     for key, value in data.items():
-        # sometimes we feed in a value that's a dict, so handle nesting
-        if isinstance(value, dict):
-            for k, v in data[key].items():
-                # update the hacky namespace object
-                pytest.custom_namespace[key] = {k: value}
-                if verbose:
-                    logger.info(f"\nadded namespace '{k}': '{v}'")
+        existed = key in pytest.custom_namespace
+        previous = pytest.custom_namespace.get(key)
         # update the hacky namespace object
         pytest.custom_namespace[key] = value
-        if verbose:
+        if not verbose or (existed and previous == value):
+            continue
+        # sometimes we feed in a value that's a dict, so log only the
+        # nested items that changed
+        if isinstance(value, dict) and isinstance(previous, dict):
+            for k, v in value.items():
+                if k not in previous or previous[k] != v:
+                    logger.info(f"\nupdated namespace '{key}' '{k}': '{v}'")
+        else:
             logger.info(f"\nadded namespace '{key}': '{value}'")
 
 
@@ -102,6 +114,100 @@ def pytest_addoption(parser):
                      default=None,
                      help='Provide the str API key for data.gov.')
 
+    parser.addoption('--reuse_drivers',
+                     action='store',
+                     dest='reuse_drivers',
+                     choices=['yes', 'no'],
+                     default='yes',
+                     help='Reuse warm browser drivers between tests? "yes" or "no"')
+
+    parser.addoption('--prewarm_drivers',
+                     action='store',
+                     dest='prewarm_drivers',
+                     choices=['yes', 'no'],
+                     default='no',
+                     help='Launch the next test\'s browser driver in the background '
+                          'while the current test runs? "yes" or "no"')
+
+    parser.addoption('--driver_max_uses',
+                     action='store',
+                     dest='driver_max_uses',
+                     type=int,
+                     default=driver_pool.DEFAULT_MAX_USES,
+                     help='Number of tests that can reuse a pooled browser driver '
+                          'before it is replaced.')
+
+    parser.addoption('--capture_level',
+                     action='store',
+                     dest='capture_level',
+                     choices=capture.CAPTURE_LEVELS,
+                     default=capture.DEFAULT_CAPTURE_LEVEL,
+                     help='Specify how much page data to collect on page loads: '
+                          '"minimal", "standard", "forensic".')
+
+    parser.addoption('--artifacts',
+                     action='store',
+                     dest='artifacts',
+                     choices=['on_failure', 'always'],
+                     default='on_failure',
+                     help='When to write routine artifacts (cookies, webstorage, '
+                          'browser logs, unload screenshots): "on_failure", "always".')
+
+    parser.addoption('--artifact_buffer_size',
+                     action='store',
+                     dest='artifact_buffer_size',
+                     type=int,
+                     default=utils_file.ARTIFACT_BUFFER_SIZE,
+                     help='Max number of routine artifacts held in memory per test '
+                          'until the test fails.')
+
+    parser.addoption('--artifact_format',
+                     action='store',
+                     dest='artifact_format',
+                     choices=list(utils_file.ARTIFACT_FORMATS),
+                     default=utils_file.DEFAULT_ARTIFACT_FORMAT,
+                     help='How to write json artifacts: "json" (a file per artifact), '
+                          '"ndjson" (one compact record per line, a file per folder).')
+
+    parser.addoption('--history',
+                     action='store',
+                     dest='history',
+                     choices=['yes', 'no'],
+                     default='yes',
+                     help='Append this run\'s test phase, fixture, page load and endpoint '
+                          'timings to the output folder\'s history database? "yes" or "no"')
+
+    parser.addoption('--runlog_format',
+                     action='store',
+                     dest='runlog_format',
+                     choices=list(utils_logging.LOG_FORMATS),
+                     default=utils_logging.DEFAULT_LOG_FORMAT,
+                     help='Which logs to write: "text" (the run and test case logs), '
+                          '"jsonl" (one JSON record per line for the whole run), "both".')
+
+    parser.addoption('--runlog_max_megabytes',
+                     action='store',
+                     dest='runlog_max_megabytes',
+                     type=int,
+                     default=utils_logging.JSONL_MAX_MEGABYTES,
+                     help='Size at which the JSONL run log is rotated; 0 never rotates.')
+
+    parser.addoption('--runlog_compression',
+                     action='store',
+                     dest='runlog_compression',
+                     choices=list(utils_logging.LOG_COMPRESSIONS),
+                     default=utils_logging.DEFAULT_LOG_COMPRESSION,
+                     help='How to compress rotated JSONL run log segments: '
+                          '"gzip", "zstd" (needs the zstandard package), "none".')
+
+    parser.addoption('--artifact_writers',
+                     action='store',
+                     dest='artifact_writers',
+                     type=int,
+                     default=utils_file.ARTIFACT_WRITER_THREADS,
+                     help='Number of background threads writing artifact files; '
+                          '0 writes them synchronously on the test thread.')
+
 
 # 1.0
 def pytest_configure(config):
@@ -121,16 +227,25 @@ def pytest_configure(config):
         2. extracting important options and adding them to the
           custom namespace
 
+        3. starting the background writer for artifact files (cookies,
+           webstorage, network logs, etc.), see framework/utils_file.py
+
         :param config: pytest Config object
         :return: None
     """
     initialize_logging(config)
     logger.info(f"sys.argv: {sys.argv}")
+    utils_file.start_artifact_writer(threads=config.getoption('artifact_writers'))
+    utils_file.set_artifact_format(config.getoption('artifact_format'))
+
+    # collect timings for the history database, unless only collecting tests
+    history.run_history.enabled = config.getoption('history') == 'yes' and \
+        not config.option.collectonly
 
     # extract the values of the following sys.args options
     # and push them into the namespace
     namespace_data = {}
-    opts = ['browser', 'tier']
+    opts = ['browser', 'tier', 'capture_level']
     for item in opts:
         namespace_data[item] = config.getoption(item)
 
@@ -149,6 +264,27 @@ def pytest_configure(config):
     # because we need know to know that immediately
     applitools_run_config(config)
 
+    # set up the background launcher for browser drivers
+    if config.getoption('prewarm_drivers') == 'yes':
+        config.stash[DRIVER_PREWARMER] = \
+            driver_pool.DriverPrewarmer(launch=launch_prewarmed_driver)
+
+
+# 1.2
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """
+        A pytest-xdist hook called on the controller for each worker node
+        before it starts.
+
+        Hand the controller's run timestamp to the worker, so that every
+        worker writes into the same testrun output folder.
+
+        :param node: xdist WorkerController object
+        :return: None
+    """
+    node.workerinput['welkin timestamp'] = pytest.custom_namespace['timestamp']
+
 
 # 2.0
 def pytest_sessionstart(session):
@@ -203,10 +339,27 @@ def pytest_collection_finish(session):
         A pytest hook called after test collection has finished; we now know
         what tests will be run.
 
+        Number each test by its position in the collection order. The
+        number is used in the naming of the test output folder. Every
+        pytest-xdist worker collects the same ordered list of tests, so the
+        numbers are unique across workers and the folders never collide.
+
+        Build the page object routing registry and navigation graph, which
+        validate every routings.py under welkin/apps and the page objects'
+        nav links; a route to a missing module, class or page stops the
+        test run here, before any test starts a browser.
+
         :param session: pytest Session object
         :return: None
     """
-    logger.info("no actions taken.")
+    for number, item in enumerate(session.items, start=1):
+        item.stash[TESTCASE_NUMBER] = number
+    logger.info(f"\nnumbered {len(session.items)} collected tests.")
+
+    try:
+        navigation.build_graph(routing.build_registry())
+    except RoutingException as e:
+        pytest.exit(str(e.errors), returncode=pytest.ExitCode.USAGE_ERROR)
     # logger.info(f"\nsession.__dict__:\n{utils.plog(session.__dict__)}")
 
 
@@ -222,8 +375,36 @@ def pytest_runtestloop(session):
 def pytest_runtest_protocol(item, nextitem):
     """
         A pytest hook called before the tests.
+
+        If prewarming drivers, look ahead to the next test: if it will need
+        a new browser, start launching that browser now, on a background
+        thread, so it is ready when the next test is set up.
+
+        The next test needs a new browser if it uses the `driver` fixture
+        and either won't use the driver pool, or the pool won't have an
+        idle driver for it (this test doesn't use one either, so it won't
+        return one to the pool).
+
+        :param item: the test method about to be run
+        :param nextitem: the test method to be run next, or None
+        :return: None
     """
-    pass
+    prewarmer = item.config.stash.get(DRIVER_PREWARMER, None)
+    if not prewarmer or not nextitem or 'driver' not in nextitem.fixturenames:
+        return None
+    applitools = pytest.custom_namespace.get('applitools', {})
+    if applitools.get('use execution cloud'):
+        return None
+
+    browser = item.config.getoption('browser')
+    if nextitem.get_closest_marker('fresh_browser') \
+            or item.config.getoption('reuse_drivers') == 'no':
+        prewarmer.start(browser)
+    elif 'driver' not in item.fixturenames:
+        pool = item.config.stash.get(DRIVER_POOL, None)
+        if not pool or not pool.idle.get(browser):
+            prewarmer.start(browser)
+    return None
 
 
 # 7.0
@@ -257,12 +438,12 @@ def pytest_runtest_setup(item):
                        |- screenshots (created here)
                        |- webstorage (created here)
 
-        3. Switch the logger from the root logger to the apps logger.
-           This in effect moves the logging "firehose" from pointing at
-           `TESTRUN_LOGFILE_NAME` to pointing at `TESTCASE_LOGFILE_NAME`.
+        3. Bind the run context for the test case, which routes the logging
+           "firehose" from `TESTRUN_LOGFILE_NAME` to the test case's
+           `TESTCASE_LOGFILE_NAME` (see framework/utils_logging.py).
 
-        4. When the test case (test method) exits, the logger is
-           re-pointed at the root logger.
+        4. When the test case (test method) exits, the run context is
+           released and logging goes back to `TESTRUN_LOGFILE_NAME`.
 
         :param item: a test method.
         :return: None
@@ -277,8 +458,9 @@ def pytest_runtest_setup(item):
         test_name = item.__dict__['name']
     except KeyError:
         test_name = item.name
-    # insert COUNT so that the folders sort by collection order
-    short_name = f"{COUNT}_{test_name[5:]}"
+    # insert the collection number so that the folders sort by collection order
+    number = item.stash[TESTCASE_NUMBER]
+    short_name = f"{number}_{test_name[5:]}"
 
     # extract the fixture names associated with this current test
     fixtures = []
@@ -286,64 +468,38 @@ def pytest_runtest_setup(item):
     logger.info(f"\nreferenced_fixtures: {referenced_fixtures}")
     for this_fixture in referenced_fixtures:
         fixtures.append(this_fixture)
-    # `COUNT` is used in the naming of the test output folder;
-    # we need them to increment for each collected test
-    globals()['COUNT'] += 1  # this is hacky because there is no iterator
 
     # create the output folder for this test case
     test_run_path = pytest.custom_namespace['testrun paths']['folder']
     testcase_folder_path = test_run_path / short_name
     create_test_output_subfolder(testcase_folder_path)
 
-    # set up the appropriate sub-folders and
-    # special log files for this test case
-    set_up_testcase_reporting(testcase_folder_path, fixtures)
+    # set up the run context for this test case; the framework's artifact
+    # writers get their output folders from this context, and unless
+    # every artifact is wanted, routine artifacts are held in its buffer
+    # until the test fails
+    buffer_size = None
+    if item.config.getoption('artifacts') == 'on_failure':
+        buffer_size = item.config.getoption('artifact_buffer_size')
+    testcase = runcontext.TestCaseContext(nodeid=item.nodeid, name=short_name,
+                                          number=number, folder=testcase_folder_path,
+                                          buffer_size=buffer_size)
+    testcase.logfile = testcase_folder_path / TESTCASE_LOGFILE_NAME
+    item.stash[TESTCASE_CONTEXT] = testcase
 
     # set up global namespace path-to-this-testcase value
     namespace_data['this_test'] = testcase_folder_path
     logger.warning("\n### Changing log output path to the test case path. ###\n\n")
-
-    # redirect logging from the test run logger to the test case logger
-    path_to_logfile = str(testcase_folder_path / TESTCASE_LOGFILE_NAME)
     logger.info(f"\n{'#' * 30}\n=====>> Testcase {item.name} "
-                f"logged to {path_to_logfile}\n{'#' * 30}\n\n")
-    log_kwargs = {
-        'version': 1,
-        'disable_existing_loggers': False,
-        'formatters': {
-            'detailed': {
-                'class': 'logging.Formatter',
-                'format': '%(asctime)s %(name)s::%(funcName)s() [%(levelname)s] %(message)s'
-            },
-        },
-        'handlers': {
-            'default': {
-                'class': 'logging.FileHandler',
-                'filename': path_to_logfile,
-                'mode': 'a',
-                'formatter': 'detailed'
-            },
-            'foo': {
-                'class': 'logging.FileHandler',
-                'filename': path_to_logfile,
-                'mode': 'a',
-                'formatter': 'detailed'
-            }
-        },
-        'loggers': {
-            '': {  # root
-                'handlers': ['foo'],
-                'level': 'INFO',
-                'propagate': False
-            },
-            f"{FRAMEWORK}.apps": {
-                'handlers': ['foo'],
-                'level': 'INFO',
-                'propagate': False
-            },
-        }
-    }
-    filename = set_logging_config(log_kwargs)  # noqa: F841
+                f"logged to {testcase.logfile}\n{'#' * 30}\n\n")
+
+    # bind the run context, which also routes logging from the test run
+    # log file to the test case log file
+    item.stash[TESTCASE_CONTEXT_TOKEN] = runcontext.bind_testcase(testcase)
+
+    # set up the appropriate sub-folders and
+    # special log files for this test case
+    set_up_testcase_reporting(testcase, fixtures)
 
     # update our hacky namespace
     update_namespace(namespace_data, verbose=True)
@@ -351,57 +507,116 @@ def pytest_runtest_setup(item):
     yield
 
 
+# 7.3
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    """
+        A pytest hook run to set up each fixture, when its value isn't
+        already cached for its scope.
+
+        Record the fixture's setup cost in the run history, see
+        framework/history.py.
+
+        :param fixturedef: pytest FixtureDef object
+        :param request: pytest request object for the fixture
+        :return: None
+    """
+    start = time.monotonic()
+    outcome = yield
+    history.record('fixture', fixturedef.argname, time.monotonic() - start,
+                   failed=outcome.excinfo is not None, nodeid=request.node.nodeid)
+
+
+# 7.5
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+        A pytest hook run to create the report for each test phase.
+
+        When a phase fails, write out the routine artifacts buffered for the
+        test, and wait for the background artifact writer to write out
+        everything the test has captured so far, so that the artifacts are
+        complete when the failure is reported.
+
+        When the test finishes without failing, drop its buffered artifacts.
+
+        Record the phase's duration in the run history.
+
+        :param item: a collected test method
+        :param call: pytest CallInfo object for the phase
+        :return: None
+    """
+    outcome = yield
+    report = outcome.get_result()
+    history.record('phase', report.when, report.duration, failed=report.failed,
+                   nodeid=item.nodeid)
+    testcase = item.stash.get(TESTCASE_CONTEXT, None)
+    if report.failed:
+        if testcase:
+            utils_file.write_buffered_artifacts(testcase)
+        utils_file.flush_artifacts()
+    if testcase and report.when == 'teardown':
+        utils_file.discard_buffered_artifacts(testcase)
+        del item.stash[TESTCASE_CONTEXT]
+
+
 # 8.0
+@pytest.hookimpl(hookwrapper=True)
 def pytest_runtest_teardown(item, nextitem):
     """
         A pytest hook run at test teardown.
 
-        Point the logger from the test case back to the test run context.
+        After the fixtures have been torn down, wait for the background
+        artifact writer to finish writing this test's artifacts, then
+        release the run context for the test case, which points the logger
+        from the test case back to the test run log file.
 
         :param item: a collected test method
         :param nextitem: a test method to be run next
         :return: None
     """
     logger.info(f"\n### Tear down for test {item.name} ###")
-    path_to_logfile = pytest.custom_namespace['testrun paths']['logfile']
 
-    log_kwargs = {
-        'version': 1,
-        'disable_existing_loggers': False,
-        'formatters': {
-            'detailed': {
-                'class': 'logging.Formatter',
-                'format': '%(asctime)s %(name)s::%(funcName)s() [%(levelname)s] %(message)s'
-            },
-        },
-        'handlers': {
-            'default': {
-                'class': 'logging.FileHandler',
-                'filename': path_to_logfile,
-                'mode': 'a',
-                'formatter': 'detailed'
-            },
-        },
-        'loggers': {
-            '': {  # root
-                'handlers': ['default'],
-                'level': 'INFO',
-                'propagate': False
-            },
-        }
-    }
+    yield
 
+    # finish writing this test's artifacts while its context is still bound
+    utils_file.flush_artifacts()
+
+    # log the test's metrics, e.g. how long its waits took
+    testcase = runcontext.current_testcase(required=False)
+    if testcase and testcase.metrics:
+        logger.info("\nmetrics for test %s:\n%s",
+                    item.name, utils.lazy_plog(testcase.metrics.summary()))
+
+    # release the run context for this test case
     logger.info('\n### Closing test case logfile ###\n\n')
-    filename = set_logging_config(log_kwargs)
-    logger.info(f"\n### Reset logfile to {filename} ###\n\n\n")
+    token = item.stash.get(TESTCASE_CONTEXT_TOKEN, None)
+    if token:
+        runcontext.unbind_testcase(token)
+        del item.stash[TESTCASE_CONTEXT_TOKEN]
+    path_to_logfile = pytest.custom_namespace['testrun paths']['logfile']
+    logger.info(f"\n### Reset logfile to {path_to_logfile} ###\n\n\n")
 
 
 # 9.0
 def pytest_sessionfinish(session, exitstatus):
     """
         This hook is called after the whole test run finishes.
+
+        Log the metrics totals for the test run (for this worker, if
+        running under pytest-xdist), see framework/metrics.py, and append
+        the run's timings to the history database in the output folder,
+        see framework/history.py.
     """
-    logger.info('No actions taken.')
+    logger.info("\nmetrics for the test run:\n%s",
+                utils.lazy_plog(metrics.run_metrics.summary()))
+
+    if history.run_history.enabled:
+        output_folder = pytest.custom_namespace['testrun paths']['folder'].parent
+        history.run_history.write(output_folder / history.HISTORY_DB_NAME,
+                                  run_timestamp=pytest.custom_namespace['timestamp'],
+                                  tier=pytest.custom_namespace.get('tier'),
+                                  browser=pytest.custom_namespace.get('browser'))
 
 
 # 10.0
@@ -412,10 +627,18 @@ def pytest_unconfigure(config):
 
         This is where you would include logic for processing summary data.
 
+        Quit any prewarmed driver that wasn't used, then stop the artifact
+        writer and then the logging listener, which write out any queued
+        artifacts and log records.
+
         :param config: pytest config object
         :return: None
     """
-    pass
+    prewarmer = config.stash.get(DRIVER_PREWARMER, None)
+    if prewarmer:
+        prewarmer.close()
+    utils_file.stop_artifact_writer()
+    utils_logging.stop_logging()
 
 
 @pytest.fixture(scope='session', autouse=True)
@@ -440,21 +663,6 @@ def configure_test_session(request):
 # #########################################
 # framework fixtures ######################
 # #########################################
-def set_logging_config(kwargs):
-    """
-        Configure and start the framework logging.
-
-        :param kwargs: dict, logger config arguments
-        :return filename: Path object for path to log file
-    """
-    import logging.config
-    # start logging
-    logging.config.dictConfig(kwargs)
-    filename = kwargs['handlers']['default']['filename']
-    logger.info(f"\ncreated log file at '{filename}'.")
-    return filename
-
-
 # 1.1
 def initialize_logging(config):
     """
@@ -467,16 +675,27 @@ def initialize_logging(config):
     namespace_data = {}
 
     # set timestamp for the start of this test run;
-    # this is used globally for this run
-    timestamp = time.strftime('%y%m%d-%H%M%S')
+    # this is used globally for this run. pytest-xdist workers
+    # use the controller's timestamp, so they share the run folder.
+    workerinput = getattr(config, 'workerinput', None)
+    if workerinput:
+        timestamp = workerinput['welkin timestamp']
+    else:
+        timestamp = time.strftime('%y%m%d-%H%M%S')
     namespace_data['timestamp'] = timestamp
+    namespace_data['worker'] = runcontext.get_worker_id()
 
     # update our hacky namespace
     update_namespace(namespace_data, verbose=True)
 
     # create the output folder for this test run
     framework_folder, testrun_folder = create_run_output_folder(timestamp)
-    path_to_logfile = str(testrun_folder / TESTRUN_LOGFILE_NAME)
+
+    # each xdist worker gets its own run log
+    runlog_name = TESTRUN_LOGFILE_NAME
+    if runcontext.is_worker():
+        runlog_name = f"{Path(runlog_name).stem}_{runcontext.get_worker_id()}.txt"
+    path_to_logfile = str(testrun_folder / runlog_name)
 
     # Change the path specified for the html test results report to include
     # the testrun's timestamp output folder. The report is generated by the
@@ -491,47 +710,27 @@ def initialize_logging(config):
     config.option.htmlpath = html_path
 
     # start logging; nothing that happens before this gets logged!
-    log_kwargs = {
-        'version': 1,
-        'disable_existing_loggers': False,
-        'formatters': {
-            'detailed': {
-                'class': 'logging.Formatter',
-                'format': '%(asctime)s %(name)s::%(funcName)s() [%(levelname)s] %(message)s'
-            },
-        },
-        'handlers': {
-            'default': {
-                'class': 'logging.FileHandler',
-                'filename': path_to_logfile,
-                'mode': 'a',
-                'formatter': 'detailed'
-            },
-        },
-        'loggers': {
-            '': {  # root logger
-                'handlers': ['default'],
-                'level': 'INFO',
-                'propagate': False
-            },
-        }
-    }
-    set_logging_config(log_kwargs)
+    # This is the only logging configuration for the run: test case log
+    # files are routed to by the run context, see framework/utils_logging.py
+    utils_logging.start_logging(path_to_logfile, level='INFO',
+                                log_format=config.getoption('runlog_format'),
+                                max_megabytes=config.getoption('runlog_max_megabytes'),
+                                compression=config.getoption('runlog_compression'))
 
     # create test run paths for namespace
     paths = {'testrun paths': {
                 'folder': testrun_folder,
-                'logfile': testrun_folder / TESTRUN_LOGFILE_NAME,
+                'logfile': testrun_folder / runlog_name,
                 'html report': htmlreport_path
     }}
     # update our hacky namespace
     logging.info('\n--> setting paths in namespace')
     update_namespace(paths, verbose=True)
 
-    # set up test case namespacing
-    update_namespace({'test cases': {}})
-
-    logger.info(f"\nnamespace:\n{utils.plog(pytest.custom_namespace)}")
+    # the test cases that have run are kept in the run context's index
+    # (see runcontext.get_testcase_index()), not in the namespace, so the
+    # namespace stays small enough to log
+    logger.info("\nnamespace:\n%s", utils.plog(pytest.custom_namespace))
 
 
 def redirect_applitools_logging(testrun_folder):
@@ -576,12 +775,11 @@ def create_run_output_folder(timestamped_name):
     testrun_path = output_path / timestamped_name
 
     # create the output path if it doesn't exist
-    if not output_path.exists():
-        output_path.mkdir()
+    output_path.mkdir(exist_ok=True)
 
-    # create the testrun folder (it won't already exist)
-    if not testrun_path.exists():
-        testrun_path.mkdir()
+    # create the testrun folder; it won't already exist unless
+    # this is a pytest-xdist worker sharing the controller's folder
+    testrun_path.mkdir(exist_ok=True)
 
     return framework_root_path, testrun_path
 
@@ -602,7 +800,7 @@ def create_test_output_subfolder(path):
 
 
 # 7.2
-def set_up_testcase_reporting(testcase_folder, fixturenames):
+def set_up_testcase_reporting(testcase, fixturenames):
     """
         For every specific test instance being run, create the various output
         folders needed for the different kinds of reporting and logging (beyond
@@ -611,7 +809,7 @@ def set_up_testcase_reporting(testcase_folder, fixturenames):
         be logged or saved, so create the folders appropriate to this test's
         apps.
 
-        :param testcase_folder: Path, path to the current test case's folder
+        :param testcase: TestCaseContext, run context for the current test case
         :param fixturenames: list, string fixture names for this testcase
         :return: None
     """
@@ -621,9 +819,9 @@ def set_up_testcase_reporting(testcase_folder, fixturenames):
         msg = "Subfolders NOT created because this testrun is collect-only."
         logger.info(msg)
     else:
+        testcase_folder = testcase.folder
         logger.info(f"\nfixturenames: {fixturenames}")
         logger.info(f"\ntestcase_folder: {testcase_folder}")
-        testcase = testcase_folder.parts[-1]
 
         # #############################################
         # after you add an app fixture to conftest.py, you must add
@@ -670,33 +868,31 @@ def set_up_testcase_reporting(testcase_folder, fixturenames):
         # #############################################
         # For the current test case, create the relevant child folders
         # to which various logging and output will be written.
-        # Note: This mechanism relies on side effects! Specifically,
-        # various framework write methods pull paths from the custom
-        # namespace, and those paths are overwritten here in
-        # set_up_testcase_reporting(). This will be a problem
-        # if we attempt to parallelize the execution of the
-        # collected tests.
+        # The framework write methods pull these paths from the run
+        # context bound for this test case (see runcontext.py), not from
+        # the custom namespace, so tests can run in parallel.
         # #############################################
-        paths = {testcase: {}}  # set up individual test case namespace
-        current_testcase = {'current test case': {'name': testcase}}
         for folder in folders_to_create:
             this_folder_path = testcase_folder / folder
             create_test_output_subfolder(this_folder_path)
             logger.info(f"\ncreated folder '{folder}': {this_folder_path}")
 
-            # update local data model
-            paths[testcase][f"{folder} folder"] = this_folder_path
+            # update the run context
+            testcase.add_folder(folder, this_folder_path)
 
-        # manually *add* (not overwrite) this test case info to the namespace
-        pytest.custom_namespace['test cases'].update(paths)
+        # add this test case to the index of test cases that have run; the
+        # index is never logged whole, so just log its size
+        index = runcontext.get_testcase_index()
+        index.add(testcase)
+        logger.info(f"\nindexed test case {testcase.number} '{testcase.name}'; "
+                    f"{len(index)} test cases indexed")
 
-        # overwrite the namespace entry for 'current test case'
-        current_testcase['current test case'].update(paths[testcase])
+        # overwrite the namespace entry for 'current test case'; this is kept
+        # for test code that reads it, the framework uses the run context.
+        # update_namespace() logs what changed, not the whole namespace
+        current_testcase = {'current test case': testcase.as_namespace()}
         update_namespace(current_testcase, verbose=True)
 
-        logger.info(f"\nnamespace after test folder creation:"
-                    f"\n{utils.plog(pytest.custom_namespace)}")
-
 
 @pytest.fixture
 def browser(request):
@@ -756,13 +952,10 @@ def base_firefox_options(webdriver):
     # options.add_argument('--remote-debugging-port=9222')
     options.log.level = 'trace'
 
-    # get path to driver log; this is a PosixPath object
-    folder = pytest.custom_namespace['current test case']['driver folder']
-
     return options
 
 
-def base_chrome_services(webdriver):
+def base_chrome_services(webdriver, log_path=None):
     """
         Set the Chrome service to write the browser/driver log to
         the test case's `driver` folder file.
@@ -770,13 +963,16 @@ def base_chrome_services(webdriver):
         see https://www.selenium.dev/documentation/webdriver/browsers/chrome/
 
         :param webdriver: webdriver package
+        :param log_path: str, path for the driver log; defaults to the
+                              test case's `driver` folder
         :return service: Chrome service object
     """
-    # get path to driver log; this is a PosixPath object
-    folder = pytest.custom_namespace['current test case']['driver folder']
+    if not log_path:
+        # get path to driver log; this is a PosixPath object
+        folder = runcontext.get_folder('driver')
 
-    # set the file output & cast to a string
-    log_path = str(folder / 'driver.txt')
+        # set the file output & cast to a string
+        log_path = str(folder / 'driver.txt')
     logger.info(f"\ndriver log path: {log_path}")
 
     # set the service arguments for logging
@@ -790,7 +986,7 @@ def base_chrome_services(webdriver):
     return service
 
 
-def base_firefox_services(webdriver):
+def base_firefox_services(webdriver, log_path=None):
     """
         Set the geckodriver service to write the browser/driver log to
         the test case's `driver` folder file.
@@ -798,13 +994,16 @@ def base_firefox_services(webdriver):
         see https://www.selenium.dev/selenium/docs/api/py/webdriver_firefox/selenium.webdriver.firefox.service.html
 
         :param webdriver: webdriver package
+        :param log_path: str, path for the driver log; defaults to the
+                              test case's `driver` folder
         :return service: Firefox service object
     """
-    # get path to driver log; this is a PosixPath object
-    folder = pytest.custom_namespace['current test case']['driver folder']
+    if not log_path:
+        # get path to driver log; this is a PosixPath object
+        folder = runcontext.get_folder('driver')
 
-    # set the file output & cast to a string
-    log_path = str(folder / 'driver.txt')
+        # set the file output & cast to a string
+        log_path = str(folder / 'driver.txt')
     logger.info(f"\ndriver log path: {log_path}")
 
     # set the service output configuration
@@ -812,7 +1011,7 @@ def base_firefox_services(webdriver):
     return service
 
 
-def browser_chrome():
+def browser_chrome(log_path=None):
     """
         Launch the local browser, which will block other activities
         on the computer unless using headless.
@@ -824,39 +1023,43 @@ def browser_chrome():
         3. default behavior calls the stable version (I think)
         4. if not cached (~/.cache/selenium/chrome), then it's downloaded
 
+        :param log_path: str, path for the driver log; defaults to the
+                              test case's `driver` folder
         :return this_driver: configured Chrome browser driver
     """
     from selenium import webdriver
 
-    service = base_chrome_services(webdriver)
-    logger.info(f"\nbrowser services:\n{utils.plog(service.__dict__)}")
+    service = base_chrome_services(webdriver, log_path=log_path)
+    logger.info("\nbrowser services:\n%s", utils.plog(service.__dict__))
 
     options = base_chrome_options(webdriver)
-    logger.info(f"\nbrowser options:\n{utils.plog(options.__dict__)}")
+    logger.info("\nbrowser options:\n%s", utils.plog(options.__dict__))
 
     this_driver = webdriver.Chrome(service=service, options=options)
     return this_driver
 
 
-def browser_firefox():
+def browser_firefox(log_path=None):
     """
         Launch the local Firefox browser.
 
+        :param log_path: str, path for the driver log; defaults to the
+                              test case's `driver` folder
         :return this_driver: configured Firefox browser driver
     """
     from selenium import webdriver
 
-    service = base_firefox_services(webdriver)
-    logger.info(f"\nbrowser services:\n{utils.plog(service.__dict__)}")
+    service = base_firefox_services(webdriver, log_path=log_path)
+    logger.info("\nbrowser services:\n%s", utils.plog(service.__dict__))
 
     options = base_firefox_options(webdriver)
-    logger.info(f"\nbrowser options: \n{utils.plog(options.__dict__)}")
+    logger.info("\nbrowser options: \n%s", utils.plog(options.__dict__))
 
     this_driver = webdriver.Firefox(service=service, options=options)
     return this_driver
 
 
-def browser_chrome_headless():
+def browser_chrome_headless(log_path=None):
     """
         This allows for full-page screenshots, as well as not blocking
         use of the local computer.
@@ -868,46 +1071,170 @@ def browser_chrome_headless():
         3. default behavior calls the stable version (I think)
         4. if not cached (~/.cache/selenium/chrome), then it's downloaded
 
+        :param log_path: str, path for the driver log; defaults to the
+                              test case's `driver` folder
         :return this_driver: configured Chrome headless-browser driver
     """
     from selenium import webdriver
 
-    service = base_chrome_services(webdriver)
-    logger.info(f"\nbrowser services:\n{utils.plog(service.__dict__)}")
+    service = base_chrome_services(webdriver, log_path=log_path)
+    logger.info("\nbrowser services:\n%s", utils.plog(service.__dict__))
 
     options = base_chrome_options(webdriver)
     options.add_argument('--headless=new')
-    logger.info(f"\nbrowser options:\n{utils.plog(options.__dict__)}")
+    logger.info("\nbrowser options:\n%s", utils.plog(options.__dict__))
 
     this_driver = webdriver.Chrome(service=service, options=options)
     return this_driver
 
 
-def browser_firefox_headless():
+def browser_firefox_headless(log_path=None):
     """
         Launch the local Firefox browser in headless mode.
 
+        :param log_path: str, path for the driver log; defaults to the
+                              test case's `driver` folder
         :return this_driver: configured Firefox headless browser driver
     """
     from selenium import webdriver
 
-    service = base_firefox_services(webdriver)
-    logger.info(f"\nbrowser services:\n{utils.plog(service.__dict__)}")
+    service = base_firefox_services(webdriver, log_path=log_path)
+    logger.info("\nbrowser services:\n%s", utils.plog(service.__dict__))
 
     options = base_firefox_options(webdriver)
     options.add_argument('--headless')
-    logger.info(f"\nbrpowser options: \n{utils.plog(options.__dict__)}")
+    logger.info("\nbrpowser options: \n%s", utils.plog(options.__dict__))
 
     this_driver = webdriver.Firefox(service=service, options=options)
     return this_driver
 
+
+def launch_driver(browser, log_path=None):
+    """
+        Launch and configure a local browser driver.
+
+        :param browser: str, driver identifier
+        :param log_path: str, path for the driver log; defaults to the
+                              test case's `driver` folder
+        :return driver: webdriver object
+    """
+    # #############################################################
+    # Run locally with Chrome browser
+    # #############################################################
+    if browser in ['chrome', 'headless_chrome']:
+        if browser == 'chrome':
+            driver = browser_chrome(log_path=log_path)
+        elif browser == 'headless_chrome':
+            driver = browser_chrome_headless(log_path=log_path)
+
+        driver_version = driver.capabilities['chrome']['chromedriverVersion']
+        logger.info(f"\nstarting driver \n'{browser}':"
+                    f"\nchrome driver version: {driver_version}\n")
+
+        # set the default window dimensions; can be over-ridden at the POM layer
+        driver.set_window_size(*driver_pool.WINDOW_SIZE)
+        # implicit waits set the remote driver's properties, which may not
+        # be over-rideable with explicit local waits
+        # driver.implicitly_wait(10)  # default wait for 10 seconds
+        user_agent = driver.execute_script("return navigator.userAgent;")
+        logger.info(f"\nuseragent: \n'{user_agent}'")
+
+        # enable collection of performance metrics
+        driver.execute_cdp_cmd('Performance.enable', {})
+
+    # #############################################################
+    # Run locally with Firefox browser
+    # #############################################################
+    elif browser in ['firefox', "headless_firefox"]:
+        if browser == 'firefox':
+            driver = browser_firefox(log_path=log_path)
+        elif browser == 'headless_firefox':
+            driver = browser_firefox_headless(log_path=log_path)
+        driver_version = driver.capabilities['moz:geckodriverVersion']
+        logger.info(f"\nstarting driver \n'{browser}':"
+                    f"\nfirefox driver version: {driver_version}\n")
+
+        # set the default window dimensions; can be over-ridden at the POM layer
+        driver.set_window_size(*driver_pool.WINDOW_SIZE)
+        # implicit waits set the remote driver's properties, which may not
+        # be over-rideable with explicit local waits
+        # driver.implicitly_wait(10)  # default wait for 10 seconds
+        user_agent = driver.execute_script("return navigator.userAgent;")
+        logger.info(f"\nuseragent: \n'{user_agent}'")
+
+    # #############################################################
+    # ERROR out
+    # #############################################################
+    else:
+        msg = f"Error: '{browser}' is not a valid selection."
+        logger.error(msg)
+        raise ValueError(msg)
+
+    return driver
+
+
+def launch_pooled_driver(browser, index):
+    """
+        Launch a driver for the driver pool.
+
+        A pooled driver outlives the test that launched it, so its driver
+        log goes in the testrun folder rather than a test case folder.
+
+        :param browser: str, driver identifier
+        :param index: int, count of the pool's launches
+        :return driver: webdriver object
+    """
+    testrun_folder = pytest.custom_namespace['testrun paths']['folder']
+    log_path = testrun_folder / f"driver_{runcontext.get_worker_id()}_{index}.txt"
+    return launch_driver(browser, log_path=str(log_path))
+
+
+def launch_prewarmed_driver(browser, index):
+    """
+        Launch a driver in the background, ahead of the test that needs it.
+
+        No test case is running on the prewarming thread, so the driver log
+        goes in the testrun folder.
+
+        :param browser: str, driver identifier
+        :param index: int, count of the prewarmer's launches
+        :return driver: webdriver object
+    """
+    testrun_folder = pytest.custom_namespace['testrun paths']['folder']
+    log_path = testrun_folder / \
+        f"driver_{runcontext.get_worker_id()}_prewarm_{index}.txt"
+    return launch_driver(browser, log_path=str(log_path))
+
+
+@pytest.fixture(scope='session')
+def pool_of_drivers(request):
+    """
+        The pool of warm local browser drivers for this test session (or
+        this pytest-xdist worker), see framework/driver_pool.py.
+
+        :param request: pytest request object
+        :yield pool: DriverPool instance
+    """
+    pool = driver_pool.DriverPool(launch=launch_pooled_driver,
+                                  max_uses=request.config.getoption('driver_max_uses'),
+                                  prewarmer=request.config.stash.get(DRIVER_PREWARMER, None))
+    request.config.stash[DRIVER_POOL] = pool
+    yield pool
+    pool.close()
+    del request.config.stash[DRIVER_POOL]
+
+
 @pytest.fixture(scope="function")
-def driver(request, browser):
+def driver(request, browser, pool_of_drivers):
     """
         Identify the appropriate browser driver to instantiate.
 
-        This fixture is scoped to `function`, so it will launch and quit the driver
-        for EACH calling test function.
+        Local drivers come from a pool of warm drivers, which are reset
+        between tests and replaced after `--driver_max_uses` tests. To get
+        a new browser that is quit after the test, mark the test with
+        `@pytest.mark.fresh_browser`, or use `--reuse_drivers no`. With
+        `--prewarm_drivers yes`, new browsers are launched in the background
+        while the previous test runs (see pytest_runtest_protocol()).
 
         If using Applitools Execution Cloud, we must have:
             1. permission for access from Applitools
@@ -924,6 +1251,7 @@ def driver(request, browser):
 
         :param request: pytest request object (context of the calling test method)
         :param browser: str, driver identifier
+        :param pool_of_drivers: DriverPool instance
         :yield driver: webdriver object
     """
     logger.info(f"\nRequested '{browser}' driver.")
@@ -945,7 +1273,7 @@ def driver(request, browser):
         # This means that tests will be run on the Applitools Execution cloud
         from selenium import webdriver
         options = base_chrome_options(webdriver)
-        logger.info(f"\nbrowser options:\n{utils.plog(options.__dict__)}")
+        logger.info("\nbrowser options:\n%s", utils.plog(options.__dict__))
 
         driver = webdriver.Remote(
             command_executor=Eyes.get_execution_cloud_url(),
@@ -955,65 +1283,27 @@ def driver(request, browser):
         logger.info(f"Quitting 'applitools' & '{browser}' driver.")
 
     # #############################################################
-    # Run locally with Chrome browser
-    # #############################################################
-    elif browser in ['chrome', 'headless_chrome']:
-        if browser == 'chrome':
-            driver = browser_chrome()
-        elif browser == 'headless_chrome':
-            driver = browser_chrome_headless()
-
-        driver_version = driver.capabilities['chrome']['chromedriverVersion']
-        logger.info(f"\nstarting driver \n'{browser}':"
-                    f"\nchrome driver version: {driver_version}\n")
-
-        # set the default window dimensions; can be over-ridden at the POM layer
-        driver.set_window_size(1030, 2200)
-        # implicit waits set the remote driver's properties, which may not
-        # be over-rideable with explicit local waits
-        # driver.implicitly_wait(10)  # default wait for 10 seconds
-        user_agent = driver.execute_script("return navigator.userAgent;")
-        logger.info(f"\nuseragent: \n'{user_agent}'")
-
-        # enable collection of performance metrics
-        driver.execute_cdp_cmd('Performance.enable', {})
-
-        yield driver
-        driver.quit()
-        logger.info(f"Quitting '{browser}' driver.")
-
-    # #############################################################
-    # Run locally with Firefox browser
+    # Run locally with a new browser
     # #############################################################
-    elif browser in ['firefox', "headless_firefox"]:
-        if browser == 'firefox':
-            driver = browser_firefox()
-        elif browser == 'headless_firefox':
-            driver = browser_firefox_headless()
-        driver_version = driver.capabilities['moz:geckodriverVersion']
-        logger.info(f"\nstarting driver \n'{browser}':"
-                    f"\nfirefox driver version: {driver_version}\n")
-
-        # set the default window dimensions; can be over-ridden at the POM layer
-        driver.set_window_size(1030, 2200)
-        # implicit waits set the remote driver's properties, which may not
-        # be over-rideable with explicit local waits
-        # driver.implicitly_wait(10)  # default wait for 10 seconds
-        user_agent = driver.execute_script("return navigator.userAgent;")
-        logger.info(f"\nuseragent: \n'{user_agent}'")
-
+    elif request.node.get_closest_marker('fresh_browser') \
+            or request.config.getoption('reuse_drivers') == 'no':
+        prewarmer = request.config.stash.get(DRIVER_PREWARMER, None)
+        if prewarmer:
+            driver = prewarmer.take(browser)
+        if not driver:
+            driver = launch_driver(browser)
         yield driver
         driver.quit()
         logger.info(f"Quitting '{browser}' driver.")
 
-
     # #############################################################
-    # ERROR out
+    # Run locally with a pooled browser
     # #############################################################
     else:
-        msg = f"Error: '{browser}' is not a valid selection."
-        logger.error(msg)
-        raise ValueError(msg)
+        driver = pool_of_drivers.acquire(browser)
+        yield driver
+        pool_of_drivers.release(driver)
+        logger.info(f"Released '{browser}' driver to the pool.")
 
 
 @pytest.fixture(scope='session')
@@ -1060,8 +1350,8 @@ def applitools_run_config(config):
         :param request: pytest request object
         :return: tuple(applitools_ultrafast_grid, applitools_execution_cloud)
     """
-    logger.info(f"\n---> namespace for applitools config: "
-                f"\n{utils.plog(pytest.custom_namespace)}")
+    logger.info("\n---> namespace for applitools config: \n%s",
+                utils.plog(pytest.custom_namespace.get('applitools')))
     use_grid = config.option.applitools_ultrafast_grid
     logger.info('\nuse_grid: %s' % use_grid)
     applitools_ultrafast_grid = True if use_grid == 'yes' else False
@@ -1077,7 +1367,8 @@ def applitools_run_config(config):
         }}
     update_namespace(settings, verbose=True)
 
-    logger.info(f"\napplitools namespace:\n{utils.plog(pytest.custom_namespace)}")
+    logger.info("\napplitools namespace:\n%s",
+                utils.plog(pytest.custom_namespace['applitools']))
     return applitools_ultrafast_grid, applitools_execution_cloud
 
 
@@ -1118,8 +1409,8 @@ def runner():
 
         :yield run: Appltools runner object instance
     """
-    logger.info(f"\n---> namespace for applitools runner: "
-                f"\n{utils.plog(pytest.custom_namespace)}")
+    logger.info("\n---> namespace for applitools runner: \n%s",
+                utils.plog(pytest.custom_namespace.get('applitools')))
 
     logger.info("\ninitializing with applitools")
     logger.info("\n-----> applitools output is logged to a different logger")
@@ -1164,7 +1455,7 @@ def batch_info():
     runner_name = "Ultrafast Grid" if use_grid else "Classic runner"
     batch_info = BatchInfo(f"Example: Selenium pytest with the {runner_name}")
     logger.info(f"\nstarted at: {batch_info.started_at}")
-    logger.info(f"\nbatch info: \n{utils.plog(dir(batch_info))}")
+    logger.info("\nbatch info: \n%s", utils.lazy_plog(dir(batch_info)))
     return batch_info
 
 
@@ -1276,8 +1567,8 @@ def eyes(runner, configuration, driver, request):
         # viewport_size=RectangleSize(1200, 600)  # overrides selenium settings?!
     )
 
-    logger.info(f"\ndir(eyes): {utils.plog(dir(eyes))}")
-    logger.info(f"\neyes.__dict__: {utils.plog(eyes.__dict__)}")
+    logger.info("\ndir(eyes): %s", utils.lazy_plog(dir(eyes)))
+    logger.info("\neyes.__dict__: %s", utils.plog(eyes.__dict__))
 
     yield eyes
     eyes.close_async()
@@ -1,11 +1,10 @@
 import pytest
 import logging
-import time
 
 from selenium.webdriver.common.by import By
 
 from welkin.framework.exceptions import PageIdentityException
-from welkin.framework import utils
+from welkin.framework import utils, utils_selenium
 from welkin.apps.examples.duckduckgo_limited import limited_pages as lPOs
 from welkin.apps.examples.duckduckgo_simple import simple_pages as sPOs
 from welkin.apps.examples.duckduckgo.noauth import pages as POs
@@ -84,7 +83,8 @@ class ExampleDuckduckgoTests(object):
 
         # submit the search
         search_input.submit()
-        time.sleep(5)
+        # wait for the results to stop loading, rather than sleeping
+        utils_selenium.wait_for_page_ready(driver)
 
         # by now, the search results page should have loaded in the browser,
         # so now we need verify that.
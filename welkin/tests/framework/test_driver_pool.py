@@ -0,0 +1,120 @@
+import pytest
+import logging
+
+from welkin.framework import driver_pool
+
+logger = logging.getLogger(__name__)
+
+
+class FakeSwitchTo(object):
+    """
+        The driver.switch_to part of a FakeDriver.
+    """
+    def __init__(self, driver):
+        self.driver = driver
+
+    def new_window(self, type_hint):
+        self.driver.tabs += 1
+        handle = f"tab-{self.driver.tabs}"
+        self.driver.window_handles.append(handle)
+        self.driver.current_window_handle = handle
+
+    def window(self, handle):
+        self.driver.current_window_handle = handle
+
+
+class FakeDriver(object):
+    """
+        Just enough of a Chrome webdriver for the pool to launch, reset and
+        quit it, recording the DevTools commands sent to each tab.
+    """
+    session_id = 'fake session'
+
+    def __init__(self):
+        self.tabs = 1
+        self.window_handles = ['tab-1']
+        self.current_window_handle = 'tab-1'
+        self.switch_to = FakeSwitchTo(self)
+        self.cdp_commands = []
+        self.window_size = None
+        self.quit_called = False
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp_commands.append((self.current_window_handle, cmd))
+        return {}
+
+    def close(self):
+        self.window_handles.remove(self.current_window_handle)
+
+    def set_window_size(self, width, height):
+        self.window_size = (width, height)
+
+    def get_log(self, log_type):
+        return []
+
+    def quit(self):
+        self.quit_called = True
+
+    def commands_for_current_tab(self):
+        return [cmd for handle, cmd in self.cdp_commands
+                if handle == self.current_window_handle]
+
+
+def launch_fake_driver(browser, index):
+    """
+        Launch a FakeDriver the way conftest's launch_driver() sets up
+        Chrome: performance metrics and readiness instrumentation enabled.
+    """
+    driver = FakeDriver()
+    driver.execute_cdp_cmd('Performance.enable', {})
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': ''})
+    driver.welkin_readiness_installed = True
+    return driver
+
+
+@pytest.mark.framework
+class DriverPoolTests(object):
+
+    def test_reset_restores_devtools_state_for_new_tab(self):
+        """
+            A released driver is reset to a new tab, which must get the
+            DevTools state the launch set up for the old tab.
+
+            :return: None
+        """
+        pool = driver_pool.DriverPool(launch=launch_fake_driver)
+        driver = pool.acquire('chrome')
+        pool.release(driver)
+
+        assert pool.acquire('chrome') is driver, \
+            'FAIL: the released driver was not reused.'
+        assert driver.window_handles == ['tab-2'], \
+            f'FAIL: expected only the new tab, got {driver.window_handles}.'
+        commands = driver.commands_for_current_tab()
+        logger.info(f"\nDevTools commands for the new tab: {commands}")
+        assert 'Performance.enable' in commands, \
+            'FAIL: performance metrics not enabled for the new tab.'
+        assert 'Page.addScriptToEvaluateOnNewDocument' in commands, \
+            'FAIL: readiness instrumentation not installed for the new tab.'
+        assert driver.welkin_readiness_installed, \
+            'FAIL: readiness instrumentation not marked as installed.'
+        pool.close()
+        assert driver.quit_called, 'FAIL: the pool did not quit the driver.'
+
+    def test_reset_skips_readiness_if_never_installed(self):
+        """
+            The readiness instrumentation is only reinstalled on a driver
+            that had it.
+
+            :return: None
+        """
+        pool = driver_pool.DriverPool(launch=lambda browser, index: FakeDriver())
+        driver = pool.acquire('chrome')
+        pool.release(driver)
+
+        commands = driver.commands_for_current_tab()
+        assert 'Page.addScriptToEvaluateOnNewDocument' not in commands, \
+            'FAIL: readiness instrumentation installed on a driver without it.'
+        assert not getattr(driver, 'welkin_readiness_installed', False), \
+            'FAIL: readiness instrumentation marked as installed.'
+        pool.close()
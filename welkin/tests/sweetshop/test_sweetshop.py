@@ -65,6 +65,23 @@ class SweetshopTests(object):
         home_page = basket_page.select_page_from_top_menu('Home')
         home_page.save_screenshot('home page loaded again')
 
+    def test_goto_navigation(self, driver, sweetshop):
+        """
+            Planned navigation: go straight to the pages under test.
+
+            goto() loads each page the cheapest way it can, which for these
+            URL-addressable pages is a direct page load rather than a walk
+            through the top menu.
+        """
+        # instantiate the POM on the blank driver start page
+        boot_page = PomBootPage(driver)
+
+        basket_page = boot_page.goto('sweetshop basket page')
+        basket_page.save_screenshot('basket page loaded')
+
+        about_page = basket_page.goto('sweetshop about page')
+        about_page.save_screenshot('about page loaded')
+
     @pytest.mark.parametrize('scenario',
                              [
                                  ['Sweets', 'Login', 'About'],
@@ -0,0 +1,135 @@
+"""
+    welkin-view: read the ndjson artifacts written with
+    --artifact_format ndjson (see welkin/framework/utils_file.py).
+
+    Pretty-print, filter and merge the records of one or more ndjson files,
+    or of every ndjson file under one or more folders (e.g. a test run's
+    output folder). Records from several files are merged in timestamp
+    order, and the files are streamed, so large runs don't need to fit in
+    memory.
+
+    Usage:
+        python -m welkin.tools.welkin_view welkin/output/<run> \\
+            --artifact network --page sweets --event loaded
+        python -m welkin.tools.welkin_view <run>/<test>/console --grep error --compact
+"""
+import argparse
+import heapq
+import json
+import logging
+import sys
+from pathlib import Path
+
+from welkin.framework import utils_json
+
+logger = logging.getLogger(__name__)
+
+
+def find_files(paths):
+    """
+        Expand the paths into ndjson files; folders are searched recursively.
+
+        :param paths: list of str paths to files or folders
+        :return files: list of Path, sorted
+    """
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(path.rglob('*.ndjson')))
+        else:
+            files.append(path)
+    return files
+
+
+def read_records(path):
+    """
+        Stream the records of one ndjson file; lines that aren't valid json
+        (e.g. a line cut off by a crash) are skipped with a warning.
+
+        :param path: Path to an ndjson file
+        :return: generator of dicts
+    """
+    with open(path) as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"\nskipping invalid record {path}:{number}")
+
+
+def matches(record, args):
+    """
+        Check a record against the filters.
+
+        :param record: dict, ndjson record
+        :param args: argparse Namespace with the filters
+        :return: bool
+    """
+    if args.artifact and record.get('artifact') not in args.artifact:
+        return False
+    if args.page and args.page not in str(record.get('_page')):
+        return False
+    if args.event and args.event not in str(record.get('event')):
+        return False
+    if args.grep and args.grep not in json.dumps(record.get('data')):
+        return False
+    return True
+
+
+def view(args, out=sys.stdout):
+    """
+        Print the matching records of every file, merged in timestamp order.
+
+        :param args: argparse Namespace, see parse_args()
+        :param out: file to print to; defaults to stdout
+        :return count: int, number of records printed
+    """
+    streams = [read_records(path) for path in find_files(args.paths)]
+    merged = heapq.merge(*streams, key=lambda record: record.get('_timestamp') or 0)
+    count = 0
+    for record in merged:
+        if not matches(record, args):
+            continue
+        out.write(utils_json.dumps(record, pretty=not args.compact) + '\n')
+        count += 1
+        if args.limit and count >= args.limit:
+            break
+    return count
+
+
+def parse_args(argv=None):
+    """
+        :param argv: list of str arguments; defaults to sys.argv[1:]
+        :return: argparse Namespace
+    """
+    parser = argparse.ArgumentParser(
+        prog='welkin-view',
+        description='Pretty-print, filter and merge welkin ndjson artifacts.')
+    parser.add_argument('paths', nargs='+',
+                        help='ndjson files, or folders to search for them')
+    parser.add_argument('--artifact', action='append',
+                        help='only this artifact type, e.g. "network"; repeatable')
+    parser.add_argument('--page', help='only records whose page url contains this')
+    parser.add_argument('--event', help='only records whose event contains this')
+    parser.add_argument('--grep', help='only records whose data contains this text')
+    parser.add_argument('--limit', type=int, help='print at most this many records')
+    parser.add_argument('--compact', action='store_true',
+                        help='print one record per line instead of pretty-printing')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.WARNING, format='%(message)s')
+    args = parse_args(argv)
+    try:
+        view(args)
+    except BrokenPipeError:
+        # e.g. piped into head
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())